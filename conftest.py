@@ -0,0 +1,8 @@
+import os, tempfile
+
+# Keep tests from using or replacing an engine calibration in the user's
+# cache directory, here and in the CLI subprocesses the tests start
+os.environ.setdefault(
+    "ORBEAT_CALIBRATION",
+    os.path.join(tempfile.mkdtemp(prefix="orbeat_test_"), "engine.json"),
+)
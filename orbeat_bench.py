@@ -0,0 +1,360 @@
+import json, random, subprocess, sys, threading, time, tracemalloc
+import orbeat_cache, orbeat_time
+
+TOLERANCE = 0.25
+WORKLOADS = ["uniform", "monotone", "bursty"]
+SCALAR = [
+    "to_parts_from_ms",
+    "to_parts_from_ms_ref",
+    "to_orbeat8",
+    "to_ucy",
+    "to_eastern",
+]
+BATCH = [
+    "to_parts_many",
+    "to_orbeat8_many",
+    "to_ucy_many",
+    "from_ucy_many",
+    "from_orbeat8_many",
+    "to_local_many",
+    "to_unix_ms_many",
+]
+# Hot paths that share state across threads: the day cache and formatters
+THREADED = [
+    "to_orbeat8",
+    "to_ucy",
+    "to_parts_cached",
+    "to_orbeat8_many",
+    "to_ucy_many",
+]
+# The reference implementation walks every year since the datum
+REF_SHARE = 100
+# orbeat8 codes only resolve within four years of a reference time
+NEAR_MS = 1700000000000
+NEAR_SPAN_MS = 6 * 31556925000
+
+
+def workload(name, size, seed=0):
+    """
+    Generate Unix ms timestamps shaped like one kind of traffic.
+
+    Args:
+        name (str): "uniform" (1900-2100 at random), "monotone" (a sorted
+            log a few ms apart) or "bursty" (tight clusters around a few
+            random moments)
+        size (int): Number of timestamps
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Returns:
+        list: Unix timestamps in milliseconds
+    """
+    rng = random.Random(f"{name}:{seed}")
+    if name == "uniform":
+        return [rng.randrange(-2208988800000, 4102444800000) for _ in range(size)]
+    if name == "monotone":
+        values, unix_ms = [], 1700000000000
+        for _ in range(size):
+            unix_ms += rng.randrange(2000)
+            values.append(unix_ms)
+        return values
+    if name == "bursty":
+        centers = [rng.randrange(1500000000000, 1900000000000) for _ in range(16)]
+        return [rng.choice(centers) + rng.randrange(-60000, 60000) for _ in range(size)]
+    raise ValueError(f"unknown workload: {name}")
+
+
+def _time_ns(run, repeat):
+    best = None
+    for _ in range(repeat):
+        began = time.perf_counter_ns()
+        run()
+        elapsed = time.perf_counter_ns() - began
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _scalar_runner(function, values):
+    def run():
+        for unix_ms in values:
+            function(unix_ms)
+
+    return run
+
+
+def _batch_inputs(name, values):
+    if name == "from_ucy_many":
+        return orbeat_time.to_ucy_many(values)
+    if name == "from_orbeat8_many":
+        nearby = [
+            NEAR_MS + (unix_ms - NEAR_MS) % NEAR_SPAN_MS - NEAR_SPAN_MS // 2
+            for unix_ms in values
+        ]
+        return orbeat_time.to_orbeat8_many(nearby)
+    if name == "to_unix_ms_many":
+        from datetime import datetime, timezone
+
+        return [
+            datetime.fromtimestamp(unix_ms / 1000, timezone.utc).isoformat()
+            for unix_ms in values
+        ]
+    return values
+
+
+def cli_startup_ns(repeat=5):
+    """Time the default `python -m orbeat_cli` invocation, best of repeat."""
+    command = [sys.executable, "-m", "orbeat_cli"]
+    return _time_ns(lambda: subprocess.run(command, capture_output=True), repeat)
+
+
+def run(size=10000, repeat=5, seed=0, only=None, startup=True):
+    """
+    Run every benchmark and report the best time per item.
+
+    Args:
+        size (int, optional): Timestamps per workload. Defaults to 10000.
+        repeat (int, optional): Runs per benchmark; the fastest counts. Defaults to 5.
+        seed (int, optional): Random seed for the workloads. Defaults to 0.
+        only (str, optional): Keep only metrics whose name contains this.
+        startup (bool, optional): Include CLI startup. Defaults to True.
+
+    Returns:
+        dict: Nanoseconds per item keyed by "function/workload", plus
+            per year for the default orbeat_drift analysis
+    """
+    metrics = {}
+    for name in WORKLOADS:
+        values = workload(name, size, seed)
+        for function_name in SCALAR + BATCH:
+            metric = f"{function_name}/{name}"
+            if only and only not in metric:
+                continue
+            function = getattr(orbeat_time, function_name)
+            if function_name in BATCH:
+                inputs = _batch_inputs(function_name, values)
+                if function_name == "from_orbeat8_many":
+                    runner = lambda: function(inputs, NEAR_MS)
+                else:
+                    runner = lambda: function(inputs)
+            elif function_name == "to_parts_from_ms_ref":
+                inputs = values[: max(1, size // REF_SHARE)]
+                runner = _scalar_runner(function, inputs)
+            else:
+                inputs = values
+                runner = _scalar_runner(function, inputs)
+            metrics[metric] = _time_ns(runner, repeat) / len(inputs)
+    if not only or only in "drift_analyze":
+        import orbeat_drift
+
+        years = orbeat_drift.ANALYSIS_YEARS
+        metrics["drift_analyze"] = _time_ns(orbeat_drift.analyze, repeat) / years
+    if startup and (not only or only in "cli_startup"):
+        metrics["cli_startup"] = cli_startup_ns(repeat)
+    return metrics
+
+
+def _threaded_ns(run, threads):
+    barrier = threading.Barrier(threads + 1)
+
+    def work():
+        barrier.wait()
+        run()
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    began = time.perf_counter_ns()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter_ns() - began
+
+
+def scaling(threads=(1, 2, 4, 8), size=20000, repeat=3, only=None):
+    """
+    Measure how throughput grows as more threads convert at once.
+
+    Every thread converts the same monotone workload, so all of them hit
+    the same cached days. With the GIL the total stays flat; on a
+    free-threaded build it should grow with the thread count unless
+    shared state makes them contend.
+
+    Args:
+        threads (iterable, optional): Thread counts to try. Defaults to (1, 2, 4, 8).
+        size (int, optional): Timestamps per thread. Defaults to 20000.
+        repeat (int, optional): Runs per count; the fastest counts. Defaults to 3.
+        only (str, optional): Keep only functions whose name contains this.
+
+    Returns:
+        dict: Items per second for each thread count, keyed by function
+    """
+    values = workload("monotone", size)
+    results = {}
+    for name in THREADED:
+        if only and only not in name:
+            continue
+        if name == "to_parts_cached":
+            function = orbeat_cache.to_parts_cached
+        else:
+            function = getattr(orbeat_time, name)
+        if name in BATCH:
+            runner = lambda function=function: function(values)
+        else:
+            runner = _scalar_runner(function, values)
+        results[name] = {}
+        for count in threads:
+            best = min(_threaded_ns(runner, count) for _ in range(repeat))
+            results[name][count] = count * size / best * 1e9
+    return results
+
+
+def allocations_per_call(call, repeat=20):
+    """
+    Measure what one call allocates, using tracemalloc.
+
+    The peak is the most memory held at once during the call beyond what
+    was already allocated, which catches transient closures and strings.
+    Blocks are those still held after the call, mostly the result itself.
+    Each takes the fewest seen over the calls, since the first calls also
+    fill free lists and caches. Any trace function, such as a coverage
+    tracer, is paused meanwhile because it allocates on every call too.
+
+    Args:
+        call (callable): Makes the call being measured, with no arguments
+        repeat (int, optional): Calls per measurement. Defaults to 20.
+
+    Returns:
+        tuple: (peak bytes, retained blocks) per call
+    """
+    call()
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    tracer = sys.gettrace()
+    sys.settrace(None)
+    tracemalloc.start()
+    try:
+        peak = blocks = None
+        for _ in range(repeat):
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            call()
+            used = tracemalloc.get_traced_memory()[1] - before
+            peak = used if peak is None else min(peak, used)
+        for _ in range(2):
+            first = tracemalloc.take_snapshot().filter_traces(ignore)
+            results = [call() for _ in range(repeat)]
+            second = tracemalloc.take_snapshot().filter_traces(ignore)
+            held = sum(stat.count_diff for stat in second.compare_to(first, "filename"))
+            # Leave out the list holding the results
+            held -= 1
+            blocks = held if blocks is None else min(blocks, held)
+            del results
+    finally:
+        tracemalloc.stop()
+        sys.settrace(tracer)
+    return peak, blocks / repeat
+
+
+def allocations(size=1000, repeat=20):
+    """
+    Measure allocations for every scalar function and batch path.
+
+    Scalar functions are measured per call and batch paths per item, on a
+    monotone workload.
+
+    Args:
+        size (int, optional): Timestamps per batch call. Defaults to 1000.
+        repeat (int, optional): Calls per measurement. Defaults to 20.
+
+    Returns:
+        dict: {"peak_bytes": ..., "blocks": ...} keyed by function name
+    """
+    values = workload("monotone", size)
+    unix_ms = values[0]
+    orbeat8, ucy = orbeat_time.to_orbeat8(unix_ms), orbeat_time.to_ucy(unix_ms)
+    calls = {
+        name: (lambda function: lambda: function(unix_ms))(getattr(orbeat_time, name))
+        for name in SCALAR
+    }
+    calls["from_ucy"] = lambda: orbeat_time.from_ucy(ucy)
+    calls["from_orbeat8"] = lambda: orbeat_time.from_orbeat8(orbeat8, NEAR_MS)
+    for name in BATCH:
+        inputs = _batch_inputs(name, values)
+        function = getattr(orbeat_time, name)
+        if name == "from_orbeat8_many":
+            calls[name] = lambda function=function, inputs=inputs: function(
+                inputs, NEAR_MS
+            )
+        else:
+            calls[name] = lambda function=function, inputs=inputs: function(inputs)
+    results = {}
+    for name, call in calls.items():
+        per = size if name in BATCH else 1
+        peak, blocks = allocations_per_call(call, repeat if per == 1 else 3)
+        results[name] = {"peak_bytes": peak / per, "blocks": blocks / per}
+    return results
+
+
+def compare(metrics, baseline, tolerance=TOLERANCE):
+    """
+    Find metrics slower than the baseline by more than the tolerance.
+
+    Args:
+        metrics (dict): Current results from run
+        baseline (dict): Earlier results from run
+        tolerance (float, optional): Allowed slowdown as a fraction. Defaults to 0.25.
+
+    Returns:
+        list: (metric, baseline ns, current ns) for each regression
+    """
+    return [
+        (metric, baseline[metric], value)
+        for metric, value in sorted(metrics.items())
+        if metric in baseline and value > baseline[metric] * (1 + tolerance)
+    ]
+
+
+def main(args):
+    """
+    Run the benchmarks from `orbeat bench` arguments and print a table.
+
+    Returns:
+        int: 1 if --compare found a regression, else 0
+    """
+    if args.alloc:
+        for name, result in allocations().items():
+            print(
+                f"{name:24} {result['peak_bytes']:10.1f} peak bytes"
+                f" {result['blocks']:8.2f} blocks"
+            )
+        return 0
+    if args.threads:
+        threads = [int(count) for count in args.threads.split(",")]
+        gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+        print(f"GIL {'enabled' if gil else 'disabled'}")
+        for name, rates in scaling(threads, only=args.only).items():
+            for count, rate in rates.items():
+                speedup = rate / rates[threads[0]]
+                print(f"{name:24} {count:3} threads {rate:14.0f}/s {speedup:6.2f}x")
+        return 0
+    metrics = run(args.size, args.repeat, only=args.only)
+    for metric, value in metrics.items():
+        print(f"{metric:40} {value:14.1f} ns")
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump({"python": sys.version.split()[0], "metrics": metrics}, file)
+            file.write("\n")
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)["metrics"]
+        regressions = compare(
+            metrics, baseline, TOLERANCE if args.tolerance is None else args.tolerance
+        )
+        for metric, before, after in regressions:
+            print(f"REGRESSION {metric}: {before:.1f} ns -> {after:.1f} ns")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    import orbeat_cli
+
+    orbeat_cli.main(["bench", *sys.argv[1:]])
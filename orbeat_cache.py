@@ -0,0 +1,81 @@
+import functools, time
+from orbeat_time import MS_PER_DAY, OFFSET_MS, STANDARD_YEAR
+from orbeat_time import _format_orbeat8, _format_ucy, _year_span, to_parts_from_ms
+
+DAY_CACHE_SIZE = 4096
+
+
+def _day_parts(days):
+    year, start, end = _year_span(days)
+    week = (0 if end - start == STANDARD_YEAR else 1) + (days - start) // 8
+    return year, week, days % 8
+
+
+_cached_day_parts = functools.lru_cache(DAY_CACHE_SIZE)(_day_parts)
+
+
+def configure(maxsize=DAY_CACHE_SIZE):
+    """
+    Resize the day cache, dropping its entries and statistics.
+
+    Args:
+        maxsize (int, optional): Days kept before the least recently used
+            is evicted. Defaults to 4096.
+    """
+    global _cached_day_parts
+    if maxsize < 1:
+        raise ValueError("maxsize must be at least 1")
+    _cached_day_parts = functools.lru_cache(maxsize)(_day_parts)
+
+
+def cache_info():
+    """
+    Report the day cache's statistics.
+
+    Returns:
+        dict: hits, misses, size and maxsize
+    """
+    info = _cached_day_parts.cache_info()
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "maxsize": info.maxsize,
+    }
+
+
+def cache_clear():
+    """Drop every cached day and zero the statistics."""
+    _cached_day_parts.cache_clear()
+
+
+def to_parts_cached(unix_ms=None):
+    """
+    Convert Unix timestamp to time components, caching per day.
+
+    Year, week and day only change at day boundaries, so they are kept in
+    a bounded LRU cache keyed by whole days since the datum and only the
+    fraction is computed per call. Results match to_parts_from_ms; times
+    before the datum go straight to it uncached.
+
+    Args:
+        unix_ms (int, optional): Unix timestamp in milliseconds. Defaults to current time.
+
+    Returns:
+        tuple: (year, week, day, fracs) - all as numeric values
+    """
+    unix_ms = unix_ms or time.time() * 1000
+    days, ms_into_day = divmod(unix_ms + OFFSET_MS, MS_PER_DAY)
+    if days < 0:
+        return to_parts_from_ms(unix_ms)
+    return (*_cached_day_parts(int(days)), ms_into_day / MS_PER_DAY)
+
+
+def to_orbeat8_cached(unix_ms=None):
+    """to_orbeat8 on top of the day cache."""
+    return _format_orbeat8(*to_parts_cached(unix_ms))
+
+
+def to_ucy_cached(unix_ms=None):
+    """to_ucy on top of the day cache."""
+    return _format_ucy(*to_parts_cached(unix_ms))
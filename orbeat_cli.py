@@ -1,37 +1,486 @@
-import argparse, json
-from datetime import datetime, timezone
-from orbeat_time import to_orbeat8
+import math, sys, time
+from orbeat_time import next_boundary_ms, to_orbeat8, to_orbeat8_many, to_ucy
+from orbeat_time import from_orbeat8, from_orbeat8_many, from_ucy
+from orbeat_time import from_ucy_many, to_unix_ms, convert_many
+
+OUTPUT_FORMATS = ["json", "compact", "ndjson", "orbeat"]
+CHUNK_SIZE = 4096
+NOW_TEMPLATE = '{{"orbeat":"{}","iso":"{}"}}'
+ROW_TEMPLATE = '{{"ms":{},"orbeat":"{}","ucy":"{}"}}'
+RANGE_TEMPLATE = '{{"code":"{}","start":{},"end":{}}}'
 
 
 def get_orbeat_time():
-    now = datetime.now(timezone.utc)
-    unix_ms = int(now.timestamp() * 1000)
-    orbeat = to_orbeat8(unix_ms)
-    iso = now.isoformat()
+    from datetime import datetime, timedelta, timezone
+
+    # One integer clock reading for both, without a float round trip
+    unix_us = time.time_ns() // 1000
+    orbeat = to_orbeat8(unix_us // 1000)
+    epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+    iso = (epoch + timedelta(microseconds=unix_us)).isoformat()
     return orbeat, iso
 
 
 def parse_args(args=None):
+    import argparse
+
     parser = argparse.ArgumentParser(
         prog="orbeat", description="Convert current time to Orbeat format"
     )
+    add_output_argument(parser, "orbeat")
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running, printing a line each time the stamp changes",
+    )
+    parser.add_argument(
+        "--unit",
+        metavar="UNIT",
+        choices=["tick", "day", "week"],
+        default="tick",
+        help="Resolution for --watch: tick, day or week (default: tick)",
+    )
+    parser.add_argument(
+        "--count", metavar="N", type=int, help="Stop --watch after N lines"
+    )
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+    convert = commands.add_parser(
+        "convert", help="Convert Unix ms given as arguments or one per line on stdin"
+    )
+    convert.add_argument(
+        "ms", nargs="*", help="Unix timestamps in milliseconds or ISO-8601 times"
+    )
+    add_output_argument(convert, argparse.SUPPRESS)
+    decode = commands.add_parser(
+        "decode", help="Turn orbeat8 or UCY codes from arguments or stdin into times"
+    )
+    decode.add_argument("codes", nargs="*", metavar="CODE", help="Codes to decode")
+    decode.add_argument(
+        "--near",
+        metavar="TIME",
+        help="Unix ms or ISO time to resolve orbeat8 years around (default: now)",
+    )
+    decode.add_argument(
+        "--ms", action="store_true", help="Print Unix ms ranges instead of ISO times"
+    )
+    add_output_argument(decode, argparse.SUPPRESS)
+    merge = commands.add_parser(
+        "merge", help="Merge logs whose lines start with Orbeat codes, in time order"
+    )
+    merge.add_argument("files", nargs="+", metavar="FILE", help='Logs, "-" for stdin')
+    merge.add_argument(
+        "--near",
+        metavar="TIME",
+        help="Unix ms or ISO time near the first orbeat8 stamps (default: now)",
+    )
+    scan = commands.add_parser(
+        "scan", help="Find Orbeat codes in files and directory trees"
+    )
+    scan.add_argument("paths", nargs="+", metavar="PATH", help="Files or directories")
+    scan.add_argument(
+        "--near",
+        metavar="TIME",
+        help="Unix ms or ISO time to resolve orbeat8 years around (default: now)",
+    )
+    scan.add_argument(
+        "--jobs", type=int, default=1, help="Processes scanning files (default: 1)"
+    )
+    drift = commands.add_parser(
+        "drift", help="Summarize year start drift and equinox offsets over many years"
+    )
+    drift.add_argument(
+        "--first", type=int, default=0, help="First Orbeat year (default: 0)"
+    )
+    drift.add_argument(
+        "--last", type=int, default=4095, help="Last Orbeat year (default: 4095)"
+    )
+    calendar = commands.add_parser(
+        "calendar", help="Export the years, weeks or days of a range of years"
+    )
+    calendar.add_argument("first", type=int, help="First Orbeat year")
+    calendar.add_argument("last", type=int, help="Last Orbeat year")
+    calendar.add_argument(
+        "--unit",
+        choices=["year", "week", "day"],
+        default="day",
+        help="One row per year, week or day (default: day)",
+    )
+    calendar.add_argument(
+        "--format",
+        choices=["csv", "ndjson"],
+        default="csv",
+        help="csv with a header line, or ndjson (default: csv)",
+    )
+    commands.add_parser(
+        "calibrate",
+        help="Time the conversion engines here and save where each is fastest",
+    )
+    bench = commands.add_parser(
+        "bench", help="Benchmark conversions, optionally against a saved baseline"
+    )
+    bench.add_argument(
+        "--size",
+        type=int,
+        default=10000,
+        help="Timestamps per workload (default: 10000)",
+    )
+    bench.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Runs per benchmark, fastest counts (default: 5)",
+    )
+    bench.add_argument(
+        "--only", metavar="TEXT", help="Run only metrics whose name contains TEXT"
+    )
+    bench.add_argument(
+        "--save", metavar="FILE", help="Write the results as a JSON baseline"
+    )
+    bench.add_argument(
+        "--compare",
+        metavar="FILE",
+        help="Fail if any metric is slower than this baseline beyond tolerance",
+    )
+    bench.add_argument(
+        "--alloc",
+        action="store_true",
+        help="Report tracemalloc peak bytes and blocks per call instead of timings",
+    )
+    bench.add_argument(
+        "--threads",
+        metavar="N,N",
+        help="Report throughput scaling across these thread counts, e.g. 1,2,4,8",
+    )
+    bench.add_argument(
+        "--tolerance",
+        type=float,
+        help="Allowed slowdown as a fraction (default: 0.25)",
+    )
+    publish = commands.add_parser(
+        "publish", help="Keep the current stamp in shared memory for other processes"
+    )
+    publish.add_argument(
+        "--name",
+        default="orbeat_stamp",
+        help="Shared memory segment name (default: orbeat_stamp)",
+    )
+    serve = commands.add_parser(
+        "serve", help="Serve Orbeat conversions over HTTP (/now, /convert, /batch)"
+    )
+    serve.add_argument(
+        "--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)"
+    )
+    serve.add_argument(
+        "--port", type=int, default=8088, help="Port to bind (default: 8088)"
+    )
+    serve.add_argument(
+        "--bench",
+        metavar="REQUESTS",
+        type=int,
+        help="Load a loopback instance with REQUESTS per endpoint, then exit",
+    )
+    return parser.parse_args(args)
+
+
+def add_output_argument(parser, default):
     parser.add_argument(
         "--output",
         metavar="FORMAT",
-        choices=["json", "orbeat"],
-        default="orbeat",
-        help="Output format: json or orbeat (default: orbeat)",
+        choices=OUTPUT_FORMATS,
+        default=default,
+        help="Output: json, compact, ndjson or orbeat (default: orbeat)",
     )
-    return parser.parse_args(args)
 
 
 def format_output(orbeat, iso, output_format):
     if output_format == "json":
+        import json
+
         return json.dumps({"orbeat": orbeat, "iso": iso}, indent=2)
+    if output_format in ("compact", "ndjson"):
+        return NOW_TEMPLATE.format(orbeat, iso)
     return orbeat
 
 
-if __name__ == "__main__":
-    args = parse_args()
+def format_rows(values, output_format):
+    """
+    Format a batch of Unix ms as output rows.
+
+    JSON rows are filled into a template rather than built as dicts, which
+    is safe because Orbeat codes are plain octal digits and punctuation.
+
+    Args:
+        values (list): Unix timestamps in milliseconds
+        output_format (str): One of OUTPUT_FORMATS
+
+    Returns:
+        list: One string per timestamp, without separators
+    """
+    if output_format == "orbeat":
+        return to_orbeat8_many(values)
+    codes = convert_many(values, ["orbeat8", "ucy"])
+    return list(map(ROW_TEMPLATE.format, values, codes["orbeat8"], codes["ucy"]))
+
+
+def parse_ms(text):
+    """Read a Unix ms count or an ISO time, taking naive ISO times as UTC."""
+    try:
+        return int(text)
+    except ValueError:
+        return to_unix_ms(text)
+
+
+def read_chunks(lines, size=CHUNK_SIZE, parse=parse_ms):
+    """Group non-blank lines, parsed as Unix ms by default, into lists of up to size."""
+    chunk = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            chunk.append(parse(line))
+        except ValueError:
+            raise SystemExit(f"orbeat: invalid ms: {line[:32]}")
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def write_rows(row_chunks, output_format, out):
+    """
+    Stream chunks of formatted rows to out, flushing after each chunk.
+
+    Args:
+        row_chunks (iterable): Lists of rows from format_rows or decode_rows
+        output_format (str): One of OUTPUT_FORMATS
+        out (file): Text stream to write to
+    """
+    if output_format == "json":
+        import json
+
+        rows = [json.loads(row) for chunk in row_chunks for row in chunk]
+        out.write(json.dumps(rows, indent=2) + "\n")
+        return
+    if output_format == "compact":
+        out.write("[")
+        separator = ""
+        for chunk in row_chunks:
+            out.write(separator + ",".join(chunk))
+            out.flush()
+            separator = ","
+        out.write("]\n")
+        return
+    for chunk in row_chunks:
+        out.write("\n".join(chunk) + "\n")
+        out.flush()
+
+
+def write_batch(chunks, output_format, out):
+    """
+    Stream converted chunks of Unix ms to out, flushing after each chunk.
+
+    Args:
+        chunks (iterable): Lists of Unix timestamps in milliseconds
+        output_format (str): One of OUTPUT_FORMATS
+        out (file): Text stream to write to
+    """
+    rows = (format_rows(chunk, output_format) for chunk in chunks)
+    write_rows(rows, output_format, out)
+
+
+def parse_time(text):
+    """parse_ms for a single option value, exiting on bad input."""
+    try:
+        return parse_ms(text)
+    except ValueError:
+        raise SystemExit(f"orbeat: invalid time: {text[:32]}")
+
+
+def iso_ms(unix_ms):
+    from datetime import datetime, timedelta, timezone
+
+    epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+    return (epoch + timedelta(milliseconds=unix_ms)).isoformat(timespec="milliseconds")
+
+
+def decode_rows(codes, near_ms, as_ms, output_format):
+    """
+    Decode a chunk of orbeat8 or UCY codes, telling UCY by its underscores.
+
+    Args:
+        codes (list): orbeat8 or UCY codes
+        near_ms (int): Unix ms to resolve orbeat8 years around
+        as_ms (bool): Give Unix ms ranges rather than ISO start times
+        output_format (str): One of OUTPUT_FORMATS
+
+    Returns:
+        list: One string per code, without separators
+    """
+    ucy = sum("_" in code for code in codes)
+    try:
+        if not ucy:
+            ranges = from_orbeat8_many(codes, near_ms)
+        elif ucy == len(codes):
+            ranges = from_ucy_many(codes)
+        else:
+            ranges = [
+                from_ucy(code) if "_" in code else from_orbeat8(code, near_ms)
+                for code in codes
+            ]
+    except ValueError as error:
+        raise SystemExit(f"orbeat: {error}")
+    if output_format == "orbeat":
+        if as_ms:
+            return [f"{start} {end}" for start, end in ranges]
+        return [iso_ms(start) for start, _ in ranges]
+    show = str if as_ms else lambda unix_ms: f'"{iso_ms(unix_ms)}"'
+    return [
+        RANGE_TEMPLATE.format(code, show(start), show(end))
+        for code, (start, end) in zip(codes, ranges)
+    ]
+
+
+def format_row(unix_ms, output_format):
+    if output_format == "json":
+        import json
+
+        row = {"ms": unix_ms, "orbeat": to_orbeat8(unix_ms), "ucy": to_ucy(unix_ms)}
+        return json.dumps(row, indent=2)
+    return format_rows([unix_ms], output_format)[0]
+
+
+def watch(unit, output_format, out, count=None, clock=time.time, sleep=time.sleep):
+    """
+    Print the stamp now and again each time it changes at the given unit.
+
+    Sleeps until the computed next boundary instead of polling, and
+    flushes every line so piped readers see it immediately.
+
+    Args:
+        unit (str): "tick", "day" or "week"
+        output_format (str): One of OUTPUT_FORMATS
+        out (file): Text stream to write to
+        count (int, optional): Stop after this many lines. Defaults to never.
+        clock (callable, optional): Seconds since the Unix epoch. Defaults to time.time.
+        sleep (callable, optional): Sleeps for seconds. Defaults to time.sleep.
+    """
+    unix_ms = math.ceil(clock() * 1000)
+    while True:
+        out.write(format_row(unix_ms, output_format) + "\n")
+        out.flush()
+        if count is not None:
+            count -= 1
+            if count <= 0:
+                return
+        boundary = next_boundary_ms(unix_ms, unit)
+        now_ms = clock() * 1000
+        while now_ms < boundary:
+            sleep((boundary - now_ms) / 1000)
+            now_ms = clock() * 1000
+        # Round up: a tick boundary can fall on a fraction of a millisecond
+        unix_ms = math.ceil(now_ms)
+
+
+def main(args=None):
+    args = sys.argv[1:] if args is None else args
+    if not args:
+        # Prompt hooks run this constantly, so skip argparse, json and datetime
+        print(to_orbeat8(int(time.time() * 1000)))
+        return
+    args = parse_args(args)
+    if args.command == "convert":
+        chunks = read_chunks(args.ms or sys.stdin)
+        write_batch(chunks, args.output, sys.stdout)
+        return
+    if args.command == "decode":
+        near_ms = parse_time(args.near) if args.near else int(time.time() * 1000)
+        chunks = read_chunks(args.codes or sys.stdin, parse=str)
+        rows = (decode_rows(chunk, near_ms, args.ms, args.output) for chunk in chunks)
+        write_rows(rows, args.output, sys.stdout)
+        return
+    if args.command == "merge":
+        import orbeat_merge
+
+        near_ms = parse_time(args.near) if args.near else None
+        orbeat_merge.merge_files(args.files, sys.stdout, near_ms)
+        return
+    if args.command == "scan":
+        import orbeat_scan
+
+        near_ms = parse_time(args.near) if args.near else None
+        if args.jobs > 1:
+            from concurrent.futures import ProcessPoolExecutor
+
+            executor = ProcessPoolExecutor(args.jobs)
+        else:
+            executor = None
+        try:
+            for path, offset, code, (start, end) in orbeat_scan.scan_tree(
+                args.paths, near_ms, executor
+            ):
+                print(f"{path}:{offset}\t{code}\t{start}\t{end}")
+        finally:
+            if executor:
+                executor.shutdown()
+        return
+    if args.command == "drift":
+        import json, orbeat_drift
+
+        print(json.dumps(orbeat_drift.analyze(args.first, args.last + 1), indent=2))
+        return
+    if args.command == "calendar":
+        import orbeat_layout
+
+        orbeat_layout.export(
+            sys.stdout, args.first, args.last + 1, args.unit, args.format
+        )
+        return
+    if args.command == "calibrate":
+        import json, orbeat_engine
+
+        found = orbeat_engine.calibrate()
+        path = orbeat_engine.calibration_path()
+        print(json.dumps({"path": path, "thresholds": found}, indent=2))
+        return
+    if args.command == "bench":
+        import orbeat_bench
+
+        sys.exit(orbeat_bench.main(args))
+    if args.command == "publish":  # pragma: no cover
+        import orbeat_shared
+
+        publisher = orbeat_shared.StampPublisher(args.name)
+        try:
+            publisher.run()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            publisher.close()
+        return
+    if args.command == "serve":
+        import json, orbeat_serve
+
+        if args.bench:
+            print(json.dumps(orbeat_serve.bench(args.bench), indent=2))
+        else:  # pragma: no cover
+            orbeat_serve.serve(args.host, args.port)
+        return
+    if args.watch:
+        try:
+            watch(args.unit, args.output, sys.stdout, args.count)
+        except KeyboardInterrupt:
+            pass
+        except BrokenPipeError:
+            # The reader went away; keep the interpreter from failing on exit
+            import os
+
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return
     orbeat, iso = get_orbeat_time()
     print(format_output(orbeat, iso, args.output))
+
+
+if __name__ == "__main__":
+    main()
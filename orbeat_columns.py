@@ -0,0 +1,278 @@
+import mmap, os, struct
+from bisect import bisect_left
+from orbeat_time import DEFAULT_CALENDAR, MS_PER_DAY, OFFSET_MS, to_parts_many
+
+MAGIC = b"ORBC"
+VERSION = 1
+BLOCK_ROWS = 4096
+# Index offset and magic at the very end of the file
+TRAILER = struct.Struct("<Q4s")
+
+
+def _zigzag(n):
+    return n << 1 if n >= 0 else (-n << 1) - 1
+
+
+def _unzigzag(n):
+    return n >> 1 if not n & 1 else -((n + 1) >> 1)
+
+
+def _put(out, n):
+    while n > 0x7F:
+        out.append(n & 0x7F | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _get(data, pos):
+    n = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        n |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return n, pos
+        shift += 7
+
+
+def _put_runs(out, values):
+    runs = []
+    for value in values:
+        if runs and runs[-1][0] == value:
+            runs[-1][1] += 1
+        else:
+            runs.append([value, 1])
+    _put(out, len(runs))
+    for value, count in runs:
+        _put(out, _zigzag(value))
+        _put(out, count)
+
+
+def _get_runs(data, pos):
+    values = []
+    count, pos = _get(data, pos)
+    for _ in range(count):
+        value, pos = _get(data, pos)
+        run, pos = _get(data, pos)
+        values += [_unzigzag(value)] * run
+    return values, pos
+
+
+def _deltas(values):
+    previous, deltas = 0, []
+    for value in values:
+        deltas.append(value - previous)
+        previous = value
+    return deltas
+
+
+def _sums(deltas):
+    total, values = 0, []
+    for delta in deltas:
+        total += delta
+        values.append(total)
+    return values
+
+
+def _encode_block(unix_ms_values):
+    years, weeks, days, ms_into_days = [], [], [], []
+    for unix_ms, parts in zip(unix_ms_values, to_parts_many(unix_ms_values)):
+        years.append(parts[0])
+        weeks.append(parts[1])
+        days.append(parts[2])
+        ms_into_days.append((unix_ms + OFFSET_MS) % MS_PER_DAY)
+    out = bytearray()
+    _put(out, len(unix_ms_values))
+    _put_runs(out, years)
+    _put_runs(out, weeks)
+    _put_runs(out, _deltas(days))
+    for delta in _deltas(ms_into_days):
+        _put(out, _zigzag(delta))
+    return out
+
+
+class ColumnWriter:
+    """
+    Write Unix ms timestamps as Orbeat parts, column by column.
+
+    Rows go into blocks of block_rows. In each block, year and week are
+    run-length encoded and day is delta then run-length encoded. The ms
+    into the day, which gives the fraction exactly, is stored as deltas,
+    all as zigzag varints. Sorted events cost two or three bytes each. A
+    footer lists every block's offset, row count and time range for
+    ColumnReader.
+    """
+
+    def __init__(self, path, block_rows=BLOCK_ROWS):
+        self.file = open(path, "wb")
+        self.file.write(MAGIC + bytes([VERSION]))
+        self.block_rows = block_rows
+        self._pending = []
+        self._index = []
+
+    def write(self, unix_ms_values):
+        """
+        Add timestamps, ideally in time order.
+
+        Args:
+            unix_ms_values (iterable): Whole Unix ms from the datum on
+        """
+        for unix_ms in unix_ms_values:
+            if unix_ms != int(unix_ms) or unix_ms + OFFSET_MS < 0:
+                raise ValueError(f"not a whole ms from the datum on: {unix_ms!r}")
+            self._pending.append(int(unix_ms))
+            if len(self._pending) == self.block_rows:
+                self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        rows = self._pending
+        self._index.append((self.file.tell(), len(rows), min(rows), max(rows)))
+        self.file.write(_encode_block(rows))
+        self._pending = []
+
+    def close(self):
+        """Write the last block and the footer."""
+        self._flush()
+        at = self.file.tell()
+        out = bytearray()
+        _put(out, len(self._index))
+        for offset, rows, low, high in self._index:
+            for n in (offset, rows, _zigzag(low), _zigzag(high)):
+                _put(out, n)
+        self.file.write(out + TRAILER.pack(at, MAGIC))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ColumnReader:
+    """
+    Read a file from ColumnWriter through a memory map.
+
+    Only the footer is read when the file opens. Each block is decoded
+    when asked for, so a range scan touches just the blocks whose time
+    range overlaps it.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            # Too short for the header and trailer, or empty, which mmap refuses
+            if os.fstat(file.fileno()).st_size < 5 + TRAILER.size:
+                raise ValueError("not an Orbeat column file")
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        at, magic = TRAILER.unpack_from(self.data, len(self.data) - TRAILER.size)
+        if self.data[:4] != MAGIC or magic != MAGIC:
+            raise ValueError("not an Orbeat column file")
+        if self.data[4] != VERSION:
+            raise ValueError(f"unsupported version: {self.data[4]}")
+        count, pos = _get(self.data, at)
+        self.blocks = []
+        for _ in range(count):
+            fields = []
+            for _ in range(4):
+                n, pos = _get(self.data, pos)
+                fields.append(n)
+            offset, rows, low, high = fields
+            self.blocks.append((offset, rows, _unzigzag(low), _unzigzag(high)))
+        self._lows = [block[2] for block in self.blocks]
+
+    def __len__(self):
+        return sum(block[1] for block in self.blocks)
+
+    def _columns(self, index):
+        data, pos = self.data, self.blocks[index][0]
+        rows, pos = _get(data, pos)
+        years, pos = _get_runs(data, pos)
+        weeks, pos = _get_runs(data, pos)
+        days, pos = _get_runs(data, pos)
+        deltas = []
+        for _ in range(rows):
+            n, pos = _get(data, pos)
+            deltas.append(_unzigzag(n))
+        return years, weeks, _sums(days), _sums(deltas)
+
+    def block_parts(self, index):
+        """
+        Decode one block into time components.
+
+        Args:
+            index (int): Block number
+
+        Returns:
+            list: (year, week, day, fracs) tuples as to_parts_many gives them
+        """
+        years, weeks, days, ms_into_days = self._columns(index)
+        return [
+            (year, week, day, ms_into_day / MS_PER_DAY)
+            for year, week, day, ms_into_day in zip(years, weeks, days, ms_into_days)
+        ]
+
+    def block_ms(self, index):
+        """
+        Decode one block back into Unix ms.
+
+        Args:
+            index (int): Block number
+
+        Returns:
+            list: Unix timestamps in milliseconds, in written order
+        """
+        calendar = DEFAULT_CALENDAR
+        values, spans = [], {}
+        columns = zip(*self._columns(index))
+        for year, week, day, ms_into_day in columns:
+            span = spans.get(year)
+            if span is None:
+                start = calendar.year_start(year)
+                length = calendar.year_start(year + 1) - start
+                base = 0 if length == calendar.standard_year else 1
+                span = spans[year] = (start, base)
+            start, base = span
+            days = start + (week - base) * 8 + (day - start) % 8
+            values.append(days * MS_PER_DAY + ms_into_day - OFFSET_MS)
+        return values
+
+    def between(self, start, end):
+        """
+        Find the stored timestamps from start up to before end.
+
+        Blocks are found by binary search on their first timestamp when
+        the file was written in order, and by their ranges otherwise.
+
+        Args:
+            start (int): First Unix ms included
+            end (int): First Unix ms excluded
+
+        Returns:
+            list: Unix ms in written order
+        """
+        if self._lows == sorted(self._lows):
+            first = max(bisect_left(self._lows, start) - 1, 0)
+            last = bisect_left(self._lows, end)
+        else:
+            first, last = 0, len(self.blocks)
+        found = []
+        for index in range(first, last):
+            _, _, low, high = self.blocks[index]
+            if high >= start and low < end:
+                found += [ms for ms in self.block_ms(index) if start <= ms < end]
+        return found
+
+    def __iter__(self):
+        for index in range(len(self.blocks)):
+            yield from self.block_ms(index)
+
+    def close(self):
+        self.data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,172 @@
+import math
+from orbeat_time import DEFAULT_CALENDAR, MS_PER_DAY
+
+# Orbeat years analyzed by default: 0 through 4095, 44 BCE to 4052 CE
+ANALYSIS_YEARS = 4096
+# Meeus, Astronomical Algorithms, tables 27.A and 27.B: the Julian Ephemeris
+# Day of the March equinox as a quartic in thousands of years from an origin
+# year, fitted for -1000 to 1000 and 1000 to 3000 and extrapolated beyond
+EQUINOX_BEFORE_1000 = (0, (1721139.29189, 365242.13740, 0.06134, 0.00111, -0.00071))
+EQUINOX_FROM_1000 = (2000, (2451623.80984, 365242.37404, 0.05169, -0.00411, -0.00057))
+# Laskar (1986): the mean tropical year in days as a cubic in Julian
+# centuries from J2000.0, fitted for 10,000 years either side of it
+TROPICAL_YEAR = (365.2421896698, -6.15359e-6, -7.29e-10, 2.64e-10)
+J2000_JD = 2451545.0
+
+
+def equinox_jd_many(years):
+    """
+    Approximate the March equinox of many years.
+
+    Good to a few minutes in the fitted range, drifting to hours in the
+    millennia beyond it. Julian Ephemeris Days are taken as Julian Days,
+    ignoring Delta T: about a minute now, but hours in antiquity.
+
+    Args:
+        years (iterable): Astronomical years, 1 BCE being 0
+
+    Returns:
+        list: Julian Days of the equinoxes
+    """
+    jds = []
+    for year in years:
+        origin, (a, b, c, d, e) = (
+            EQUINOX_FROM_1000 if year >= 1000 else EQUINOX_BEFORE_1000
+        )
+        t = (year - origin) / 1000
+        jds.append(a + t * (b + t * (c + t * (d + t * e))))
+    return jds
+
+
+def _day_zero_jd(calendar):
+    # Julian Day at the start of day 0: midnight UTC at JDN - 0.5, then dawn
+    return calendar.datum_jdn - 0.5 - calendar.dawn_ms / MS_PER_DAY
+
+
+def datum_year(calendar=DEFAULT_CALENDAR):
+    """Astronomical year whose March equinox is nearest the datum."""
+    a, b = EQUINOX_BEFORE_1000[1][:2]
+    return round((_day_zero_jd(calendar) - a) / b * 1000)
+
+
+def tropical_days_many(years, calendar=DEFAULT_CALENDAR):
+    """
+    Count the days in whole mean tropical years from the start of year 0.
+
+    Each year is as long as TROPICAL_YEAR gives at its own time, so the
+    count follows the year's slow shortening rather than a fixed length.
+
+    Args:
+        years (iterable): Orbeat years
+        calendar (OrbeatCalendar, optional): Defaults to DEFAULT_CALENDAR.
+
+    Returns:
+        list: Days from the start of year 0 to where each year would start
+    """
+    # Centuries per year, and the integral of TROPICAL_YEAR over centuries
+    step = TROPICAL_YEAR[0] / 36525
+    begin = (_day_zero_jd(calendar) - J2000_JD) / 36525
+    a, b, c, d = [a / (i + 1) for i, a in enumerate(TROPICAL_YEAR)]
+    zero = begin * (a + begin * (b + begin * (c + begin * d)))
+    days = []
+    for year in years:
+        t = begin + year * step
+        days.append((t * (a + t * (b + t * (c + t * d))) - zero) / step)
+    return days
+
+
+def drift_many(first=0, last=ANALYSIS_YEARS, calendar=DEFAULT_CALENDAR):
+    """
+    Measure how far each year start is from a count of mean tropical years.
+
+    Args:
+        first (int, optional): First Orbeat year. Defaults to 0.
+        last (int, optional): Year after the last one. Defaults to 4096.
+        calendar (OrbeatCalendar, optional): Defaults to DEFAULT_CALENDAR.
+
+    Returns:
+        list: Days the start of each year is past tropical_days_many's
+            count for it, which the calendar's fixed year length lets grow
+    """
+    starts = calendar.year_starts(first, last)
+    tropical = tropical_days_many(range(first, last), calendar)
+    return [start - days for start, days in zip(starts, tropical)]
+
+
+def equinox_offsets(first=0, last=ANALYSIS_YEARS, calendar=DEFAULT_CALENDAR):
+    """
+    Measure how far each year start is from the March equinox it follows.
+
+    Args:
+        first (int, optional): First Orbeat year. Defaults to 0.
+        last (int, optional): Year after the last one. Defaults to 4096.
+        calendar (OrbeatCalendar, optional): Defaults to DEFAULT_CALENDAR.
+
+    Returns:
+        list: Days each year starts after its equinox, negative if before
+    """
+    zero = _day_zero_jd(calendar)
+    shift = datum_year(calendar)
+    equinoxes = equinox_jd_many(range(first + shift, last + shift))
+    starts = calendar.year_starts(first, last)
+    return [zero + start - jd for start, jd in zip(starts, equinoxes)]
+
+
+def summarize(values, first=0):
+    """
+    Describe a yearly series.
+
+    Args:
+        values (list): One value per year, not empty
+        first (int, optional): Year of the first value. Defaults to 0.
+
+    Returns:
+        dict: min and max with the years they fall in, mean, stdev
+            (population) and slope, the least-squares trend per 1000 years
+    """
+    n = len(values)
+    if not n:
+        raise ValueError("no years to summarize")
+    mean = math.fsum(values) / n
+    low = min(range(n), key=values.__getitem__)
+    high = max(range(n), key=values.__getitem__)
+    # Years centred on their mean, so the slope needs one pass
+    middle = (n - 1) / 2
+    spread = n * (n * n - 1) / 12
+    slope = math.fsum((i - middle) * value for i, value in enumerate(values))
+    return {
+        "min": values[low],
+        "min_year": first + low,
+        "max": values[high],
+        "max_year": first + high,
+        "mean": mean,
+        "stdev": math.sqrt(math.fsum((value - mean) ** 2 for value in values) / n),
+        "slope": slope / spread * 1000 if n > 1 else 0.0,
+    }
+
+
+def analyze(first=0, last=ANALYSIS_YEARS, calendar=DEFAULT_CALENDAR):
+    """
+    Summarize year start drift and equinox alignment over a span of years.
+
+    Every year in the span is computed, not a sample: the year starts come
+    from the calendar's cycle table a slice at a time, and the equinoxes
+    from one polynomial each, so 4096 years take a few milliseconds.
+
+    Args:
+        first (int, optional): First Orbeat year. Defaults to 0.
+        last (int, optional): Year after the last one. Defaults to 4096.
+        calendar (OrbeatCalendar, optional): Defaults to DEFAULT_CALENDAR.
+
+    Returns:
+        dict: First and last years, the datum's astronomical year, and
+            summarize() of drift_many as "drift" and of equinox_offsets as
+            "equinox", all in days
+    """
+    return {
+        "first": first,
+        "last": last - 1,
+        "datum_year": datum_year(calendar),
+        "drift": summarize(drift_many(first, last, calendar), first),
+        "equinox": summarize(equinox_offsets(first, last, calendar), first),
+    }
@@ -0,0 +1,185 @@
+import math
+from orbeat_index import key_from_parts, parts_from_key
+from orbeat_time import DEFAULT_CALENDAR, TICKS_PER_DAY
+
+UNITS = ["tick", "day", "week", "year"]
+# Ticks in each unit that is a fixed length
+UNIT_TICKS = {"tick": 1, "day": TICKS_PER_DAY, "week": 8 * TICKS_PER_DAY}
+
+
+class _Years:
+    """Year spans seen so far, for one run of arithmetic on one calendar."""
+
+    def __init__(self, calendar):
+        self.calendar = calendar
+        self.spans = {}
+
+    def span(self, year):
+        span = self.spans.get(year)
+        if span is None:
+            start, end = self.calendar.year_bounds(year)
+            base = 0 if end - start == self.calendar.standard_year else 1
+            span = self.spans[year] = (start, end, base)
+        return span
+
+    def position(self, year, week, day, frac):
+        start, _, base = self.span(year)
+        return start + (week - base) * 8 + day, frac
+
+    def add(self, parts_values, n, unit):
+        if unit == "year":
+            return [self.add_years(parts, n) for parts in parts_values]
+        # Whole days stay integers; only the leftover ticks touch the fraction
+        step, ticks = divmod(n * UNIT_TICKS[unit], TICKS_PER_DAY)
+        step_frac = ticks / TICKS_PER_DAY
+        spans, year_span = self.spans, self.calendar.year_span
+        moved = []
+        append = moved.append
+        to_year = to_start = to_end = to_base = 0
+        for year, week, day, frac in parts_values:
+            span = spans.get(year) or self.span(year)
+            days = span[0] + (week - span[2]) * 8 + day + step
+            frac += step_frac
+            if frac >= 1:
+                days, frac = days + 1, frac - 1
+            if not to_start <= days < to_end:
+                to_year, to_start, to_end = year_span(days)
+                to_base = self.span(to_year)[2]
+            append((to_year, to_base + (days - to_start) // 8, days % 8, frac))
+        return moved
+
+    def add_years(self, parts, n):
+        year, week, day, frac = parts
+        start, end, base = self.span(year + n)
+        week = min(max(week, base), base + (end - start) // 8 - 1)
+        return year + n, week, day, frac
+
+    def difference(self, laters, earliers, unit):
+        if unit == "year":
+            return list(map(self.difference_years, laters, earliers))
+        size, spans, floor = UNIT_TICKS[unit], self.spans, math.floor
+        counts = []
+        for (year, week, day, frac), (e_year, e_week, e_day, e_frac) in zip(
+            laters, earliers
+        ):
+            span = spans.get(year) or self.span(year)
+            e_span = spans.get(e_year) or self.span(e_year)
+            days = span[0] + (week - span[2]) * 8 + day
+            days -= e_span[0] + (e_week - e_span[2]) * 8 + e_day
+            ticks = days * TICKS_PER_DAY + floor((frac - e_frac) * TICKS_PER_DAY)
+            counts.append(ticks // size)
+        return counts
+
+    def difference_years(self, later, earlier):
+        years = later[0] - earlier[0]
+        if self.position(*later) < self.position(*self.add_years(earlier, years)):
+            years -= 1
+        return years
+
+
+def _check(unit):
+    if unit not in UNITS:
+        raise ValueError(f"unknown unit: {unit}")
+
+
+def add(parts, n, unit="day", calendar=DEFAULT_CALENDAR):
+    """
+    Move time components by whole ticks, days, weeks or years.
+
+    Ticks, days and weeks move through the days in between, so they cross
+    into the next year with its own length and, in short years, its first
+    week numbered 1. Years keep the week and day, moved into the nearest
+    week the new year has: week 0 of a long year lands on week 1 of a
+    short one. Year starts come from the calendar's cycle table.
+
+    Args:
+        parts (tuple): (year, week, day, frac) from the datum on
+        n (int): Units to add, negative to go back
+        unit (str, optional): "tick", "day", "week" or "year". Defaults to "day".
+        calendar (OrbeatCalendar, optional): Defaults to DEFAULT_CALENDAR.
+
+    Returns:
+        tuple: (year, week, day, frac)
+    """
+    _check(unit)
+    return _Years(calendar).add([parts], n, unit)[0]
+
+
+def add_many(parts_values, n, unit="day", calendar=DEFAULT_CALENDAR):
+    """
+    Move many time components by the same amount, sharing year lookups.
+
+    Args:
+        parts_values (iterable): (year, week, day, frac) tuples
+        n (int): Units to add, negative to go back
+        unit (str, optional): "tick", "day", "week" or "year". Defaults to "day".
+        calendar (OrbeatCalendar, optional): Defaults to DEFAULT_CALENDAR.
+
+    Returns:
+        list: (year, week, day, frac) tuples in input order
+    """
+    _check(unit)
+    return _Years(calendar).add(parts_values, n, unit)
+
+
+def difference(later, earlier, unit="day", calendar=DEFAULT_CALENDAR):
+    """
+    Count the whole units from one moment to another.
+
+    The result is the largest n for which add(earlier, n, unit) is not
+    past later, so it is negative when later comes first.
+
+    Args:
+        later (tuple): (year, week, day, frac)
+        earlier (tuple): (year, week, day, frac)
+        unit (str, optional): "tick", "day", "week" or "year". Defaults to "day".
+        calendar (OrbeatCalendar, optional): Defaults to DEFAULT_CALENDAR.
+
+    Returns:
+        int: Whole units between them
+    """
+    _check(unit)
+    return _Years(calendar).difference([later], [earlier], unit)[0]
+
+
+def difference_many(laters, earliers, unit="day", calendar=DEFAULT_CALENDAR):
+    """
+    Count the whole units between pairs of moments, sharing year lookups.
+
+    Args:
+        laters (iterable): (year, week, day, frac) tuples
+        earliers (iterable): (year, week, day, frac) tuples, paired in order
+        unit (str, optional): "tick", "day", "week" or "year". Defaults to "day".
+        calendar (OrbeatCalendar, optional): Defaults to DEFAULT_CALENDAR.
+
+    Returns:
+        list: Whole units between each pair
+    """
+    _check(unit)
+    return _Years(calendar).difference(laters, earliers, unit)
+
+
+def _key_parts(key):
+    year, week, day, tick = parts_from_key(key)
+    return year, week, day, tick / TICKS_PER_DAY
+
+
+def add_key(key, n, unit="day"):
+    """
+    add on a packed key from orbeat_index.
+
+    Returns:
+        int: Key of the moved tick
+    """
+    return key_from_parts(*add(_key_parts(key), n, unit))
+
+
+def add_keys(keys, n, unit="day"):
+    """add_many on packed keys from orbeat_index."""
+    moved = add_many(map(_key_parts, keys), n, unit)
+    return [key_from_parts(*parts) for parts in moved]
+
+
+def difference_keys(later, earlier, unit="day"):
+    """difference between two packed keys from orbeat_index."""
+    return difference(_key_parts(later), _key_parts(earlier), unit)
@@ -0,0 +1,327 @@
+import os, threading, time
+import orbeat_time
+from orbeat_time import _convert_chunk, _format_orbeat8, _format_ucy
+from orbeat_time import FORMAT_WIDTHS, OrbeatCalendar, convert_many as _convert_many
+from orbeat_time import to_unix_ms_many
+
+ENGINES = ["scalar", "batch", "pool"]
+# Force one engine, e.g. ORBEAT_ENGINE=batch; pool only once start_pool() ran
+ENGINE_ENV = "ORBEAT_ENGINE"
+# Fixed thresholds instead of a calibration, e.g. ORBEAT_THRESHOLDS=batch=2,pool=none
+THRESHOLDS_ENV = "ORBEAT_THRESHOLDS"
+# Where calibration results are kept, instead of the user cache directory
+CALIBRATION_ENV = "ORBEAT_CALIBRATION"
+# Smallest batch each engine takes, when nothing is calibrated or set
+DEFAULT_THRESHOLDS = {"batch": 2, "pool": None}
+SCALAR_SIZES = [1, 2, 4, 8, 16, 32]
+POOL_SIZES = [2**16, 2**18]
+_FORMATTERS = {"orbeat8": _format_orbeat8, "ucy": _format_ucy}
+# Guards _thresholds and _pool, so concurrent first batches read the
+# calibration file once and start_pool() starts one pool
+_lock = threading.Lock()
+_thresholds = None
+_pool = None
+
+
+def _machine():
+    import platform
+
+    # Calibration is redone when any of these change
+    return (
+        f"{platform.python_implementation()} {platform.python_version()}"
+        f" {platform.machine()} cpus={os.cpu_count()}"
+    )
+
+
+def calibration_path():
+    """Calibration file: ORBEAT_CALIBRATION, else orbeat/engine.json in the user cache."""
+    path = os.environ.get(CALIBRATION_ENV)
+    if path:
+        return path
+    cache = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(cache, "orbeat", "engine.json")
+
+
+def parse_thresholds(text):
+    """
+    Read thresholds written as "batch=2,pool=262144".
+
+    Args:
+        text (str): Comma-separated engine=size pairs, "none" to never
+            use an engine
+
+    Returns:
+        dict: Thresholds, with DEFAULT_THRESHOLDS for engines not named
+    """
+    found = dict(DEFAULT_THRESHOLDS)
+    for pair in text.split(","):
+        name, _, size = pair.strip().partition("=")
+        if name not in found:
+            raise ValueError(f"unknown engine: {name}")
+        found[name] = None if size.lower() == "none" else int(size)
+    return found
+
+
+def _scalar(values, formats, calendar=None):
+    if 0 in values:
+        # The scalar functions read 0 as now, the batch path as the epoch
+        return _batch(values, formats, calendar)
+    # Looked up per batch, so orbeat_stats sees these calls when enabled
+    to_parts = calendar.to_parts_from_ms if calendar else orbeat_time.to_parts_from_ms
+    parts = [to_parts(unix_ms) for unix_ms in values]
+    return [[_FORMATTERS[name](*item) for item in parts] for name in formats]
+
+
+def _batch(values, formats, calendar=None):
+    if calendar is None:
+        return _convert_chunk(values, formats)
+    parts = calendar.to_parts_many(values)
+    return [[_FORMATTERS[name](*item) for item in parts] for name in formats]
+
+
+def start_pool():
+    """
+    Start the process pool, one worker per CPU, for batches from the pool
+    threshold up.
+
+    Nothing starts it implicitly: without it every batch stays in this
+    process. Start it before any threads, as its workers are forked.
+
+    Returns:
+        ProcessPoolExecutor: The pool, the running one if already started
+    """
+    global _pool
+    with _lock:
+        if _pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+
+            _pool = ProcessPoolExecutor(_workers())
+        return _pool
+
+
+def stop_pool():
+    """Shut the process pool down, so batches stay in this process again."""
+    global _pool
+    with _lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+def _workers():
+    return os.cpu_count() or 1
+
+
+def _pooled(values, formats, pool):
+    # One chunk per worker, so every core gets an equal share
+    chunk_size = max(1, -(-len(values) // _workers()))
+    return _convert_many(values, formats, pool, chunk_size)
+
+
+def _best(run, values, repeat=3):
+    # Fastest of a few runs, each long enough for the timer
+    loops = max(1, 2048 // len(values))
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(loops):
+            run(values)
+        best = min(best, (time.perf_counter() - started) / loops)
+    return best
+
+
+def calibrate(path=None):
+    """
+    Time the engines on this machine, save where each starts to win and
+    use that from now on.
+
+    Only ever run on request, e.g. by "orbeat calibrate". The scalar
+    functions are timed against the batch path on a few tiny sizes, which
+    takes well under a second. With more than one CPU a process pool is
+    started for the timing, tried on warm workers at a few hundred
+    thousand timestamps at most, and shut down again. The timing uses its
+    own calendar, so orbeat_stats does not count it.
+
+    Args:
+        path (str, optional): File to save to. Defaults to calibration_path().
+
+    Returns:
+        dict: Thresholds, the smallest batch each engine is used for, None
+            for an engine that never won
+    """
+    global _thresholds
+    calendar = OrbeatCalendar()
+    base = 1700000000000
+    found = dict(DEFAULT_THRESHOLDS)
+    found["batch"] = SCALAR_SIZES[-1] * 2
+    for size in SCALAR_SIZES:
+        values = list(range(base, base + size * 86399999, 86399999))
+        scalar = _best(lambda chunk: _scalar(chunk, ["orbeat8"], calendar), values)
+        batch = _best(lambda chunk: _batch(chunk, ["orbeat8"], calendar), values)
+        if batch <= scalar:
+            found["batch"] = size
+            break
+    if _workers() > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(_workers()) as pool:
+            # Warm every worker first, so start-up is not counted
+            _pooled([base] * _workers(), ["orbeat8"], pool)
+            for size in POOL_SIZES:
+                values = list(range(base, base + size * 1000, 1000))
+                batch = _best(
+                    lambda chunk: _batch(chunk, ["orbeat8"], calendar), values, 1
+                )
+                pooled = _best(
+                    lambda chunk: _pooled(chunk, ["orbeat8"], pool), values, 1
+                )
+                if pooled < batch:
+                    found["pool"] = size
+                    break
+    _save(path or calibration_path(), {"machine": _machine(), "thresholds": found})
+    with _lock:
+        _thresholds = found
+    return found
+
+
+def _save(path, data):
+    import json, tempfile
+
+    # Written beside the target and renamed over it, so readers never see
+    # half a file
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        os.makedirs(directory, exist_ok=True)
+        handle, temp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    except OSError:
+        # Nowhere to save it; this process still uses the result
+        return
+    try:
+        with os.fdopen(handle, "w") as file:
+            json.dump(data, file, indent=2)
+        os.replace(temp, path)
+    except OSError:
+        os.unlink(temp)
+
+
+def thresholds():
+    """
+    Find the engine thresholds, never calibrating.
+
+    ORBEAT_THRESHOLDS wins if set. Otherwise the calibration file is
+    used if it was made on the same Python, architecture and CPU count,
+    else DEFAULT_THRESHOLDS. The result is kept for the life of the
+    process.
+
+    Returns:
+        dict: Smallest batch for "batch" and "pool", None for never
+    """
+    global _thresholds
+    found = _thresholds
+    if found is not None:
+        return found
+    with _lock:
+        if _thresholds is None:
+            _thresholds = _load_thresholds()
+        return _thresholds
+
+
+def _load_thresholds():
+    text = os.environ.get(THRESHOLDS_ENV)
+    if text:
+        return parse_thresholds(text)
+    try:
+        with open(calibration_path()) as file:
+            # Only loaded when there is a file, to keep CLI start-up fast
+            import json
+
+            saved = json.load(file)
+        if saved["machine"] == _machine():
+            return {**DEFAULT_THRESHOLDS, **saved["thresholds"]}
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return dict(DEFAULT_THRESHOLDS)
+
+
+def reset():
+    """Forget the thresholds, so the next batch reads them again."""
+    global _thresholds
+    with _lock:
+        _thresholds = None
+
+
+def choose(values):
+    """
+    Pick the engine for a batch by its size and the type of its items.
+
+    The scalar functions only take numbers, so a tiny batch goes to them
+    only if every item is an int or float. The pool is used only from
+    its threshold up, and only once start_pool() has started it; a forced
+    pool without one is the batch path.
+
+    Args:
+        values (list): Timestamps in the batch
+
+    Returns:
+        str: One of ENGINES
+    """
+    forced = os.environ.get(ENGINE_ENV)
+    if forced:
+        if forced not in ENGINES:
+            raise ValueError(f"unknown engine: {forced}")
+        return "batch" if forced == "pool" and _pool is None else forced
+    limits = thresholds()
+    size = len(values)
+    if _pool is not None and limits["pool"] is not None and size >= limits["pool"]:
+        return "pool"
+    if limits["batch"] is None or size < limits["batch"]:
+        if all(type(value) in (int, float) for value in values):
+            return "scalar"
+    return "batch"
+
+
+def convert_many(unix_ms_values, formats=("orbeat8",), unit="ms"):
+    """
+    convert_many with the engine picked for each batch.
+
+    Args:
+        unix_ms_values (iterable): Unix timestamps, ISO-8601 strings or
+            datetimes, as the batch APIs take them
+        formats (iterable, optional): Names from FORMAT_WIDTHS. Defaults to ("orbeat8",).
+        unit (str, optional): Unit of numbers: "s", "ms", "us" or "ns". Defaults to "ms".
+
+    Returns:
+        dict: List of codes in input order keyed by format name
+    """
+    formats = list(formats)
+    for name in formats:
+        if name not in FORMAT_WIDTHS:
+            raise ValueError(f"unknown format: {name}")
+    return dict(zip(formats, _codes(unix_ms_values, formats, unit)))
+
+
+def _codes(unix_ms_values, formats, unit):
+    if unit != "ms":
+        values = to_unix_ms_many(unix_ms_values, unit)
+    elif unix_ms_values.__class__ is list:
+        values = unix_ms_values
+    else:
+        values = list(unix_ms_values)
+    pool = _pool
+    engine = choose(values)
+    if engine == "pool" and pool is not None:
+        pooled = _pooled(values, formats, pool)
+        return [pooled[name] for name in formats]
+    if engine == "scalar":
+        return _scalar(values, formats)
+    return _convert_chunk(values, formats)
+
+
+def to_orbeat8_many(unix_ms_values, unit="ms"):
+    """to_orbeat8_many with the engine picked for the batch."""
+    return _codes(unix_ms_values, ["orbeat8"], unit)[0]
+
+
+def to_ucy_many(unix_ms_values, unit="ms"):
+    """to_ucy_many with the engine picked for the batch."""
+    return _codes(unix_ms_values, ["ucy"], unit)[0]
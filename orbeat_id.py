@@ -0,0 +1,192 @@
+import os, threading, time, weakref
+from orbeat_index import KEY_BIAS, KEY_BYTES, to_key
+from orbeat_time import next_tick_ms
+
+# Below the biased stamp key: node, thread slot, then the per-tick counter
+NODE_BITS, THREAD_BITS, COUNTER_BITS = 16, 16, 32
+THREAD_SLOTS = 1 << THREAD_BITS
+THREAD_SHIFT = COUNTER_BITS
+NODE_SHIFT = THREAD_SHIFT + THREAD_BITS
+KEY_SHIFT = NODE_SHIFT + NODE_BITS
+COUNTER_LIMIT = 1 << COUNTER_BITS
+ID_BYTES = KEY_BYTES + KEY_SHIFT // 8
+
+# Generators whose node is the process ID, taken again in forked children
+_pid_nodes = weakref.WeakSet()
+
+
+def _pid_node():
+    # Distinct between live processes on a host while PIDs stay below 2**16
+    return os.getpid() & ((1 << NODE_BITS) - 1)
+
+
+def _after_fork():
+    for generator in list(_pid_nodes):
+        generator.node = _pid_node()
+        generator._local = threading.local()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+class _Owner:
+    # Dies with its thread's locals, handing the thread's slot back
+    __slots__ = ["__weakref__"]
+
+
+class IdGenerator:
+    """
+    Make unique 128-bit IDs that sort by the Orbeat tick they were made in.
+
+    An ID is the stamp key from orbeat_index, a node field for the
+    process, a slot for the thread and a counter within the tick. Each
+    thread keeps its own counter and cached tick, so making an ID takes
+    no lock, and the tick is only converted again once its boundary has
+    passed. When the clock steps back, a thread stays on the last tick
+    it used and keeps counting there. A thread that uses up a tick's
+    counter moves on to the next key early. A thread's slot is handed
+    back when it ends, with its key and count, so the next thread to
+    take it carries on above the IDs already made in it.
+    """
+
+    def __init__(self, node=None, clock=time.time):
+        """
+        Args:
+            node (int, optional): Process or host number below 2**16, kept
+                distinct between the processes making IDs. Defaults to the
+                low 16 bits of the process ID, taken again in forked
+                children. Pass a node when IDs come from several hosts, or
+                from a host whose PIDs can pass 2**16.
+            clock (callable, optional): Returns Unix seconds. Defaults to time.time.
+        """
+        if node is None:
+            node = _pid_node()
+            _pid_nodes.add(self)
+        elif not 0 <= node < 1 << NODE_BITS:
+            raise ValueError(f"node must be below {1 << NODE_BITS}")
+        self.node = node
+        self._clock = clock
+        self._local = threading.local()
+        # States of ended threads, and a lock for taking one or a new slot
+        self._free = []
+        self._slots_lock = threading.Lock()
+        self._next_slot = 0
+
+    def _state(self):
+        with self._slots_lock:
+            if self._free:
+                state = self._free.pop()
+            elif self._next_slot < THREAD_SLOTS:
+                # [tick end (ms), key, base ID for the key, next count, slot]
+                state = [float("-inf"), None, 0, 0, self._next_slot]
+                self._next_slot += 1
+            else:
+                raise RuntimeError(f"all {THREAD_SLOTS} thread slots are in use")
+        if state[1] is not None:
+            # The node may have changed since, after a fork
+            state[2] = (state[1] + KEY_BIAS) << KEY_SHIFT | self._low(state)
+        owner = self._local.owner = _Owner()
+        weakref.finalize(owner, self._free.append, state)
+        self._local.state = state
+        return state
+
+    def _low(self, state):
+        return (self.node << NODE_SHIFT) | (state[4] << THREAD_SHIFT)
+
+    def _refresh(self, state, unix_ms):
+        key = to_key(unix_ms)
+        state[0] = next_tick_ms(unix_ms)
+        if state[1] is None or key > state[1]:
+            self._start_key(state, key)
+
+    def _start_key(self, state, key):
+        base = (key + KEY_BIAS) << KEY_SHIFT | self._low(state)
+        state[1], state[2], state[3] = key, base, 0
+
+    def new_id(self):
+        """
+        Make one ID.
+
+        Returns:
+            int: 128-bit ID, larger than any made before on this thread
+        """
+        try:
+            state = self._local.state
+        except AttributeError:
+            state = self._state()
+        unix_ms = self._clock() * 1000
+        if unix_ms >= state[0]:
+            self._refresh(state, unix_ms)
+        count = state[3]
+        if count == COUNTER_LIMIT:
+            self._start_key(state, state[1] + 1)
+            count = 0
+        state[3] = count + 1
+        return state[2] | count
+
+    def take(self, n):
+        """
+        Make n IDs at once, reading the clock only once.
+
+        Args:
+            n (int): Number of IDs
+
+        Returns:
+            list: IDs in increasing order
+        """
+        try:
+            state = self._local.state
+        except AttributeError:
+            state = self._state()
+        unix_ms = self._clock() * 1000
+        if unix_ms >= state[0]:
+            self._refresh(state, unix_ms)
+        ids = []
+        while n > 0:
+            if state[3] == COUNTER_LIMIT:
+                self._start_key(state, state[1] + 1)
+            count = min(n, COUNTER_LIMIT - state[3])
+            start = state[2] | state[3]
+            ids += range(start, start + count)
+            state[3] += count
+            n -= count
+        return ids
+
+
+def id_bytes(unique_id):
+    """
+    Render an ID as 16 big-endian bytes, which sort like the IDs.
+
+    Args:
+        unique_id (int): ID from IdGenerator
+
+    Returns:
+        bytes: 16 bytes
+    """
+    return unique_id.to_bytes(ID_BYTES, "big")
+
+
+def id_text(unique_id):
+    """Render an ID as 32 hex digits, which sort like the IDs."""
+    return f"{unique_id:032x}"
+
+
+def id_parts(unique_id):
+    """
+    Split an ID into its fields.
+
+    Args:
+        unique_id (int): ID from IdGenerator, or id_text of one
+
+    Returns:
+        tuple: (key, node, thread, counter) - key as in orbeat_index
+    """
+    if isinstance(unique_id, str):
+        unique_id = int(unique_id, 16)
+    return (
+        (unique_id >> KEY_SHIFT) - KEY_BIAS,
+        unique_id >> NODE_SHIFT & (1 << NODE_BITS) - 1,
+        unique_id >> THREAD_SHIFT & (1 << THREAD_BITS) - 1,
+        unique_id & COUNTER_LIMIT - 1,
+    )
@@ -0,0 +1,182 @@
+from array import array
+from bisect import bisect_left
+from orbeat_time import TICKS_PER_DAY, to_parts_from_ms, to_parts_many
+
+# A key packs the parts the way orbeat8 spells them before it is reversed:
+# 12 bits of tick, 3 of day and 6 of week below the year
+TICK_BITS, DAY_BITS, WEEK_BITS = 12, 3, 6
+DAY_SHIFT = TICK_BITS
+WEEK_SHIFT = DAY_SHIFT + DAY_BITS
+YEAR_SHIFT = WEEK_SHIFT + WEEK_BITS
+KEY_BYTES = 8
+KEY_BIAS = 1 << (8 * KEY_BYTES - 1)
+
+
+def key_from_parts(year, week, day, frac):
+    """
+    Pack time components into an integer that sorts in time order.
+
+    Order holds from the datum on; before it the components themselves
+    do not follow time order.
+
+    Args:
+        year (int): Orbeat year
+        week (int): Week of the year
+        day (int): Day of the week
+        frac (float): Fraction of the day
+
+    Returns:
+        int: Key at tick resolution
+    """
+    key = ((year << WEEK_BITS | week) << DAY_BITS | day) << TICK_BITS
+    return key | int(frac * TICKS_PER_DAY)
+
+
+def parts_from_key(key):
+    """
+    Unpack a key into (year, week, day, tick).
+
+    Args:
+        key (int): Key from key_from_parts
+
+    Returns:
+        tuple: (year, week, day, tick) - the tick is 0-4095 within the day
+    """
+    return (
+        key >> YEAR_SHIFT,
+        key >> WEEK_SHIFT & (1 << WEEK_BITS) - 1,
+        key >> DAY_SHIFT & (1 << DAY_BITS) - 1,
+        key & (1 << TICK_BITS) - 1,
+    )
+
+
+def to_key(unix_ms=None):
+    """
+    Convert a Unix timestamp to its sortable key.
+
+    Args:
+        unix_ms (int, optional): Unix timestamp in milliseconds. Defaults to current time.
+
+    Returns:
+        int: Key at tick resolution
+    """
+    return key_from_parts(*to_parts_from_ms(unix_ms))
+
+
+def to_key_many(unix_ms_values, unit="ms"):
+    """
+    Convert many Unix timestamps to sortable keys with the batch path.
+
+    Args:
+        unix_ms_values (iterable): Unix timestamps in milliseconds, or
+            anything else to_unix_ms reads
+        unit (str, optional): Unit of numbers: "s", "ms", "us" or "ns". Defaults to "ms".
+
+    Returns:
+        list: Keys in input order
+    """
+    return [key_from_parts(*parts) for parts in to_parts_many(unix_ms_values, unit)]
+
+
+def key_bytes(key):
+    """
+    Render a key as fixed-width bytes that sort like the key.
+
+    Args:
+        key (int): Key from key_from_parts
+
+    Returns:
+        bytes: 8 bytes, big-endian with the sign bit flipped
+    """
+    return (key + KEY_BIAS).to_bytes(KEY_BYTES, "big")
+
+
+def key_from_bytes(data):
+    """Read a key back from key_bytes."""
+    return int.from_bytes(data, "big") - KEY_BIAS
+
+
+class StampIndex:
+    """
+    Records sorted by the key of their timestamp, for range lookups.
+
+    Records within one tick keep their input order.
+    Keys are held in a signed 64-bit array, so a million records cost
+    8 MB for the keys on top of the records themselves. Every lookup is
+    two binary searches followed by a slice of the records.
+    """
+
+    def __init__(self, unix_ms_values, records=None, unit="ms"):
+        """
+        Args:
+            unix_ms_values (iterable): Timestamps of the records, in any form
+                to_key_many takes
+            records (iterable, optional): Records in the same order. Defaults
+                to the timestamps themselves.
+            unit (str, optional): Unit of numbers: "s", "ms", "us" or "ns". Defaults to "ms".
+        """
+        values = list(unix_ms_values)
+        records = values if records is None else list(records)
+        if len(records) != len(values):
+            raise ValueError("records and timestamps differ in length")
+        keys = to_key_many(values, unit)
+        if any(a > b for a, b in zip(keys, keys[1:])):
+            order = sorted(range(len(keys)), key=keys.__getitem__)
+            keys = [keys[i] for i in order]
+            records = [records[i] for i in order]
+        self.keys = array("q", keys)
+        self.records = records
+
+    def __len__(self):
+        return len(self.records)
+
+    def keys_between(self, low, high):
+        """
+        Find records whose key is at least low and below high.
+
+        Args:
+            low (int): Smallest key included
+            high (int): First key excluded
+
+        Returns:
+            list: Records in time order
+        """
+        start = bisect_left(self.keys, low)
+        return self.records[start : bisect_left(self.keys, high, start)]
+
+    def between(self, start, end):
+        """
+        Find records stamped from the tick of start up to that of end.
+
+        The tick containing end is left out. Unlike to_key, 0 is the Unix
+        epoch rather than now.
+
+        Args:
+            start: Unix ms, or anything else to_unix_ms reads
+            end: Unix ms, or anything else to_unix_ms reads
+
+        Returns:
+            list: Records in time order
+        """
+        return self.keys_between(*to_key_many([start, end]))
+
+    def select(self, year, week=None, day=None):
+        """
+        Find records stamped in one Orbeat year, week or day.
+
+        Args:
+            year (int): Orbeat year
+            week (int, optional): Week of the year. Defaults to the whole year.
+            day (int, optional): Day of the week, given with week. Defaults
+                to the whole week.
+
+        Returns:
+            list: Records in time order
+        """
+        if week is None:
+            low, shift = year << YEAR_SHIFT, YEAR_SHIFT
+        elif day is None:
+            low, shift = key_from_parts(year, week, 0, 0), WEEK_SHIFT
+        else:
+            low, shift = key_from_parts(year, week, day, 0), DAY_SHIFT
+        return self.keys_between(low, low + (1 << shift))
@@ -0,0 +1,126 @@
+import functools
+from orbeat_time import DEFAULT_CALENDAR, MS_PER_DAY, _WEEKS
+
+LAYOUT_CACHE_SIZE = 4096
+EXPORT_UNITS = ["year", "week", "day"]
+EXPORT_FORMATS = ["csv", "ndjson"]
+COLUMNS = {
+    "year": ["code", "year", "start_ms", "days", "weeks", "long"],
+    "week": ["code", "year", "week", "start_ms"],
+    "day": ["code", "year", "week", "day", "start_ms"],
+}
+# Codes are octal digits and underscores, so rows need no quoting or escaping
+TEMPLATES = {
+    ("year", "csv"): "{},{},{},{},{},{}",
+    ("week", "csv"): "{},{},{},{}",
+    ("day", "csv"): "{},{},{},{},{}",
+    ("year", "ndjson"): '{{"code":"{}","year":{},"start_ms":{},"days":{},'
+    '"weeks":{},"long":{}}}',
+    ("week", "ndjson"): '{{"code":"{}","year":{},"week":{},"start_ms":{}}}',
+    ("day", "ndjson"): '{{"code":"{}","year":{},"week":{},"day":{},"start_ms":{}}}',
+}
+LONG_TEXT = {"csv": ("0", "1"), "ndjson": ("false", "true")}
+
+
+def _year_text(year):
+    return f"{year:o}" if year >= 0 else f"0{-year:o}"
+
+
+def _layout(start, end, calendar):
+    days = end - start
+    return (
+        start * MS_PER_DAY - calendar.offset_ms,
+        days,
+        days // 8,
+        days == calendar.standard_year,
+    )
+
+
+@functools.lru_cache(LAYOUT_CACHE_SIZE)
+def year_layout(year, calendar=DEFAULT_CALENDAR):
+    """
+    Describe the shape of one year.
+
+    Worked out from the year's two boundaries alone and kept in a bounded
+    LRU cache, so repeated lookups cost a dict hit.
+
+    Args:
+        year (int): Orbeat year
+        calendar (OrbeatCalendar, optional): Defaults to DEFAULT_CALENDAR.
+
+    Returns:
+        tuple: (start_ms, days, weeks, is_long), start_ms being the Unix ms
+            of day 0 of week 0 in a long year or of week 1 in a short one
+    """
+    return _layout(*calendar.year_bounds(year), calendar)
+
+
+def layout_rows(first, last, unit="day", calendar=DEFAULT_CALENDAR):
+    """
+    List the years, weeks or days of a run of years, a year at a time.
+
+    Every start comes from the year boundaries plus whole days, with the
+    year starts taken from the cycle table a slice at a time, so nothing
+    is converted from Unix ms.
+
+    Args:
+        first (int): First Orbeat year
+        last (int): Year after the last one
+        unit (str, optional): "year", "week" or "day". Defaults to "day".
+        calendar (OrbeatCalendar, optional): Defaults to DEFAULT_CALENDAR.
+
+    Yields:
+        list: Rows for one year, as tuples in the order of COLUMNS[unit]
+    """
+    if unit not in EXPORT_UNITS:
+        raise ValueError(f"unknown unit: {unit}")
+    starts = calendar.year_starts(first, last + 1)
+    week_ms, day_ms = 8 * MS_PER_DAY, MS_PER_DAY
+    for year, start, end in zip(range(first, last), starts, starts[1:]):
+        start_ms, days, weeks, is_long = _layout(start, end, calendar)
+        code = _year_text(year)
+        if unit == "year":
+            yield [(code, year, start_ms, days, weeks, is_long)]
+            continue
+        base = 0 if is_long else 1
+        rows = []
+        for week in range(base, base + weeks):
+            week_code = f"{code}_{_WEEKS[week]}"
+            week_start = start_ms + (week - base) * week_ms
+            if unit == "week":
+                rows.append((week_code, year, week, week_start))
+                continue
+            rows += [
+                (f"{week_code}_{day}", year, week, day, week_start + day * day_ms)
+                for day in range(8)
+            ]
+        yield rows
+
+
+def export(out, first, last, unit="day", output="csv", calendar=DEFAULT_CALENDAR):
+    """
+    Write the calendar of a run of years as CSV or NDJSON, a year at a time.
+
+    CSV opens with a header line, and NDJSON has one object per line. The
+    code column is the UCY code cut after the unit, as orbeat_sqlite's
+    period gives it, and long is 1 or 0 in CSV, true or false in NDJSON.
+
+    Args:
+        out (file): Text stream to write to
+        first (int): First Orbeat year
+        last (int): Year after the last one
+        unit (str, optional): "year", "week" or "day". Defaults to "day".
+        output (str, optional): "csv" or "ndjson". Defaults to "csv".
+        calendar (OrbeatCalendar, optional): Defaults to DEFAULT_CALENDAR.
+    """
+    if unit not in EXPORT_UNITS:
+        raise ValueError(f"unknown unit: {unit}")
+    if output not in EXPORT_FORMATS:
+        raise ValueError(f"unknown format: {output}")
+    template = TEMPLATES[unit, output]
+    if output == "csv":
+        out.write(",".join(COLUMNS[unit]) + "\n")
+    for rows in layout_rows(first, last, unit, calendar):
+        if unit == "year":
+            rows = [row[:-1] + (LONG_TEXT[output][row[-1]],) for row in rows]
+        out.write("\n".join([template.format(*row) for row in rows]) + "\n")
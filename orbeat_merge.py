@@ -0,0 +1,108 @@
+import heapq, re, time
+from operator import itemgetter
+from orbeat_time import DEFAULT_CALENDAR
+
+CHUNK_LINES = 4096
+# A UCY or orbeat8 code opening the line, followed by a space or the end
+STAMP = re.compile(r"(?:([0-7]+)_([0-7]{2})_([0-7])\.([0-7]{4})|([0-7]{8}))(?=\s|$)")
+
+
+def keyed_lines(lines, near_ms=None, chunk_lines=CHUNK_LINES):
+    """
+    Pair each line of one log with the start of the tick it is stamped with.
+
+    The pattern has already checked every field of a stamp, so fields are
+    read straight from its groups and only the year spans are looked up,
+    once per year. A line without a valid stamp, such as a wrapped message
+    or a traceback, takes the key of the line before it, and lines before
+    the first stamp sort first. orbeat8 years are taken within four years
+    of near_ms at first, then of the last orbeat8 time seen as of every
+    chunk_lines lines, so a log may run on for any number of years.
+
+    Args:
+        lines (iterable): Lines of one log, in time order
+        near_ms (int, optional): Unix ms near the first orbeat8 stamps.
+            Defaults to current time.
+        chunk_lines (int, optional): Lines between orbeat8 reference
+            updates. Defaults to 4096.
+
+    Yields:
+        tuple: (start_ms, line)
+    """
+    calendar = DEFAULT_CALENDAR
+    years = calendar.near_years(near_ms or time.time() * 1000)
+    spans = {}
+    key = last_orbeat8 = float("-inf")
+    match = STAMP.match
+    for row, line in enumerate(lines, 1):
+        stamp = match(line)
+        if stamp is not None:
+            year, week, day, tick, orbeat8 = stamp.groups()
+            if orbeat8 is None:
+                year, week, tick = int(year, 8), int(week, 8), int(tick, 8)
+            else:
+                digits = orbeat8[::-1]
+                year = years[int(digits[0])]
+                week, day, tick = int(digits[1:3], 8), digits[3], int(digits[4:], 8)
+            span = spans.get(year)
+            if span is None:
+                span = spans[year] = calendar.year_bounds(year)
+            try:
+                key = calendar.ms_range(year, week, int(day), tick, span)[0]
+            except ValueError:
+                pass
+            else:
+                if orbeat8 is not None:
+                    last_orbeat8 = key
+        if not row % chunk_lines and last_orbeat8 > float("-inf"):
+            years = calendar.near_years(last_orbeat8)
+        yield key, line
+
+
+def merge(logs, near_ms=None, chunk_lines=CHUNK_LINES):
+    """
+    Merge logs stamped with Orbeat codes into one stream in time order.
+
+    Only the current line of each log is held, so memory does not grow
+    with the size of the logs. Lines stamped with the same tick keep
+    the order of the logs they came from.
+
+    Args:
+        logs (iterable): Iterables of lines, each in time order
+        near_ms (int, optional): Unix ms near the first orbeat8 stamps.
+            Defaults to current time.
+        chunk_lines (int, optional): Lines between orbeat8 reference
+            updates. Defaults to 4096.
+
+    Yields:
+        str: Lines in time order
+    """
+    near_ms = near_ms or time.time() * 1000
+    keyed = [keyed_lines(log, near_ms, chunk_lines) for log in logs]
+    for _, line in heapq.merge(*keyed, key=itemgetter(0)):
+        yield line
+
+
+def merge_files(paths, out, near_ms=None):
+    """
+    Merge log files into a text stream, ending every line with a newline.
+
+    Args:
+        paths (list): File paths, "-" for standard input
+        out (file): Text stream to write to
+        near_ms (int, optional): Unix ms near the first orbeat8 stamps.
+            Defaults to current time.
+    """
+    import sys
+
+    files = [
+        sys.stdin if path == "-" else open(path, errors="surrogateescape")
+        for path in paths
+    ]
+    try:
+        for line in merge(files, near_ms):
+            out.write(line if line.endswith("\n") else line + "\n")
+    finally:
+        for file in files:
+            if file is not sys.stdin:
+                file.close()
@@ -0,0 +1,305 @@
+import asyncio, json, math, time
+from urllib.parse import parse_qs, urlsplit
+from orbeat_time import MS_PER_DAY, TICKS_PER_DAY, convert_many, next_tick_ms
+from orbeat_time import to_orbeat8, to_orbeat8_many, to_ucy, to_ucy_many
+from orbeat_cache import to_orbeat8_cached, to_ucy_cached
+
+MS_PER_TICK = MS_PER_DAY / TICKS_PER_DAY
+MAX_BODY = 16 * 1024 * 1024
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+# (until, body), replaced whole so threads never see a mismatched pair
+_now = (0, b"")
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def now_body(unix_ms=None):
+    """
+    Build the /now response body, reusing it until the next tick.
+
+    Args:
+        unix_ms (int, optional): Unix timestamp in milliseconds. Defaults to current time.
+
+    Returns:
+        bytes: JSON body with orbeat, ucy and the ms the body stays valid until
+    """
+    global _now
+    unix_ms = unix_ms or time.time() * 1000
+    until, body = _now
+    if not until - MS_PER_TICK <= unix_ms < until:
+        until = next_tick_ms(unix_ms)
+        body = json.dumps(
+            {"orbeat": to_orbeat8(unix_ms), "ucy": to_ucy(unix_ms), "until": until},
+            separators=(",", ":"),
+        ).encode()
+        _now = (until, body)
+    return body
+
+
+def convert_body(query):
+    values = parse_qs(query).get("ms")
+    if not values:
+        raise HTTPError(400, "missing ms")
+    unix_ms = _parse_ms(values[0])
+    if unix_ms:
+        orbeat, ucy = to_orbeat8_cached(unix_ms), to_ucy_cached(unix_ms)
+    else:
+        # The cached functions read 0 as now; here it is the epoch, as in /batch
+        orbeat, ucy = to_orbeat8_many([0])[0], to_ucy_many([0])[0]
+    return json.dumps(
+        {"ms": unix_ms, "orbeat": orbeat, "ucy": ucy},
+        separators=(",", ":"),
+    ).encode()
+
+
+def batch_body(body):
+    """
+    Convert a POSTed JSON array or newline-delimited list of Unix ms.
+
+    Args:
+        body (bytes): Request body
+
+    Returns:
+        bytes: JSON object with orbeat and ucy lists in input order
+    """
+    text = body.decode("utf-8", "replace").strip()
+    if text.startswith("["):
+        try:
+            values = json.loads(text)
+        except ValueError:
+            raise HTTPError(400, "invalid JSON array")
+        if not isinstance(values, list):
+            raise HTTPError(400, "invalid JSON array")
+        values = [_check_ms(value) for value in values]
+    else:
+        values = [_parse_ms(line) for line in text.splitlines() if line.strip()]
+    try:
+        codes = convert_many(values, ["orbeat8", "ucy"])
+    except (ValueError, OverflowError) as error:
+        # Out of range for a code, e.g. wider than its format allows
+        raise HTTPError(400, f"cannot convert: {error}")
+    return json.dumps(
+        {"orbeat": codes["orbeat8"], "ucy": codes["ucy"]},
+        separators=(",", ":"),
+    ).encode()
+
+
+def _parse_ms(text):
+    try:
+        return int(text)
+    except ValueError:
+        raise HTTPError(400, f"invalid ms: {text.strip()[:32]}")
+
+
+def _check_ms(value):
+    # json.loads accepts NaN and Infinity, which no time converts from
+    if (
+        isinstance(value, bool)
+        or not isinstance(value, (int, float))
+        or not math.isfinite(value)
+    ):
+        raise HTTPError(400, f"invalid ms: {str(value)[:32]}")
+    return value
+
+
+def route(method, target, body):
+    """
+    Dispatch one request to its endpoint.
+
+    Args:
+        method (str): HTTP method
+        target (str): Request target including any query string
+        body (bytes): Request body
+
+    Returns:
+        tuple: (status, body bytes)
+    """
+    url = urlsplit(target)
+    try:
+        if url.path == "/now":
+            _require(method, "GET")
+            return 200, now_body()
+        if url.path == "/convert":
+            _require(method, "GET")
+            return 200, convert_body(url.query)
+        if url.path == "/batch":
+            _require(method, "POST")
+            return 200, batch_body(body)
+        raise HTTPError(404, "not found")
+    except HTTPError as error:
+        return error.status, json.dumps({"error": str(error)}).encode()
+    except Exception:
+        # Answer rather than drop the connection, as for any other error
+        return 500, b'{"error": "internal error"}'
+
+
+def _require(method, allowed):
+    if method != allowed:
+        raise HTTPError(405, f"use {allowed}")
+
+
+async def handle(reader, writer):
+    """Serve HTTP/1.x requests on one connection until it is closed."""
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            lines = head.decode("latin-1").split("\r\n")
+            method, target, version = (lines[0].split(" ") + ["", ""])[:3]
+            headers = {}
+            for line in lines[1:]:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip().lower()
+            try:
+                length = int(headers.get("content-length") or 0)
+            except ValueError:
+                break  # malformed Content-Length: drop the connection
+            if length < 0:
+                break
+            connection = headers.get("connection", "")
+            if version == "HTTP/1.1":
+                keep_alive = connection != "close"
+            else:
+                keep_alive = connection == "keep-alive"
+            if length > MAX_BODY:
+                status, body, keep_alive = 413, b'{"error": "body too large"}', False
+            else:
+                status, body = route(method, target, await reader.readexactly(length))
+            writer.write(
+                f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                "\r\n".encode() + body
+            )
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+        pass  # truncated or oversized request head: drop the connection
+    except ConnectionError:
+        pass  # client went away
+    finally:
+        writer.close()
+
+
+async def start(host="127.0.0.1", port=8088):
+    """
+    Start the Orbeat HTTP service.
+
+    Args:
+        host (str, optional): Interface to bind. Defaults to loopback.
+        port (int, optional): Port to bind, 0 for any free port. Defaults to 8088.
+
+    Returns:
+        asyncio.Server: The listening server
+    """
+    return await asyncio.start_server(handle, host, port)
+
+
+def serve(host="127.0.0.1", port=8088):  # pragma: no cover
+    async def run():
+        server = await start(host, port)
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(run())
+
+
+async def request(reader, writer, method, target, body=b""):
+    """
+    Send one keep-alive request and read its response.
+
+    Returns:
+        tuple: (status, body bytes)
+    """
+    writer.write(
+        f"{method} {target} HTTP/1.1\r\nHost: orbeat\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    length = 0
+    for line in head.split(b"\r\n"):
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":", 1)[1])
+    return status, await reader.readexactly(length)
+
+
+async def load(host, port, target="/now", requests=10000, connections=8, body=b""):
+    """
+    Drive a running service with keep-alive connections and time it.
+
+    Args:
+        host (str): Service host
+        port (int): Service port
+        target (str, optional): Request target. Defaults to "/now".
+        requests (int, optional): Total requests to send. Defaults to 10000.
+        connections (int, optional): Concurrent connections. Defaults to 8.
+        body (bytes, optional): POST body; sends GET when empty.
+
+    Returns:
+        dict: requests, seconds and requests per second
+    """
+    method = "POST" if body else "GET"
+    per_connection = [requests // connections] * connections
+    per_connection[0] += requests % connections
+
+    async def client(count):
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for _ in range(count):
+                status, _ = await request(reader, writer, method, target, body)
+                if status != 200:
+                    raise RuntimeError(f"{target} returned {status}")
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    began = time.perf_counter()
+    await asyncio.gather(*(client(count) for count in per_connection))
+    seconds = time.perf_counter() - began
+    return {"requests": requests, "seconds": seconds, "rps": requests / seconds}
+
+
+def bench(requests=10000, connections=8):
+    """
+    Start a loopback service and load it with each endpoint in turn.
+
+    Args:
+        requests (int, optional): Requests per endpoint. Defaults to 10000.
+        connections (int, optional): Concurrent connections. Defaults to 8.
+
+    Returns:
+        dict: load results keyed by endpoint
+    """
+    batch = json.dumps(list(range(1700000000000, 1700100000000, 100000))).encode()
+    targets = [
+        ("/now", b""),
+        ("/convert?ms=1700000000000", b""),
+        ("/batch", batch),
+    ]
+
+    async def run():
+        server = await start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        results = {}
+        async with server:
+            for target, body in targets:
+                results[target.split("?")[0]] = await load(
+                    "127.0.0.1", port, target, requests, connections, body
+                )
+        return results
+
+    return asyncio.run(run())
@@ -0,0 +1,184 @@
+import struct, sys, threading, time
+from multiprocessing import shared_memory
+from orbeat_time import UNIT_MS, next_tick_ms, to_orbeat8, to_ucy
+
+DEFAULT_NAME = "orbeat_stamp"
+# seq, until (ms), orbeat8, UCY padded with spaces
+LAYOUT = struct.Struct("<Qd8s24s")
+SEQ = struct.Struct("<Q")
+READ_RETRIES = 16
+# A reader without a segment, or with a stale stamp, attaches again at most
+# this often
+ATTACH_RETRY_S = 1.0
+
+# Segments published from this process (or inherited by fork), which the
+# resource tracker must go on tracking
+_published = set()
+
+
+def _attach(name):
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name, track=False)
+    memory = shared_memory.SharedMemory(name)
+    if name not in _published:
+        # Otherwise this process's resource tracker unlinks it on exit
+        from multiprocessing import resource_tracker
+
+        resource_tracker.unregister(memory._name, "shared_memory")
+    return memory
+
+
+class StampPublisher:
+    """
+    Keep the current stamp in a shared memory segment for other processes.
+
+    Writes follow a seqlock: the sequence number is odd while the stamp is
+    being replaced and even once it is complete, so readers never need a
+    lock and never block the publisher.
+    """
+
+    def __init__(self, name=DEFAULT_NAME):
+        try:
+            self.memory = shared_memory.SharedMemory(name, True, LAYOUT.size)
+        except FileExistsError:
+            # Left behind by a publisher that did not shut down cleanly
+            self.memory = shared_memory.SharedMemory(name)
+        self.name = name
+        _published.add(name)
+        self._seq = SEQ.unpack_from(self.memory.buf)[0] & ~1
+        self._stop = threading.Event()
+        self._thread = None
+
+    def publish(self, unix_ms=None):
+        """
+        Write the stamp for one moment.
+
+        Args:
+            unix_ms (int, optional): Unix timestamp in milliseconds. Defaults to current time.
+
+        Returns:
+            float: Unix ms at which the published stamp expires
+        """
+        unix_ms = unix_ms or time.time() * 1000
+        until = next_tick_ms(unix_ms)
+        orbeat8 = to_orbeat8(unix_ms).encode()
+        ucy = to_ucy(unix_ms).ljust(24).encode()
+        buf = self.memory.buf
+        SEQ.pack_into(buf, 0, self._seq + 1)
+        LAYOUT.pack_into(buf, 0, self._seq + 1, until, orbeat8, ucy)
+        self._seq += 2
+        SEQ.pack_into(buf, 0, self._seq)
+        return until
+
+    def run(self):
+        """Publish at every tick boundary until stop() is called."""
+        while not self._stop.is_set():
+            until = self.publish()
+            self._stop.wait(max(0.0, until - time.time() * 1000) / 1000)
+
+    def start(self):
+        """Run the publisher on a daemon thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def close(self):
+        """Stop publishing and remove the segment."""
+        self.stop()
+        self.memory.close()
+        self.memory.unlink()
+        _published.discard(self.name)
+
+
+class StampReader:
+    """
+    Read the published stamp, converting locally whenever it is unusable.
+
+    The local conversion covers a missing segment, a stamp whose tick has
+    passed because the publisher stalled or exited, and a write that keeps
+    racing the read. An unusable stamp may also mean the publisher was
+    restarted on a new segment of the same name, so the reader then drops
+    its mapping and attaches again, at most once every ATTACH_RETRY_S.
+    """
+
+    def __init__(self, name=DEFAULT_NAME):
+        self.name = name
+        self.memory = None
+        self.hits = self.fallbacks = 0
+        self._attach_at = 0.0
+
+    def read(self, unix_ms=None):
+        """
+        Take the published stamp if it is for the tick containing unix_ms.
+
+        Args:
+            unix_ms (int, optional): Unix timestamp in milliseconds. Defaults to current time.
+
+        Returns:
+            tuple: (orbeat8, ucy, until) or None if there is no usable stamp
+        """
+        unix_ms = unix_ms or time.time() * 1000
+        if self.memory is None and not self._reattach():
+            return None
+        stamp = self._read(unix_ms)
+        if stamp is None and self._reattach():
+            stamp = self._read(unix_ms)
+        return stamp
+
+    def _reattach(self):
+        now = time.monotonic()
+        if now < self._attach_at:
+            return False
+        self._attach_at = now + ATTACH_RETRY_S
+        self.close()
+        try:
+            self.memory = _attach(self.name)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def _read(self, unix_ms):
+        buf = self.memory.buf
+        for _ in range(READ_RETRIES):
+            seq, until, orbeat8, ucy = LAYOUT.unpack_from(buf)
+            if not seq & 1 and SEQ.unpack_from(buf)[0] == seq:
+                break
+        else:
+            return None
+        if not seq or not until - UNIT_MS["tick"] <= unix_ms < until:
+            return None
+        return orbeat8.decode(), ucy.decode().rstrip(), until
+
+    def orbeat8(self):
+        """Current orbeat8 code, from the publisher when it is fresh."""
+        unix_ms = time.time() * 1000
+        stamp = self.read(unix_ms)
+        if stamp is None:
+            self.fallbacks += 1
+            return to_orbeat8(unix_ms)
+        self.hits += 1
+        return stamp[0]
+
+    def ucy(self):
+        """Current UCY code, from the publisher when it is fresh."""
+        unix_ms = time.time() * 1000
+        stamp = self.read(unix_ms)
+        if stamp is None:
+            self.fallbacks += 1
+            return to_ucy(unix_ms)
+        self.hits += 1
+        return stamp[1]
+
+    def info(self):
+        return {"hits": self.hits, "misses": self.fallbacks}
+
+    def close(self):
+        if self.memory is not None:
+            self.memory.close()
+            self.memory = None
@@ -0,0 +1,101 @@
+import functools, json
+from orbeat_cache import to_orbeat8_cached, to_parts_cached, to_ucy_cached
+from orbeat_time import MS_PER_DAY, OFFSET_MS, _format_orbeat8, _format_ucy
+from orbeat_time import to_parts_many
+
+PERIOD_CACHE_SIZE = 4096
+
+
+def _parts(unix_ms):
+    # to_parts_cached reads 0 as now, but queries have to be deterministic
+    return to_parts_cached(unix_ms) if unix_ms else to_parts_many([0])[0]
+
+
+@functools.lru_cache(PERIOD_CACHE_SIZE)
+def _day_text(days):
+    return _format_ucy(*_parts(days * MS_PER_DAY - OFFSET_MS)).partition(".")[0]
+
+
+def period(unix_ms, unit="day"):
+    """
+    Name the Orbeat period containing a time, as the start of its UCY code.
+
+    Args:
+        unix_ms (int): Unix timestamp in milliseconds, or None
+        unit (str, optional): "year", "week", "day" or "tick". Defaults to "day".
+
+    Returns:
+        str: UCY code cut after the unit, such as "4022_36" for a week, or
+            None for None
+    """
+    if unix_ms is None:
+        return None
+    if unit == "tick":
+        return ucy(unix_ms)
+    days = (unix_ms + OFFSET_MS) // MS_PER_DAY
+    if days >= 0:
+        text = _day_text(int(days))
+    else:
+        text = _format_ucy(*_parts(unix_ms)).partition(".")[0]
+    if unit == "day":
+        return text
+    if unit == "week":
+        return text.rpartition("_")[0]
+    if unit == "year":
+        return text.partition("_")[0]
+    raise ValueError(f"unknown period: {unit}")
+
+
+def orbeat8(unix_ms):
+    """to_orbeat8 on the day cache, with 0 as the epoch and None passed through."""
+    if unix_ms is None:
+        return None
+    return to_orbeat8_cached(unix_ms) if unix_ms else _format_orbeat8(*_parts(0))
+
+
+def ucy(unix_ms):
+    """to_ucy on the day cache, with 0 as the epoch and None passed through."""
+    if unix_ms is None:
+        return None
+    return to_ucy_cached(unix_ms) if unix_ms else _format_ucy(*_parts(0))
+
+
+class PeriodCounts:
+    """Aggregate counting rows per Orbeat period, as a JSON object."""
+
+    def __init__(self):
+        self.counts = {}
+
+    def step(self, unix_ms, unit="day"):
+        name = period(unix_ms, unit)
+        if name is not None:
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def finalize(self):
+        return json.dumps(self.counts, separators=(",", ":"))
+
+
+def register(connection):
+    """
+    Add the Orbeat functions to a SQLite connection.
+
+    Scalar functions: orbeat8(ms), ucy(ms), orbeat_week(ms), orbeat_day(ms)
+    and orbeat_period(ms, unit). The aggregate orbeat_counts(ms[, unit])
+    returns a JSON object of row counts keyed by period. All of them are
+    deterministic, so SQLite can use them in indexes, and they go through
+    the day cache, so only the first row of each day converts in full.
+
+    Args:
+        connection (sqlite3.Connection): Connection to register on
+    """
+    functions = {
+        "orbeat8": (1, orbeat8),
+        "ucy": (1, ucy),
+        "orbeat_week": (1, lambda unix_ms: period(unix_ms, "week")),
+        "orbeat_day": (1, lambda unix_ms: period(unix_ms, "day")),
+        "orbeat_period": (2, period),
+    }
+    for name, (arity, function) in functions.items():
+        connection.create_function(name, arity, function, deterministic=True)
+    connection.create_aggregate("orbeat_counts", 1, PeriodCounts)
+    connection.create_aggregate("orbeat_counts", 2, PeriodCounts)
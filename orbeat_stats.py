@@ -0,0 +1,249 @@
+import functools, threading, time
+from bisect import bisect_left
+import orbeat_time
+
+PUBLIC = [
+    "to_parts_from_ms",
+    "to_parts_from_ms_ref",
+    "to_eastern",
+    "to_local",
+    "to_orbeat8",
+    "to_ucy",
+    "to_parts_many",
+    "to_orbeat8_many",
+    "to_ucy_many",
+    "from_ucy",
+    "from_orbeat8",
+    "from_ucy_many",
+    "from_orbeat8_many",
+    "to_local_many",
+    "to_unix_ms",
+    "to_unix_ms_many",
+]
+BUCKETS_NS = [250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000, 128000, 1000000]
+COUNTERS = {
+    "year_exact": "to_parts_from_ms calls where the linear year estimate was right",
+    "year_down": "to_parts_from_ms calls that stepped back a year (d_in_y < 0)",
+    "year_up": "to_parts_from_ms calls that stepped forward a year (d_in_y >= y_len)",
+    "before_datum": "to_parts_from_ms calls for times before the datum",
+    "span_down": "to_parts_many year lookups that stepped back a year",
+}
+
+_lock = threading.Lock()
+_originals = {}
+_caches = {}
+_span_reuse = {"hits": 0, "misses": 0}
+counters = dict.fromkeys(COUNTERS, 0)
+histograms = {}
+
+
+class Histogram:
+    """Call latency counts in fixed nanosecond buckets, plus a running sum."""
+
+    def __init__(self, bounds=BUCKETS_NS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum_ns = 0
+        # One lock per function so threads timing different calls never wait
+        self.lock = threading.Lock()
+
+    def observe(self, ns):
+        index = bisect_left(self.bounds, ns)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum_ns += ns
+
+    def as_dict(self):
+        with self.lock:
+            counts, sum_ns = list(self.counts), self.sum_ns
+        cumulative, buckets = 0, {}
+        for bound, count in zip(self.bounds + ["+Inf"], counts):
+            cumulative += count
+            buckets[bound] = cumulative
+        return {"count": cumulative, "sum_ns": sum_ns, "buckets": buckets}
+
+
+def _count(name, amount=1):
+    with _lock:
+        counters[name] += amount
+
+
+def register_cache(name, info):
+    """
+    Report a cache's hit rate alongside the other statistics.
+
+    Args:
+        name (str): Cache name used as its label
+        info (callable): Returns a dict with at least "hits" and "misses"
+    """
+    _caches[name] = info
+
+
+def _timed(name, function):
+    histogram = histograms.setdefault(name, Histogram())
+
+    @functools.wraps(function)
+    def timed(*args, **kwargs):
+        began = time.perf_counter_ns()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            histogram.observe(time.perf_counter_ns() - began)
+
+    return timed
+
+
+def _counted_parts(function):
+    @functools.wraps(function)
+    def to_parts_from_ms(unix_ms=None):
+        unix_ms = unix_ms or time.time() * 1000
+        parts = function(unix_ms)
+        ms_since = unix_ms + orbeat_time.OFFSET_MS
+        estimate = orbeat_time._year_estimate(ms_since / orbeat_time.MS_PER_DAY)
+        if ms_since < 0:
+            _count("before_datum")
+        if parts[0] < estimate:
+            _count("year_down")
+        elif parts[0] > estimate:
+            _count("year_up")
+        else:
+            _count("year_exact")
+        return parts
+
+    return to_parts_from_ms
+
+
+def _counted_many(function):
+    @functools.wraps(function)
+    def to_parts_many(unix_ms_values, unit="ms"):
+        values = list(unix_ms_values)
+        if unit != "ms" or not all(value.__class__ in (int, float) for value in values):
+            # The original, so the batch is not also timed as to_unix_ms calls
+            to_unix_ms = _originals["to_unix_ms"]
+            values = [to_unix_ms(value, unit) for value in values]
+        parts = function(values)
+        offset, ms_per_day = orbeat_time.OFFSET_MS, orbeat_time.MS_PER_DAY
+        hits = misses = down = 0
+        year = None
+        # Replay the batch path's year span reuse from the years it found:
+        # a span is looked up whenever the year changes
+        for unix_ms, item in zip(values, parts):
+            days = int((unix_ms + offset) // ms_per_day)
+            if days < 0:
+                continue
+            if item[0] == year:
+                hits += 1
+            else:
+                misses += 1
+                year = item[0]
+                down += year < orbeat_time._year_estimate(days)
+        with _lock:
+            _span_reuse["hits"] += hits
+            _span_reuse["misses"] += misses
+            counters["span_down"] += down
+        return parts
+
+    return to_parts_many
+
+
+def enable():
+    """
+    Swap instrumented wrappers into orbeat_time.
+
+    Nothing is measured until this is called, and disable() puts the
+    original functions back. The wrappers also shadow the methods of
+    orbeat_time.DEFAULT_CALENDAR, so calls between its methods are seen.
+    Code that imported a function by name beforehand keeps calling the
+    original, as do other OrbeatCalendar instances.
+    """
+    if _originals:
+        return
+    import orbeat_cache
+
+    for name in PUBLIC:
+        _originals[name] = getattr(orbeat_time, name)
+    register_cache("year_span", lambda: dict(_span_reuse))
+    register_cache("day", orbeat_cache.cache_info)
+    for name in PUBLIC:
+        function = _originals[name]
+        if name == "to_parts_from_ms":
+            function = _counted_parts(function)
+        elif name == "to_parts_many":
+            function = _counted_many(function)
+        function = _timed(name, function)
+        setattr(orbeat_time, name, function)
+        if hasattr(orbeat_time.OrbeatCalendar, name):
+            setattr(orbeat_time.DEFAULT_CALENDAR, name, function)
+
+
+def disable():
+    """Restore the original orbeat_time functions."""
+    for name, function in _originals.items():
+        setattr(orbeat_time, name, function)
+        vars(orbeat_time.DEFAULT_CALENDAR).pop(name, None)
+    _originals.clear()
+
+
+def reset():
+    """Zero every counter, cache count and histogram collected here."""
+    with _lock:
+        for name in counters:
+            counters[name] = 0
+        for name in _span_reuse:
+            _span_reuse[name] = 0
+    for histogram in histograms.values():
+        with histogram.lock:
+            histogram.counts = [0] * len(histogram.counts)
+            histogram.sum_ns = 0
+
+
+def snapshot():
+    """
+    Collect every statistic as plain data.
+
+    Returns:
+        dict: counters, caches (hits, misses and anything else reported)
+            and per-function latency histograms
+    """
+    with _lock:
+        data = {"counters": dict(counters)}
+    data["caches"] = {name: info() for name, info in _caches.items()}
+    data["histograms"] = {
+        name: histogram.as_dict() for name, histogram in histograms.items()
+    }
+    return data
+
+
+def prometheus():
+    """
+    Render every statistic in the Prometheus text exposition format.
+
+    Returns:
+        str: Metrics text ending in a newline
+    """
+    data = snapshot()
+    lines = []
+    for name, help_text in COUNTERS.items():
+        metric = f"orbeat_{name}_total"
+        lines += [
+            f"# HELP {metric} {help_text}",
+            f"# TYPE {metric} counter",
+            f"{metric} {data['counters'][name]}",
+        ]
+    for kind in ["hits", "misses"]:
+        metric = f"orbeat_cache_{kind}_total"
+        lines += [f"# HELP {metric} Cache {kind}", f"# TYPE {metric} counter"]
+        for name, info in sorted(data["caches"].items()):
+            lines.append(f'{metric}{{cache="{name}"}} {info[kind]}')
+    metric = "orbeat_call_duration_seconds"
+    lines += [
+        f"# HELP {metric} Latency of public orbeat_time functions",
+        f"# TYPE {metric} histogram",
+    ]
+    for name, histogram in sorted(data["histograms"].items()):
+        for bound, count in histogram["buckets"].items():
+            le = bound if bound == "+Inf" else repr(bound / 1e9)
+            lines.append(f'{metric}_bucket{{function="{name}",le="{le}"}} {count}')
+        lines.append(f'{metric}_sum{{function="{name}"}} {histogram["sum_ns"] / 1e9!r}')
+        lines.append(f'{metric}_count{{function="{name}"}} {histogram["count"]}')
+    return "\n".join(lines) + "\n"
@@ -1,5 +1,4 @@
-import math, time, zoneinfo
-from datetime import datetime
+import time
 
 UNIX_JDN = 2440588
 DATUM_JDN = 1705433
@@ -9,6 +8,34 @@ OFFSET_MS = (UNIX_JDN - DATUM_JDN) * MS_PER_DAY + DAWN_MS
 DAYS_PER_YEAR = 365.2421875  # 365.24219 = 0o555.147 + 2.5e-6
 STANDARD_YEAR = 368
 SHORT_YEAR = 360
+# Linear year estimate from days since the datum: int(Y0 * days + Y1 + 0.5)
+Y0 = 0.0027379093329411184
+Y1 = -4.211716108814683e-06
+TICKS_PER_DAY = 8**4
+# Longest leap cycle, in years, kept as a table of year starts
+MAX_CYCLE = 4096
+# Year starts from the table match the float formula while its products are exact
+TABLE_YEARS = 2**40
+UNIT_MS = {
+    "tick": MS_PER_DAY / TICKS_PER_DAY,
+    "day": MS_PER_DAY,
+    "week": 8 * MS_PER_DAY,
+}
+CHUNK_SIZE = 65536
+LOCAL_FORMAT = "%Y-%m-%d %I:%M %p %Z"
+# Units accepted for numeric input: ms = value * multiplier / divisor
+INPUT_UNITS = {"s": (1000, 1), "ms": (1, 1), "us": (1, 1000), "ns": (1, 1000000)}
+
+# Unix seconds of 0001-01-02 and 9999-12-30, inside what datetime can show anywhere
+LOCAL_MIN_S = -62135510400
+LOCAL_MAX_S = 253402128000
+# Most days of zone offsets to_local_many samples per row; a batch spread
+# wider is cheaper to format a row at a time
+LOCAL_DAYS_PER_ROW = 2
+# Offset tables kept per zone, so batches over different spans reuse theirs
+ZONE_TABLES = 8
+# Bytes per code in shared memory; UCY codes are padded with spaces
+FORMAT_WIDTHS = {"orbeat8": 8, "ucy": 24}
 
 
 def to_parts_from_ms_ref(unix_ms=None):
@@ -57,55 +84,581 @@ def to_parts_from_ms_ref(unix_ms=None):
         year_index += 1
 
 
-def to_parts_from_ms(unix_ms=None):
+# Octal text for every week and tick, forwards for UCY and reversed for orbeat8
+_WEEKS = [f"{week:02o}" for week in range(64)]
+_TICKS = [f"{tick:04o}" for tick in range(TICKS_PER_DAY)]
+_WEEKS_REVERSED = [text[::-1] for text in _WEEKS]
+_TICKS_REVERSED = [text[::-1] for text in _TICKS]
+_DIGITS = "01234567"
+# The caches below need no lock: each is filled by a check-then-set of a
+# value built in full first and never changed after, so threads that race
+# only repeat the work, and a reader keeps whichever whole value it got.
+_zones = {}
+# Per zone: a tuple of (low_s, high_s, starts, offsets, names), newest first
+_zone_tables = {}
+# "HH:MM AM" for every minute of the day, built on first use
+_clock = None
+
+
+def _format_orbeat8(year, week, day, frac):
+    if year >= 0 and 0 <= week < 64:
+        # Only the last octal digit of the year survives the truncation
+        return (
+            _TICKS_REVERSED[int(frac * TICKS_PER_DAY)]
+            + _DIGITS[day]
+            + _WEEKS_REVERSED[week]
+            + _DIGITS[year & 7]
+        )
+    year_oct = f"0{-year:o}" if year < 0 else f"{year:o}"
+    return f"{year_oct}{week:02o}{day}{int(frac * 8**4):04o}"[:-9:-1]
+
+
+def _format_ucy(year, week, day, frac):
+    if year >= 0 and 0 <= week < 64:
+        return f"{year:o}_{_WEEKS[week]}_{day}.{_TICKS[int(frac * TICKS_PER_DAY)]}"
+    year_oct = f"0{-year:o}" if year < 0 else f"{year:o}"
+    return f"{year_oct}_{week:02o}_{day}.{int(frac * 8**4):04o}"
+
+
+class OrbeatCalendar:
     """
-    Convert Unix timestamp to time components.
+    Orbeat conversions for one choice of datum and year lengths.
+
+    Every constant the conversions need is worked out once here and kept
+    on the instance, so calendars with different epochs or year lengths
+    can be used side by side. The module-level functions are the bound
+    methods of DEFAULT_CALENDAR.
 
     Args:
-        unix_ms (int, optional): Unix timestamp in milliseconds. Defaults to current time.
+        datum_jdn (int, optional): Julian Day Number of the datum. Defaults to DATUM_JDN.
+        dawn_ms (int, optional): Offset of the day start from midnight UTC. Defaults to DAWN_MS.
+        days_per_year (float, optional): Mean year length. Defaults to DAYS_PER_YEAR.
+        standard_year (int, optional): Days in a long year. Defaults to STANDARD_YEAR.
+        short_year (int, optional): Days in a short year. Defaults to SHORT_YEAR.
+        y0, y1 (float, optional): Slope and intercept of the linear year
+            estimate from days since the datum, which must never fall short
+            of the true year nor pass it by more than one. Default to Y0
+            and Y1 for the default year length, else 1/days_per_year and 0.
+    """
+
+    def __init__(
+        self,
+        datum_jdn=DATUM_JDN,
+        dawn_ms=DAWN_MS,
+        days_per_year=DAYS_PER_YEAR,
+        standard_year=STANDARD_YEAR,
+        short_year=SHORT_YEAR,
+        y0=None,
+        y1=None,
+    ):
+        if days_per_year == DAYS_PER_YEAR:
+            y0 = Y0 if y0 is None else y0
+            y1 = Y1 if y1 is None else y1
+        self.datum_jdn = datum_jdn
+        self.dawn_ms = dawn_ms
+        self.days_per_year = days_per_year
+        self.standard_year = standard_year
+        self.short_year = short_year
+        self.y0 = 1 / days_per_year if y0 is None else y0
+        self.y1 = 0.0 if y1 is None else y1
+        self.offset_ms = (UNIX_JDN - datum_jdn) * MS_PER_DAY + dawn_ms
+        # Share of years that are long
+        self.long_share = (days_per_year - short_year) / (standard_year - short_year)
+        self.unit_ms = dict(UNIT_MS)
+        # Long and short years repeat every `cycle` years (1024 by default),
+        # so year starts come from one cycle's table plus whole cycles
+        self.cycle = self.long_share.as_integer_ratio()[1]
+        if self.cycle > MAX_CYCLE:
+            self.cycle = self._starts = None
+        else:
+            self._starts = [self._year_start(year) for year in range(self.cycle + 1)]
+            self.cycle_days = self._starts[-1]
+
+    def __repr__(self):
+        return (
+            f"OrbeatCalendar(datum_jdn={self.datum_jdn}, dawn_ms={self.dawn_ms},"
+            f" days_per_year={self.days_per_year},"
+            f" standard_year={self.standard_year}, short_year={self.short_year})"
+        )
+
+    def year_start(self, year):
+        """First day of a year, counted in days since the datum."""
+        if self._starts and 0 <= year < TABLE_YEARS:
+            cycles, index = divmod(year, self.cycle)
+            return cycles * self.cycle_days + self._starts[index]
+        return self._year_start(year)
+
+    def _year_start(self, year):
+        longs = int(self.long_share * year + 0.5)
+        return self.short_year * year + (self.standard_year - self.short_year) * longs
+
+    def year_bounds(self, year):
+        """
+        Find the days a year covers.
+
+        Args:
+            year (int): Orbeat year
+
+        Returns:
+            tuple: (start_day, end_day) since the datum, end exclusive
+        """
+        return self.year_start(year), self.year_start(year + 1)
+
+    def year_starts(self, first, last):
+        """
+        First days of a run of years, a cycle's table slice at a time.
+
+        Args:
+            first (int): First Orbeat year
+            last (int): Year after the last one
+
+        Returns:
+            list: Start days since the datum, one per year
+        """
+        if not self._starts or first < 0 or last > TABLE_YEARS:
+            return list(map(self.year_start, range(first, last)))
+        starts, year = [], first
+        while year < last:
+            cycles, index = divmod(year, self.cycle)
+            stop = min(self.cycle, index + last - year)
+            base = cycles * self.cycle_days
+            starts += [base + start for start in self._starts[index:stop]]
+            year += stop - index
+        return starts
+
+    def year_estimate(self, days):
+        """Linear estimate of the year containing a day count since the datum."""
+        return int(self.y0 * days + self.y1 + 0.5)
+
+    def year_span(self, days):
+        """
+        Find the year containing a whole day count since the datum.
+
+        Uses the same linear estimate as to_parts_from_ms, correcting it by
+        at most one year. The default estimate is never short of the true
+        year, so only a step back is ever needed there.
+
+        Args:
+            days (int): Whole days since the datum, not negative
+
+        Returns:
+            tuple: (year, start_day, end_day) with start_day <= days < end_day
+        """
+        year = self.year_estimate(days)
+        start, end = self.year_bounds(year)
+        if days < start:
+            year -= 1
+            start, end = self.year_bounds(year)
+        elif days >= end:
+            year += 1
+            start, end = self.year_bounds(year)
+        return year, start, end
+
+    def to_parts_from_ms(self, unix_ms=None):
+        """
+        Convert Unix timestamp to time components.
+
+        Args:
+            unix_ms (int, optional): Unix timestamp in milliseconds. Defaults to current time.
+
+        Returns:
+            tuple: (year, week, day, fracs) - all as numeric values
+        """
+        unix_ms = unix_ms or time.time() * 1000
+        ms_since = unix_ms + self.offset_ms
+        days = ms_since / MS_PER_DAY
+        day_of_week = int(days % 8)
+        fracs = (ms_since % MS_PER_DAY) / MS_PER_DAY
+
+        # Linear estimate for year
+        years = int(self.y0 * days + self.y1 + 0.5)
+
+        # Find exact year and day within year
+        year_start = self.year_start
+        c_y = year_start(years)
+        c_next = year_start(years + 1)
+        d_in_y = days - c_y
+
+        # Adjust year if needed
+        if d_in_y < 0:
+            years -= 1
+            c_next = c_y
+            c_y = year_start(years)
+            d_in_y = days - c_y
+        elif d_in_y >= c_next - c_y:
+            years += 1
+            c_y = c_next
+            c_next = year_start(years + 1)
+            d_in_y = days - c_y
+
+        # Calculate week (short years start at week 1)
+        weeks = (0 if c_next - c_y == self.standard_year else 1) + int(d_in_y / 8)
+
+        return years, weeks, day_of_week, fracs
+
+    def to_parts_many(self, unix_ms_values, unit="ms"):
+        """
+        Convert many Unix timestamps to time components in one pass.
+
+        The year span found for one timestamp is reused for the following
+        ones, so sorted or clustered input skips the year search entirely.
+        Unlike the scalar functions, 0 means the Unix epoch rather than now.
+        Anything to_unix_ms reads may be mixed in with the numbers.
+
+        Args:
+            unix_ms_values (iterable): Unix timestamps in milliseconds
+            unit (str, optional): Unit of numbers: "s", "ms", "us" or "ns". Defaults to "ms".
+
+        Returns:
+            list: (year, week, day, fracs) tuples in input order
+        """
+        if unit != "ms":
+            unix_ms_values = to_unix_ms_many(unix_ms_values, unit)
+        parts = []
+        append = parts.append
+        offset_ms, standard_year = self.offset_ms, self.standard_year
+        year = week_base = start = end = 0
+        for unix_ms in unix_ms_values:
+            try:
+                days, ms_into_day = divmod(unix_ms + offset_ms, MS_PER_DAY)
+            except TypeError:
+                # ISO-8601 text, a datetime or a date
+                unix_ms = to_unix_ms(unix_ms)
+                days, ms_into_day = divmod(unix_ms + offset_ms, MS_PER_DAY)
+            days = int(days)
+            if not start <= days < end:
+                if days < 0:
+                    # Keep the scalar path's results before the datum
+                    append(self.to_parts_from_ms(unix_ms))
+                    continue
+                year, start, end = self.year_span(days)
+                week_base = 0 if end - start == standard_year else 1
+            week = week_base + (days - start) // 8
+            append((year, week, days % 8, ms_into_day / MS_PER_DAY))
+        return parts
+
+    def next_boundary_ms(self, unix_ms=None, unit="tick"):
+        """
+        Find when the Orbeat stamp next changes at the given resolution.
+
+        Year starts fall on 8-day week boundaries, so week boundaries are
+        every 8 days from the datum.
+
+        Args:
+            unix_ms (int, optional): Unix timestamp in milliseconds. Defaults to current time.
+            unit (str, optional): "tick" (1/4096 day), "day" or "week". Defaults to "tick".
+
+        Returns:
+            float: Unix timestamp in milliseconds of the next boundary
+        """
+        unix_ms = unix_ms or time.time() * 1000
+        step = self.unit_ms[unit]
+        return unix_ms - (unix_ms + self.offset_ms) % step + step
+
+    def next_tick_ms(self, unix_ms=None):
+        """
+        Find when the 1/4096-day fraction shown in Orbeat codes next changes.
+
+        Args:
+            unix_ms (int, optional): Unix timestamp in milliseconds. Defaults to current time.
+
+        Returns:
+            float: Unix timestamp in milliseconds of the next tick boundary
+        """
+        return self.next_boundary_ms(unix_ms, "tick")
+
+    def to_orbeat8(self, unix_ms=None):
+        """
+        Convert Unix timestamp to compact 8-character Orbeat format.
+
+        Args:
+            unix_ms (int, optional): Unix timestamp in milliseconds. Defaults to current time.
+
+        Returns:
+            str: 8-character compact timestamp
+        """
+        return _format_orbeat8(*self.to_parts_from_ms(unix_ms))
+
+    def to_ucy(self, unix_ms=None):
+        """
+        Converts Unix timestamp to UCY format: YYYY_WW_D.FFFF
+
+        UCY:
+            How those without shadows play hide and seek with the sun.
+
+        Args:
+            unix_ms (int, optional): Unix timestamp in milliseconds. Defaults to current time.
+
+        Returns:
+            str: Human-readable timestamp
+        """
+        return _format_ucy(*self.to_parts_from_ms(unix_ms))
+
+    def to_orbeat8_many(self, unix_ms_values, unit="ms"):
+        """
+        Convert many Unix timestamps to compact 8-character Orbeat format.
+
+        Args:
+            unix_ms_values (iterable): Unix timestamps in milliseconds
+            unit (str, optional): Unit of numbers: "s", "ms", "us" or "ns". Defaults to "ms".
+
+        Returns:
+            list: 8-character compact timestamps in input order
+        """
+        parts = self.to_parts_many(unix_ms_values, unit)
+        return [_format_orbeat8(*item) for item in parts]
+
+    def to_ucy_many(self, unix_ms_values, unit="ms"):
+        """
+        Convert many Unix timestamps to UCY format: YYYY_WW_D.FFFF
+
+        Args:
+            unix_ms_values (iterable): Unix timestamps in milliseconds
+            unit (str, optional): Unit of numbers: "s", "ms", "us" or "ns". Defaults to "ms".
+
+        Returns:
+            list: Human-readable timestamps in input order
+        """
+        parts = self.to_parts_many(unix_ms_values, unit)
+        return [_format_ucy(*item) for item in parts]
+
+    def near_years(self, near_ms=None):
+        """Map each final octal year digit to the year within four of near_ms's year."""
+        low = self.to_parts_from_ms(near_ms)[0] - 4
+        return {digit: low + (digit - low) % 8 for digit in range(8)}
+
+    def ms_range(self, year, week, day, tick, span=None):
+        """
+        Find the Unix ms range covered by one tick of an Orbeat day.
+
+        Args:
+            year, week, day, tick (int): Parsed code fields
+            span (tuple, optional): (start_day, end_day) of the year if known
+
+        Returns:
+            tuple: (start_ms, end_ms), end exclusive
+        """
+        start, end = span or self.year_bounds(year)
+        days = start + 8 * (week - (0 if end - start == self.standard_year else 1))
+        days += day
+        if not start <= days < end or day > 7:
+            raise ValueError(f"year {year:o} has no week {week:02o} day {day}")
+        day_ms = days * MS_PER_DAY - self.offset_ms
+        return (
+            day_ms - (-tick * MS_PER_DAY // TICKS_PER_DAY),
+            day_ms - (-(tick + 1) * MS_PER_DAY // TICKS_PER_DAY),
+        )
+
+    def from_ucy(self, code):
+        """
+        Convert a UCY code back to the Unix ms range it stands for.
+
+        Args:
+            code (str): UCY timestamp, YYYY_WW_D.FFFF
+
+        Returns:
+            tuple: (start_ms, end_ms), end exclusive
+        """
+        return self.ms_range(*_parse_ucy(code))
+
+    def from_orbeat8(self, code, near_ms=None):
+        """
+        Convert an orbeat8 code back to the Unix ms range it stands for.
+
+        An orbeat8 code keeps only the last octal digit of the year, so the
+        year is taken as the one ending in that digit within four years of
+        near_ms.
+
+        Args:
+            code (str): 8-character compact timestamp
+            near_ms (int, optional): Unix timestamp in milliseconds. Defaults to current time.
+
+        Returns:
+            tuple: (start_ms, end_ms), end exclusive
+        """
+        digit, week, day, tick = _parse_orbeat8(code)
+        low = self.to_parts_from_ms(near_ms)[0] - 4
+        return self.ms_range(low + (digit - low) % 8, week, day, tick)
+
+    def from_ucy_many(self, codes):
+        """
+        Convert many UCY codes back to Unix ms ranges.
+
+        Year spans are indexed as they are first seen, so each further code
+        from the same year costs only a parse and a few additions.
+
+        Args:
+            codes (iterable): UCY timestamps
+
+        Returns:
+            list: (start_ms, end_ms) tuples in input order
+        """
+        spans = {}
+        ranges = []
+        for code in codes:
+            year, week, day, tick = _parse_ucy(code)
+            span = spans.get(year)
+            if span is None:
+                span = spans[year] = self.year_bounds(year)
+            ranges.append(self.ms_range(year, week, day, tick, span))
+        return ranges
+
+    def from_orbeat8_many(self, codes, near_ms=None):
+        """
+        Convert many orbeat8 codes back to Unix ms ranges.
+
+        The eight candidate years around near_ms are resolved once, so each
+        code costs only a parse and a few additions.
+
+        Args:
+            codes (iterable): 8-character compact timestamps
+            near_ms (int, optional): Unix timestamp in milliseconds. Defaults to current time.
+
+        Returns:
+            list: (start_ms, end_ms) tuples in input order
+        """
+        years = self.near_years(near_ms)
+        spans = {year: self.year_bounds(year) for year in years.values()}
+        ranges = []
+        for code in codes:
+            digit, week, day, tick = _parse_orbeat8(code)
+            year = years[digit]
+            ranges.append(self.ms_range(year, week, day, tick, spans[year]))
+        return ranges
+
+
+def _octal(text, width=None):
+    if not text or text.strip("01234567") or width and len(text) != width:
+        raise ValueError(f"not an Orbeat code field: {text!r}")
+    return int(text, 8)
+
+
+def _parse_ucy(code):
+    year, week, rest = (code.strip().split("_") + ["", ""])[:3]
+    if len(year) > 1 and year[0] == "0":
+        # to_ucy writes years before the datum this way, but parts there do
+        # not follow the year layout, so no range could be trusted
+        raise ValueError(f"UCY codes before the datum are not supported: {code!r}")
+    day, _, frac = rest.partition(".")
+    return _octal(year), _octal(week, 2), _octal(day, 1), _octal(frac, 4)
+
+
+def _parse_orbeat8(code):
+    digits = code.strip()[::-1]
+    if len(digits) != 8:
+        raise ValueError(f"orbeat8 codes have 8 digits: {code!r}")
+    return _octal(digits[0]), _octal(digits[1:3]), _octal(digits[3]), _octal(digits[4:])
+
+
+DEFAULT_CALENDAR = OrbeatCalendar()
+to_parts_from_ms = DEFAULT_CALENDAR.to_parts_from_ms
+to_parts_many = DEFAULT_CALENDAR.to_parts_many
+next_boundary_ms = DEFAULT_CALENDAR.next_boundary_ms
+next_tick_ms = DEFAULT_CALENDAR.next_tick_ms
+to_orbeat8 = DEFAULT_CALENDAR.to_orbeat8
+to_ucy = DEFAULT_CALENDAR.to_ucy
+from_ucy = DEFAULT_CALENDAR.from_ucy
+from_orbeat8 = DEFAULT_CALENDAR.from_orbeat8
+from_ucy_many = DEFAULT_CALENDAR.from_ucy_many
+from_orbeat8_many = DEFAULT_CALENDAR.from_orbeat8_many
+_year_bounds = DEFAULT_CALENDAR.year_bounds
+_year_estimate = DEFAULT_CALENDAR.year_estimate
+_year_span = DEFAULT_CALENDAR.year_span
+_near_years = DEFAULT_CALENDAR.near_years
+_ms_range = DEFAULT_CALENDAR.ms_range
+
+
+def _iso_ms(text):
+    from datetime import datetime
+
+    try:
+        return _datetime_ms(datetime.fromisoformat(text))
+    except ValueError:
+        # Python 3.10 does not take the Z suffix
+        if text[-1:] not in ("Z", "z"):
+            raise
+    return _datetime_ms(datetime.fromisoformat(text[:-1] + "+00:00"))
+
+
+def _datetime_ms(moment):
+    from datetime import datetime
+
+    if not isinstance(moment, datetime):
+        moment = datetime(moment.year, moment.month, moment.day)
+    aware, naive, microsecond = _epochs()
+    micros = (moment - (naive if moment.tzinfo is None else aware)) // microsecond
+    return micros // 1000 if micros % 1000 == 0 else micros / 1000
+
+
+def _epochs():
+    """The Unix epoch with and without a zone, and one microsecond."""
+    from datetime import datetime, timedelta, timezone
+
+    epoch = datetime(1970, 1, 1)
+    return epoch.replace(tzinfo=timezone.utc), epoch, timedelta(microseconds=1)
+
+
+def to_unix_ms(value, unit="ms"):
+    """
+    Read a time given as a number, ISO-8601 text, datetime or date.
+
+    Times without a zone, and dates, are taken as UTC.
+
+    Args:
+        value: Unix time as a number in the given unit, an ISO-8601 string,
+            or a datetime.datetime or datetime.date
+        unit (str, optional): Unit of numbers: "s", "ms", "us" or "ns". Defaults to "ms".
 
     Returns:
-        tuple: (year, week, day, fracs) - all as numeric values
+        int: Unix ms, or float when the time has a fraction of a ms
     """
-    unix_ms = unix_ms or time.time() * 1000
-    ms_since = unix_ms + OFFSET_MS
-    days = ms_since / MS_PER_DAY
-    day_of_week = int(days % 8)
-    fracs = (ms_since % MS_PER_DAY) / MS_PER_DAY
-
-    # Linear estimate for year
-    Y0 = 0.0027379093329411184
-    Y1 = -4.211716108814683e-06
-    years = int(Y0 * days + Y1 + 0.5)
-
-    # Calculate year boundaries using the pattern
-    rho = (DAYS_PER_YEAR - SHORT_YEAR) / 8.0
-    longs_before = lambda y: int(rho * y + 0.5)
-    is_long = lambda y: longs_before(y + 1) - longs_before(y) == 1
-    year_length = lambda y: STANDARD_YEAR if is_long(y) else SHORT_YEAR
-    start_of_year = lambda y: SHORT_YEAR * y + 8 * longs_before(y)
-
-    # Find exact year and day within year
-    c_y = start_of_year(years)
-    y_len = year_length(years)
-    d_in_y = days - c_y
-
-    # Adjust year if needed
-    if d_in_y < 0:
-        years -= 1
-        c_y = start_of_year(years)
-        y_len = year_length(years)
-        d_in_y = days - c_y
-    elif d_in_y >= y_len:
-        years += 1
-        c_y = start_of_year(years)
-        y_len = year_length(years)
-        d_in_y = days - c_y
+    if isinstance(value, (int, float)):
+        multiplier, divisor = INPUT_UNITS[unit]
+        value *= multiplier
+        if divisor == 1:
+            return value
+        if isinstance(value, int) and value % divisor == 0:
+            return value // divisor
+        return value / divisor
+    if isinstance(value, str):
+        return _iso_ms(value.strip())
+    if hasattr(value, "toordinal"):
+        return _datetime_ms(value)
+    raise TypeError(f"not a time: {value!r}")
+
+
+def to_unix_ms_many(values, unit="ms"):
+    """
+    Read many times with to_unix_ms.
 
-    # Calculate week (short years start at week 1)
-    weeks = (0 if y_len == STANDARD_YEAR else 1) + int(d_in_y / 8)
+    Args:
+        values (iterable): Numbers in the given unit, ISO-8601 strings,
+            datetimes or dates, mixed freely
+        unit (str, optional): Unit of numbers: "s", "ms", "us" or "ns". Defaults to "ms".
 
-    return years, weeks, day_of_week, fracs
+    Returns:
+        list: Unix ms in input order
+    """
+    from datetime import datetime
+
+    fromisoformat = datetime.fromisoformat
+    aware, naive, microsecond = _epochs()
+    results = []
+    append = results.append
+    for value in values:
+        if value.__class__ is str:
+            # The C parser handles the usual layouts; to_unix_ms the rest
+            try:
+                moment = fromisoformat(value)
+            except ValueError:
+                append(to_unix_ms(value))
+                continue
+            epoch = naive if moment.tzinfo is None else aware
+            micros = (moment - epoch) // microsecond
+            append(micros // 1000 if micros % 1000 == 0 else micros / 1000)
+        else:
+            append(to_unix_ms(value, unit))
+    return results
 
 
 def to_eastern(unix_ms=None):
@@ -118,53 +671,332 @@ def to_eastern(unix_ms=None):
     Returns:
         str: Eastern time in format "YYYY-MM-DD HH:MM AM/PM EST/EDT/LMT"
     """
-    unix_ms = unix_ms or time.time() * 1000
-    eastern = zoneinfo.ZoneInfo("America/New_York")
-    dt = datetime.fromtimestamp(unix_ms / 1000, tz=eastern)
-    return dt.strftime("%Y-%m-%d %I:%M %p %Z")
+    return to_local(unix_ms, "America/New_York")
+
+
+def _zone(tz):
+    zone = _zones.get(tz)
+    if zone is None:
+        import zoneinfo
 
+        zone = _zones[tz] = zoneinfo.ZoneInfo(tz)
+    return zone
 
-def to_orbeat8(unix_ms=None):
+
+def to_local(unix_ms=None, tz="America/New_York"):
     """
-    Convert Unix timestamp to compact 8-character Orbeat format.
+    Get time in any IANA time zone.
 
     Args:
         unix_ms (int, optional): Unix timestamp in milliseconds. Defaults to current time.
+        tz (str, optional): IANA zone name. Defaults to "America/New_York".
+
+    Returns:
+        str: Local time in format "YYYY-MM-DD HH:MM AM/PM ZONE"
+    """
+    from datetime import datetime
+
+    unix_ms = unix_ms or time.time() * 1000
+    dt = datetime.fromtimestamp(unix_ms / 1000, tz=_zone(tz))
+    return dt.strftime(LOCAL_FORMAT)
+
+
+def _zone_table(tz, low_s, high_s):
+    """
+    List a zone's UTC offsets between two Unix times.
+
+    The zone is sampled once a day and each change is narrowed down to
+    the exact second by bisection, so transitions closer together than a
+    day would be missed; no zone has any.
 
     Returns:
-        str: 8-character compact timestamp
+        tuple: (starts, offsets, names) where offsets[i] (in seconds) and
+            names[i] apply from Unix second starts[i] until starts[i + 1]
+    """
+    from datetime import datetime
+
+    zone = _zone(tz)
+
+    def offset(unix_s):
+        dt = datetime.fromtimestamp(unix_s, tz=zone)
+        return int(dt.utcoffset().total_seconds()), dt.tzname()
+
+    starts, offsets, names = [low_s], *zip(offset(low_s))
+    offsets, names = list(offsets), list(names)
+    before = (offsets[0], names[0])
+    for sample_s in range(low_s + 86400, high_s + 86400, 86400):
+        sample_s = min(sample_s, high_s)
+        after = offset(sample_s)
+        if after != before:
+            low, high = sample_s - 86400, sample_s
+            while high - low > 1:
+                middle = (low + high) // 2
+                if offset(middle) == before:
+                    low = middle
+                else:
+                    high = middle
+            starts.append(high)
+            offsets.append(after[0])
+            names.append(after[1])
+            before = after
+    return starts, offsets, names
+
+
+def to_local_many(unix_ms_values, tz="America/New_York", unit="ms"):
     """
-    year, week, day, frac = to_parts_from_ms(unix_ms)
-    frac_int = int(frac * 8**4)
-    year_oct = f"{year:o}".replace("-", "0")
-    week_oct = f"{week:02o}"
-    day_oct = f"{day:01o}"
-    frac_oct = f"{frac_int:04o}"
-    full_string = f"{year_oct}{week_oct}{day_oct}{frac_oct}"[::-1][:8]
-    return full_string
+    Get many times in one IANA time zone, as to_local formats them.
 
+    The zone's offsets over the span of the input are found once and each
+    timestamp is placed among them by binary search, so no datetime is
+    built per timestamp. Dates are rendered once per local day. The last
+    few offset tables of each zone are kept for later batches, and a batch
+    spread over more than LOCAL_DAYS_PER_ROW days a row is formatted a
+    row at a time instead.
+    Unlike to_local, 0 means the Unix epoch rather than now.
 
-def to_ucy(unix_ms=None):
+    Args:
+        unix_ms_values (iterable): Unix timestamps in milliseconds, or
+            anything else to_unix_ms reads
+        tz (str, optional): IANA zone name. Defaults to "America/New_York".
+        unit (str, optional): Unit of numbers: "s", "ms", "us" or "ns". Defaults to "ms".
+
+    Returns:
+        list: Local times in format "YYYY-MM-DD HH:MM AM/PM ZONE", in input order
+    """
+    from bisect import bisect_right
+    from datetime import date
+
+    values = list(unix_ms_values)
+    if unit != "ms":
+        values = to_unix_ms_many(values, unit)
+    if not values:
+        return []
+    try:
+        seconds = _local_seconds(values)
+    except TypeError:
+        # ISO-8601 text, datetimes or dates among the numbers
+        values = to_unix_ms_many(values)
+        seconds = _local_seconds(values)
+    low_s, high_s = min(seconds), max(seconds) + 1
+    if low_s < LOCAL_MIN_S or high_s > LOCAL_MAX_S:
+        # Let datetime raise for times it cannot represent
+        return _local_rows(values, tz)
+    tables = _zone_tables.get(tz, ())
+    for table in tables:
+        if table[0] <= low_s and high_s <= table[1]:
+            break
+    else:
+        if high_s - low_s > LOCAL_DAYS_PER_ROW * len(values) * 86400:
+            return _local_rows(values, tz)
+        # Whole UTC days, so nearby batches fit in the same table
+        low_s, high_s = low_s // 86400 * 86400, -(-high_s // 86400) * 86400
+        table = (low_s, high_s, *_zone_table(tz, low_s, high_s))
+        _zone_tables[tz] = (table,) + tables[: ZONE_TABLES - 1]
+    _, high_s, starts, offsets, names = table
+    clock = _clock_texts()
+    dates, rows = {}, []
+    append = rows.append
+    start = end = offset = 0
+    for unix_s in seconds:
+        if not start <= unix_s < end:
+            index = bisect_right(starts, unix_s) - 1
+            start = starts[index]
+            end = starts[index + 1] if index + 1 < len(starts) else high_s + 1
+            offset, name = offsets[index], " " + names[index]
+        days, minute = divmod((unix_s + offset) // 60, 1440)
+        text = dates.get(days)
+        if text is None:
+            day = date.fromordinal(days + 719163)
+            # strftime leaves years below 1000 unpadded on some platforms
+            text = day.isoformat() if day.year >= 1000 else day.strftime("%Y-%m-%d")
+            text = dates[days] = text + " "
+        append(text + clock[minute] + name)
+    return rows
+
+
+def _local_rows(values, tz):
+    # to_local a row at a time, except that 0 stays the epoch
+    from datetime import datetime
+
+    zone = _zone(tz)
+    return [
+        datetime.fromtimestamp(unix_ms / 1000, tz=zone).strftime(LOCAL_FORMAT)
+        for unix_ms in values
+    ]
+
+
+def _local_seconds(values):
+    """Whole Unix seconds, with microseconds rounded like datetime.fromtimestamp."""
+    import math
+
+    seconds = []
+    for unix_ms in values:
+        if unix_ms.__class__ is int:
+            seconds.append(unix_ms // 1000)
+        else:
+            fraction, whole = math.modf(unix_ms / 1000)
+            seconds.append((int(whole) * 1000000 + round(fraction * 1e6)) // 1000000)
+    return seconds
+
+
+def _clock_texts():
+    global _clock
+    if _clock is None:
+        _clock = [
+            f"{(hour - 1) % 12 + 1:02d}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+            for hour in range(24)
+            for minute in range(60)
+        ]
+    return _clock
+
+
+def _convert_chunk(unix_ms_values, formats):
+    parts = to_parts_many(unix_ms_values)
+    formatters = {"orbeat8": _format_orbeat8, "ucy": _format_ucy}
+    return [[formatters[name](*item) for item in parts] for name in formats]
+
+
+def _convert_into(memory_name, start, unix_ms_values, formats, total):
+    from multiprocessing import shared_memory
+
+    memory = shared_memory.SharedMemory(memory_name)
+    try:
+        offset = 0
+        for name, codes in zip(formats, _convert_chunk(unix_ms_values, formats)):
+            width = FORMAT_WIDTHS[name]
+            if any(len(code) > width for code in codes):
+                raise ValueError(f"{name} code wider than {width} characters")
+            at = offset + start * width
+            data = "".join([code.ljust(width) for code in codes]).encode("ascii")
+            memory.buf[at : at + len(data)] = data
+            offset += total * width
+    finally:
+        memory.close()
+
+
+def to_orbeat8_many(unix_ms_values, unit="ms"):
     """
-    Converts Unix timestamp to UCY format: YYYY_WW_D.FFFF
+    Convert many Unix timestamps to compact 8-character Orbeat format.
 
-    UCY:
-        How those without shadows play hide and seek with the sun.
+    orbeat_engine picks how: the scalar functions for a tiny batch, the
+    batch path, or a process pool for a large one on a machine with
+    several cores.
 
     Args:
-        unix_ms (int, optional): Unix timestamp in milliseconds. Defaults to current time.
+        unix_ms_values (iterable): Unix timestamps in milliseconds
+        unit (str, optional): Unit of numbers: "s", "ms", "us" or "ns". Defaults to "ms".
 
     Returns:
-        str: Human-readable timestamp
-    """
-    year, week, day, frac = to_parts_from_ms(unix_ms)
-    frac_int = int(frac * 8**4)
-    year_oct = f"{year:o}".replace("-", "0")
-    week_oct = f"{week:02o}"
-    day_oct = f"{day:01o}"
-    frac_oct = f"{frac_int:04o}"
-    full_string = f"{year_oct}_{week_oct}_{day_oct}.{frac_oct}"
-    return full_string
+        list: 8-character compact timestamps in input order
+    """
+    # orbeat_engine imports this module, so it is imported on first use
+    import orbeat_engine
+
+    return orbeat_engine.to_orbeat8_many(unix_ms_values, unit)
+
+
+def to_ucy_many(unix_ms_values, unit="ms"):
+    """
+    Convert many Unix timestamps to UCY format: YYYY_WW_D.FFFF
+
+    The engine is picked as for to_orbeat8_many.
+
+    Args:
+        unix_ms_values (iterable): Unix timestamps in milliseconds
+        unit (str, optional): Unit of numbers: "s", "ms", "us" or "ns". Defaults to "ms".
+
+    Returns:
+        list: Human-readable timestamps in input order
+    """
+    import orbeat_engine
+
+    return orbeat_engine.to_ucy_many(unix_ms_values, unit)
+
+
+def convert_many(
+    unix_ms_values,
+    formats=("orbeat8",),
+    executor=None,
+    chunk_size=CHUNK_SIZE,
+    unit="ms",
+):
+    """
+    Convert many Unix timestamps to several formats, optionally in parallel.
+
+    Without an executor, orbeat_engine picks the engine for the batch,
+    which may be its own process pool. Otherwise the input is split into
+    chunks of chunk_size, each converted with the batch path. With a
+    thread pool the chunks' lists are joined directly.
+    With a process pool each worker writes its codes as fixed-width ASCII
+    into one shared memory block at the chunk's position, so the results
+    are never pickled on the way back.
+
+    Args:
+        unix_ms_values (iterable): Unix timestamps in milliseconds
+        formats (iterable, optional): Names from FORMAT_WIDTHS. Defaults to ("orbeat8",).
+        executor (concurrent.futures.Executor, optional): Pool to run chunks
+            on. Defaults to the engine orbeat_engine picks.
+        chunk_size (int, optional): Timestamps per task. Defaults to 65536.
+        unit (str, optional): Unit of numbers: "s", "ms", "us" or "ns". Defaults to "ms".
+
+    Returns:
+        dict: List of codes in input order keyed by format name
+    """
+    if executor is None:
+        import orbeat_engine
+
+        return orbeat_engine.convert_many(unix_ms_values, formats, unit)
+    if unit == "ms":
+        values = list(unix_ms_values)
+    else:
+        values = to_unix_ms_many(unix_ms_values, unit)
+    formats = list(formats)
+    for name in formats:
+        if name not in FORMAT_WIDTHS:
+            raise ValueError(f"unknown format: {name}")
+    starts = range(0, len(values), chunk_size)
+    from concurrent.futures import ProcessPoolExecutor
+
+    if not isinstance(executor, ProcessPoolExecutor):
+        results = {name: [] for name in formats}
+        futures = [
+            executor.submit(_convert_chunk, values[i : i + chunk_size], formats)
+            for i in starts
+        ]
+        for future in futures:
+            for name, codes in zip(formats, future.result()):
+                results[name] += codes
+        return results
+    from multiprocessing import shared_memory
+
+    total = len(values)
+    size = total * sum(FORMAT_WIDTHS[name] for name in formats)
+    memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    try:
+        futures = [
+            executor.submit(
+                _convert_into,
+                memory.name,
+                i,
+                values[i : i + chunk_size],
+                formats,
+                total,
+            )
+            for i in starts
+        ]
+        for future in futures:
+            future.result()
+        results, offset = {}, 0
+        for name in formats:
+            width = FORMAT_WIDTHS[name]
+            text = bytes(memory.buf[offset : offset + total * width]).decode("ascii")
+            codes = [text[i : i + width] for i in range(0, total * width, width)]
+            results[name] = codes if name == "orbeat8" else [c.rstrip() for c in codes]
+            offset += total * width
+        return results
+    finally:
+        memory.close()
+        memory.unlink()
 
 
 if __name__ == "__main__":  # pragma: no cover
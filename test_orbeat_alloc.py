@@ -0,0 +1,53 @@
+import sys, pytest
+import orbeat_time
+from orbeat_bench import allocations, allocations_per_call
+
+# Peak bytes and retained blocks per call, or per item for batch paths,
+# with about twice the headroom of CPython 3.12 so a reintroduced
+# closure or intermediate string trips them. to_eastern's strftime keeps
+# a varying few blocks in the interpreter's own caches: 1.0-1.5 a call on
+# 3.11, 1.2-3.1 on 3.12 and 1.0-2.6 on 3.13 over 100 calls
+BUDGETS = {
+    "to_parts_from_ms": (520, 2),
+    "to_parts_from_ms_ref": (520, 2),
+    "to_orbeat8": (800, 2),
+    "to_ucy": (800, 2),
+    "to_eastern": (10000, 6),
+    "from_ucy": (700, 3),
+    "from_orbeat8": (800, 3),
+    "to_parts_many": (64, 2),
+    "to_orbeat8_many": (200, 1.5),
+    "to_ucy_many": (200, 1.5),
+    "from_ucy_many": (160, 3),
+    "from_orbeat8_many": (160, 3),
+    "to_local_many": (300, 1.5),
+    "to_unix_ms_many": (100, 1.5),
+}
+
+
+@pytest.fixture(scope="module")
+def measured():
+    # Enough scalar calls that those caches filling up average out
+    return allocations(size=1000, repeat=100)
+
+
+@pytest.mark.skipif(
+    sys.implementation.name != "cpython", reason="budgets are for CPython"
+)
+@pytest.mark.parametrize("name", BUDGETS)
+def test_allocation_budget(measured, name):
+    peak_budget, block_budget = BUDGETS[name]
+    assert measured[name]["peak_bytes"] <= peak_budget
+    assert measured[name]["blocks"] <= block_budget
+
+
+def test_budgets_cover_every_public_function(measured):
+    assert set(measured) == set(BUDGETS)
+
+
+def test_allocations_per_call_sees_retained_blocks():
+    peak, blocks = allocations_per_call(lambda: [0] * 1000)
+    assert peak >= 8000
+    assert blocks == pytest.approx(1)
+    peak, blocks = allocations_per_call(lambda: None)
+    assert peak == 0 and blocks == 0
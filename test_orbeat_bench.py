@@ -0,0 +1,92 @@
+import json, subprocess, sys, pytest
+import orbeat_bench
+from orbeat_bench import BATCH, SCALAR, THREADED, WORKLOADS, compare, run, workload
+
+
+@pytest.mark.parametrize("name", WORKLOADS)
+def test_workloads_are_repeatable(name):
+    values = workload(name, 500, seed=3)
+    assert len(values) == 500
+    assert values == workload(name, 500, seed=3)
+    assert values != workload(name, 500, seed=4)
+
+
+def test_workload_shapes():
+    monotone = workload("monotone", 1000)
+    assert monotone == sorted(monotone)
+    bursty = workload("bursty", 1000)
+    assert len({unix_ms // 3600000 for unix_ms in bursty}) <= 32
+    with pytest.raises(ValueError):
+        workload("steady", 10)
+
+
+def test_run_covers_every_function_and_workload():
+    metrics = run(size=200, repeat=1, startup=False)
+    expected = {f"{f}/{w}" for f in SCALAR + BATCH for w in WORKLOADS}
+    assert set(metrics) == expected | {"drift_analyze"}
+    assert all(value > 0 for value in metrics.values())
+    assert set(run(size=50, repeat=1, only="ucy_many", startup=False)) == {
+        f"{f}/{w}" for f in ["to_ucy_many", "from_ucy_many"] for w in WORKLOADS
+    }
+
+
+def test_compare_flags_only_regressions_beyond_tolerance():
+    baseline = {"a": 100.0, "b": 100.0, "c": 100.0}
+    metrics = {"a": 124.0, "b": 126.0, "c": 50.0, "new": 1.0}
+    assert compare(metrics, baseline) == [("b", 100.0, 126.0)]
+    assert compare(metrics, baseline, tolerance=0.1) == [
+        ("a", 100.0, 124.0),
+        ("b", 100.0, 126.0),
+    ]
+
+
+def run_bench(*args):
+    return subprocess.run(
+        [sys.executable, "-m", "orbeat_cli", "bench", *args],
+        capture_output=True,
+        text=True,
+    )
+
+
+def test_cli_save_and_compare(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    args = ["--size", "100", "--repeat", "1", "--only", "startup"]
+    saved = run_bench(*args, "--save", str(baseline))
+    assert saved.returncode == 0
+    metrics = json.loads(baseline.read_text())["metrics"]
+    assert set(metrics) == {"cli_startup"}
+    assert (
+        run_bench(*args, "--compare", str(baseline), "--tolerance", "9").returncode == 0
+    )
+    metrics["cli_startup"] = 1.0
+    baseline.write_text(json.dumps({"metrics": metrics}))
+    failed = run_bench(*args, "--compare", str(baseline))
+    assert failed.returncode == 1
+    assert "REGRESSION cli_startup" in failed.stdout
+
+
+def test_zero_tolerance_is_not_the_default(tmp_path, monkeypatch, capsys):
+    import orbeat_cli
+
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps({"metrics": {"cli_startup": 100.0}}))
+    monkeypatch.setattr(orbeat_bench, "run", lambda *a, **k: {"cli_startup": 110.0})
+    args = ["bench", "--compare", str(baseline)]
+    assert orbeat_bench.main(orbeat_cli.parse_args(args)) == 0
+    strict = orbeat_cli.parse_args(args + ["--tolerance", "0"])
+    assert orbeat_bench.main(strict) == 1
+
+
+def test_scaling_reports_each_thread_count():
+    results = orbeat_bench.scaling([1, 3], size=200, repeat=1)
+    assert set(results) == set(THREADED)
+    assert all(set(rates) == {1, 3} for rates in results.values())
+    assert all(rate > 0 for rates in results.values() for rate in rates.values())
+    assert set(orbeat_bench.scaling([2], 10, 1, only="cached")) == {"to_parts_cached"}
+
+
+def test_cli_threads():
+    result = run_bench("--threads", "1,2", "--only", "to_parts_cached")
+    assert result.returncode == 0
+    assert result.stdout.startswith("GIL ")
+    assert "to_parts_cached            2 threads" in result.stdout
@@ -0,0 +1,68 @@
+import random, threading, pytest
+import orbeat_cache
+from orbeat_cache import cache_info, configure, to_parts_cached
+from orbeat_time import MS_PER_DAY, to_orbeat8, to_parts_from_ms, to_ucy
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    configure()
+    yield
+    configure()
+
+
+def test_matches_scalar_conversion():
+    rng = random.Random(5)
+    values = [rng.randrange(-2208988800000, 4102444800000) for _ in range(5000)]
+    values += [1616489999000, 1741500000000, -127841073120000, 1700000000000.5]
+    for unix_ms in values:
+        assert to_parts_cached(unix_ms) == to_parts_from_ms(unix_ms)
+        assert orbeat_cache.to_orbeat8_cached(unix_ms) == to_orbeat8(unix_ms)
+        assert orbeat_cache.to_ucy_cached(unix_ms) == to_ucy(unix_ms)
+    assert len(to_parts_cached()) == 4
+
+
+def test_hits_and_misses_per_day():
+    for unix_ms in range(1700000000000, 1700000000000 + 3600000, 60000):
+        to_parts_cached(unix_ms)
+    assert cache_info() == {"hits": 59, "misses": 1, "size": 1, "maxsize": 4096}
+    orbeat_cache.cache_clear()
+    assert cache_info()["size"] == 0 and cache_info()["hits"] == 0
+
+
+def test_evicts_least_recently_used_day():
+    configure(2)
+    first, second, third = (1700000000000 + n * MS_PER_DAY for n in range(3))
+    to_parts_cached(first)
+    to_parts_cached(second)
+    to_parts_cached(first)
+    to_parts_cached(third)
+    assert cache_info()["size"] == 2
+    to_parts_cached(first)
+    assert cache_info()["misses"] == 3
+    to_parts_cached(second)
+    assert cache_info()["misses"] == 4
+    with pytest.raises(ValueError):
+        configure(0)
+
+
+def test_shared_between_threads():
+    configure(8)
+    values = [1700000000000 + n * MS_PER_DAY // 3 for n in range(200)]
+    expected = [to_parts_from_ms(unix_ms) for unix_ms in values]
+    failures = []
+
+    def work():
+        for _ in range(20):
+            if [to_parts_cached(unix_ms) for unix_ms in values] != expected:
+                failures.append(1)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    info = cache_info()
+    assert not failures
+    assert info["hits"] + info["misses"] == 8 * 20 * len(values)
+    assert info["size"] <= 8
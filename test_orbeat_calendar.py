@@ -0,0 +1,73 @@
+import random, pytest
+import orbeat_time
+from orbeat_time import DATUM_JDN, DEFAULT_CALENDAR, MS_PER_DAY, OrbeatCalendar
+
+SAMPLES = [1, 1616489999000, 1700000000000, 1741500000000, 4102444800000]
+SAMPLES += random.Random(9).sample(range(-2208988800000, 4102444800000, 1000), 2000)
+
+
+def test_module_functions_are_the_default_calendar():
+    assert orbeat_time.to_orbeat8.__self__ is DEFAULT_CALENDAR
+    assert orbeat_time.from_ucy_many.__self__ is DEFAULT_CALENDAR
+    calendar = OrbeatCalendar()
+    assert calendar.to_parts_many(SAMPLES) == orbeat_time.to_parts_many(SAMPLES)
+    assert [calendar.to_ucy(ms) for ms in SAMPLES] == orbeat_time.to_ucy_many(SAMPLES)
+    assert repr(calendar).startswith("OrbeatCalendar(datum_jdn=1705433,")
+
+
+def test_year_start_table_matches_formula():
+    calendar = OrbeatCalendar()
+    assert calendar.cycle == 1024
+    for year in list(range(-2000, 5000)) + [10**9, 2**40 - 1, 2**40, 2**41]:
+        assert calendar.year_start(year) == calendar._year_start(year)
+
+
+@pytest.mark.parametrize("first, last", [(0, 3000), (1020, 1030), (5, 5), (-9, 9)])
+def test_year_starts_match_year_start(first, last):
+    expected = [DEFAULT_CALENDAR.year_start(year) for year in range(first, last)]
+    assert DEFAULT_CALENDAR.year_starts(first, last) == expected
+
+
+def test_year_starts_without_cycle_table():
+    calendar = OrbeatCalendar(days_per_year=365.2422)
+    assert calendar.cycle is None
+    assert calendar.year_starts(10, 20) == list(map(calendar.year_start, range(10, 20)))
+
+
+def test_shifted_datum_runs_alongside_default():
+    later = OrbeatCalendar(datum_jdn=DATUM_JDN + 8)
+    for unix_ms in SAMPLES:
+        shifted = unix_ms - 8 * MS_PER_DAY
+        assert later.to_parts_from_ms(unix_ms) == orbeat_time.to_parts_from_ms(shifted)
+        assert later.to_ucy(unix_ms) == orbeat_time.to_ucy(shifted)
+    assert orbeat_time.to_ucy(1700000000000) == "4022_36_6.4320"
+
+
+@pytest.mark.parametrize(
+    "calendar",
+    [
+        OrbeatCalendar(days_per_year=365.24219),
+        OrbeatCalendar(days_per_year=365.25),
+        OrbeatCalendar(y1=-0.6),
+    ],
+    ids=["no cycle", "short cycle", "low estimate"],
+)
+def test_variant_calendars_are_consistent(calendar):
+    days = range(0, 2000000, 997)
+    for day in days:
+        year, start, end = calendar.year_span(day)
+        assert start <= day < end
+        assert end - start in (calendar.standard_year, calendar.short_year)
+        assert (start, end) == calendar.year_bounds(year)
+    values = [day * MS_PER_DAY - calendar.offset_ms + 12345 for day in days]
+    parts = calendar.to_parts_many(values)
+    assert calendar.to_ucy_many(values) == [calendar.to_ucy(ms) for ms in values]
+    for unix_ms, code in zip(values, calendar.to_ucy_many(values)):
+        start_ms, end_ms = calendar.from_ucy(code)
+        assert start_ms <= unix_ms < end_ms
+    assert len(parts) == len(values)
+
+
+def test_cycle_only_for_short_repeats():
+    assert OrbeatCalendar(days_per_year=365.24219).cycle is None
+    assert OrbeatCalendar(days_per_year=365.25).cycle == 32
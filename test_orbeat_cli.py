@@ -1,13 +1,20 @@
-import json, subprocess, pytest
+import io, json, signal, subprocess, pytest
 from datetime import datetime
 import orbeat_cli
+from orbeat_cli import OUTPUT_FORMATS, decode_rows, iso_ms, read_chunks, watch
+from orbeat_cli import write_batch, write_rows
+from orbeat_time import next_boundary_ms, to_orbeat8, to_ucy, from_orbeat8, from_ucy
 
+IMPORT_BUDGET_US = 50000
+LAZY_MODULES = {"argparse", "json", "datetime", "zoneinfo"}
 
-def run_cli(*args):
+
+def run_cli(*args, input=None):
     result = subprocess.run(
         ["python", "-m", "orbeat_cli", *args],
         capture_output=True,
         text=True,
+        input=input,
     )
     return result.stdout.strip(), result.stderr.strip()
 
@@ -26,6 +33,15 @@ def test_cli_json():
     assert datetime.fromisoformat(data["iso"])
 
 
+@pytest.mark.parametrize("output", ["compact", "ndjson"])
+def test_cli_single_line_json(output):
+    out, _ = run_cli("--output", output)
+    assert "\n" not in out
+    data = json.loads(out)
+    assert len(data["orbeat"]) == 8
+    assert datetime.fromisoformat(data["iso"])
+
+
 def test_cli_help():
     out, _ = run_cli("-h")
     assert "usage: orbeat" in out
@@ -41,3 +57,226 @@ def test_cli_errors():
 def test_cli_no_args():
     out, _ = run_cli()
     assert len(out) == 8
+
+
+def test_cli_serve_bench():
+    out, _ = run_cli("serve", "--bench", "20")
+    data = json.loads(out)
+    assert set(data) == {"/now", "/convert", "/batch"}
+    assert data["/now"]["requests"] == 20
+
+
+def import_times(*args):
+    """Run python -X importtime and map each imported module to its cumulative us."""
+    result = subprocess.run(
+        ["python", "-X", "importtime", *args], capture_output=True, text=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        fields = line.removeprefix("import time:").split("|")
+        if len(fields) == 3 and fields[1].strip().isdigit():
+            times[fields[2].strip()] = int(fields[1])
+    return times
+
+
+def test_cli_default_skips_lazy_imports():
+    imported = set(import_times("-m", "orbeat_cli"))
+    assert "orbeat_time" in imported
+    assert not imported & LAZY_MODULES
+
+
+def test_cli_import_budget():
+    times = import_times("-c", "import orbeat_cli")
+    assert times["orbeat_cli"] < IMPORT_BUDGET_US
+
+
+BATCH_MS = [1700000000000, 1741500000000, 1600000000000]
+
+
+def expected_rows(values):
+    return [{"ms": ms, "orbeat": to_orbeat8(ms), "ucy": to_ucy(ms)} for ms in values]
+
+
+def test_cli_convert_args_and_stdin():
+    out, _ = run_cli("convert", *map(str, BATCH_MS))
+    assert out.splitlines() == [to_orbeat8(ms) for ms in BATCH_MS]
+    stdin = "\n".join(map(str, BATCH_MS)) + "\n\n"
+    out, _ = run_cli("convert", "--output", "ndjson", input=stdin)
+    assert [json.loads(line) for line in out.splitlines()] == expected_rows(BATCH_MS)
+    out, _ = run_cli("--output", "json", "convert", input=stdin)
+    assert json.loads(out) == expected_rows(BATCH_MS)
+    out, _ = run_cli("convert", "--output", "compact", input=stdin)
+    assert "\n" not in out and json.loads(out) == expected_rows(BATCH_MS)
+
+
+def test_cli_convert_iso_times():
+    times = ["2023-11-14T22:13:20Z", "2023-11-14 17:13:20.5-05:00"]
+    out, _ = run_cli("convert", "--output", "ndjson", *times)
+    rows = [json.loads(line) for line in out.splitlines()]
+    assert [row["ms"] for row in rows] == [1700000000000, 1700000000500]
+    out, _ = run_cli("convert", input="2023-11-14T22:13:20\n1700000000000\n")
+    assert out.splitlines() == [to_orbeat8(1700000000000)] * 2
+
+
+def test_cli_merge(tmp_path):
+    log = tmp_path / "host.log"
+    log.write_text(f"{to_ucy(1700000100000)} later\n")
+    stdin = f"{to_orbeat8(1700000000000)} earlier\n"
+    out, _ = run_cli("merge", str(log), "-", "--near", "2023-11-14", input=stdin)
+    assert [line.split()[1] for line in out.splitlines()] == ["earlier", "later"]
+
+
+def test_cli_convert_invalid_stdin():
+    _, err = run_cli("convert", input="1700000000000\nsoon\n")
+    assert "invalid ms: soon" in err
+
+
+@pytest.mark.parametrize("output", OUTPUT_FORMATS)
+def test_write_batch_streams_chunks(output):
+    values = list(range(1700000000000, 1700000000000 + 10 * 86400000, 86400000))
+    buffer = io.StringIO()
+    write_batch(read_chunks(map(str, values), size=3), output, buffer)
+    text = buffer.getvalue()
+    if output == "orbeat":
+        assert text.splitlines() == [to_orbeat8(ms) for ms in values]
+    elif output == "ndjson":
+        assert [json.loads(line) for line in text.splitlines()] == expected_rows(values)
+    else:
+        assert json.loads(text) == expected_rows(values)
+    empty = io.StringIO()
+    write_batch([], output, empty)
+    assert empty.getvalue() in ("", "[]\n")
+
+
+class FakeClock:
+    """Wall clock that only advances when slept on, waking early every other time."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.sleeps = []
+
+    def __call__(self):
+        return self.seconds
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.seconds += seconds * 0.6 if len(self.sleeps) % 2 else seconds
+
+
+def stamp(unix_ms, unit):
+    ucy = to_ucy(unix_ms)
+    return {"tick": ucy, "day": ucy[:-5], "week": ucy[:-7]}[unit]
+
+
+@pytest.mark.parametrize("unit", ["tick", "day", "week"])
+def test_watch_prints_on_each_change(unit):
+    clock = FakeClock(1700000000.123)
+    out = io.StringIO()
+    watch(unit, "ndjson", out, count=5, clock=clock, sleep=clock.sleep)
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert len(rows) == 5
+    for before, after in zip(rows, rows[1:]):
+        boundary = next_boundary_ms(before["ms"], unit)
+        assert boundary <= after["ms"] < boundary + 2
+        assert stamp(before["ms"], unit) != stamp(after["ms"], unit)
+    assert all(row["orbeat"] == to_orbeat8(row["ms"]) for row in rows)
+
+
+def test_watch_json_rows():
+    clock = FakeClock(1700000000.0)
+    out = io.StringIO()
+    watch("tick", "json", out, count=1, clock=clock, sleep=clock.sleep)
+    assert json.loads(out.getvalue())["ucy"] == to_ucy(1700000000000)
+    assert clock.sleeps == []
+
+
+def test_cli_watch_count():
+    out, _ = run_cli("--watch", "--count", "1")
+    assert len(out) == 8
+
+
+def test_cli_watch_stops_quietly_on_closed_pipe():
+    process = subprocess.Popen(
+        ["python", "-m", "orbeat_cli", "--watch", "--unit", "tick"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    assert len(process.stdout.readline().strip()) == 8
+    process.stdout.close()
+    process.send_signal(signal.SIGINT)
+    assert process.wait(timeout=10) == 0
+    assert b"Traceback" not in process.stderr.read()
+
+
+def test_cli_decode_codes_and_stdin():
+    near = "2023-11-14T22:13:20"
+    codes = [to_ucy(1700000000000), to_orbeat8(1741500000000)]
+    out, _ = run_cli("decode", "--near", near, *codes)
+    starts = [from_ucy(codes[0])[0], from_orbeat8(codes[1], 1700000000000)[0]]
+    assert out.splitlines() == [iso_ms(start) for start in starts]
+    out, _ = run_cli(
+        "decode", "--ms", "--near", "1700000000000", input="\n".join(codes)
+    )
+    ranges = [line.split() for line in out.splitlines()]
+    assert [int(start) for start, _ in ranges] == starts
+    out, _ = run_cli("decode", "--output", "ndjson", "--ms", codes[0])
+    assert json.loads(out) == dict(
+        zip(["code", "start", "end"], [codes[0], *from_ucy(codes[0])])
+    )
+    out, _ = run_cli("--output", "json", "decode", codes[0])
+    assert json.loads(out)[0]["start"] == iso_ms(starts[0])
+
+
+@pytest.mark.parametrize("output", OUTPUT_FORMATS)
+def test_decode_rows_streams_mixed_chunks(output):
+    values = list(range(1700000000000, 1700000000000 + 10 * 86400000, 86400000))
+    codes = [to_ucy(ms) if ms % 3 else to_orbeat8(ms) for ms in values]
+    buffer = io.StringIO()
+    chunks = read_chunks(codes, size=4, parse=str)
+    write_rows(
+        (decode_rows(chunk, values[0], True, output) for chunk in chunks),
+        output,
+        buffer,
+    )
+    starts = [from_ucy(to_ucy(ms))[0] for ms in values]
+    text = buffer.getvalue()
+    if output == "orbeat":
+        assert [int(line.split()[0]) for line in text.splitlines()] == starts
+    elif output == "ndjson":
+        assert [json.loads(line)["start"] for line in text.splitlines()] == starts
+    else:
+        assert [row["start"] for row in json.loads(text)] == starts
+
+
+@pytest.mark.parametrize(
+    "args,message",
+    [
+        (["decode", "1234"], "8 digits"),
+        (["decode", "--near", "soon", "65314335"], "invalid time: soon"),
+    ],
+)
+def test_cli_decode_errors(args, message):
+    _, err = run_cli(*args)
+    assert message in err
+
+
+def test_cli_drift():
+    out, _ = run_cli("drift", "--first", "2000", "--last", "2099")
+    report = json.loads(out)
+    assert (report["first"], report["last"]) == (2000, 2099)
+    assert -4.5 <= report["drift"]["min"] <= report["drift"]["max"] <= 4
+
+
+def test_cli_calibrate(monkeypatch, tmp_path):
+    path = tmp_path / "engine.json"
+    monkeypatch.setenv("ORBEAT_CALIBRATION", str(path))
+    out, _ = run_cli("calibrate")
+    report = json.loads(out)
+    assert report["path"] == str(path)
+    assert json.loads(path.read_text())["thresholds"] == report["thresholds"]
+
+
+def test_cli_calendar():
+    out, _ = run_cli("calendar", "2066", "2067", "--unit", "year")
+    assert out.splitlines()[0] == "code,year,start_ms,days,weeks,long"
+    assert [line.split(",")[0] for line in out.splitlines()[1:]] == ["4022", "4023"]
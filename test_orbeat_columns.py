@@ -0,0 +1,70 @@
+import random, pytest
+from orbeat_columns import ColumnReader, ColumnWriter, _get, _put
+from orbeat_time import OFFSET_MS, to_parts_many
+
+
+def sorted_events(size, seed=0):
+    rng, unix_ms, values = random.Random(seed), 1700000000000, []
+    for _ in range(size):
+        unix_ms += rng.randrange(2000)
+        values.append(unix_ms)
+    return values
+
+
+def test_round_trip_and_size(tmp_path):
+    values = sorted_events(20000)
+    path = tmp_path / "events.orbc"
+    with ColumnWriter(path, block_rows=1000) as writer:
+        writer.write(values[:500])
+        writer.write(iter(values[500:]))
+    assert path.stat().st_size < 3 * len(values)
+    with ColumnReader(path) as reader:
+        assert len(reader) == len(values) and len(reader.blocks) == 20
+        assert list(reader) == values
+        assert reader.block_parts(7) == to_parts_many(values[7000:8000])
+        assert reader.between(values[4321], values[12345]) == values[4321:12345]
+        assert reader.between(0, values[0]) == []
+
+
+def test_any_order_and_every_year_shape(tmp_path):
+    rng = random.Random(1)
+    values = [rng.randrange(-OFFSET_MS, 10**14) for _ in range(3000)]
+    values += [-OFFSET_MS, 1616489999000, 1616490000000]
+    path = tmp_path / "mixed.orbc"
+    with ColumnWriter(path, block_rows=256) as writer:
+        writer.write(values)
+    with ColumnReader(path) as reader:
+        assert list(reader) == values
+        low, high = sorted(values)[100], sorted(values)[200]
+        assert reader.between(low, high) == [v for v in values if low <= v < high]
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "empty.orbc"
+    ColumnWriter(path).close()
+    with ColumnReader(path) as reader:
+        assert len(reader) == 0 and list(reader) == [] and reader.between(0, 1) == []
+
+
+def test_rejects_bad_input(tmp_path):
+    with ColumnWriter(tmp_path / "bad.orbc") as writer:
+        for value in [1.5, -OFFSET_MS - 1]:
+            with pytest.raises(ValueError):
+                writer.write([value])
+    path = tmp_path / "junk.orbc"
+    for junk in [b"\0" * 32, b"", b"ORBC\1"]:
+        path.write_bytes(junk)
+        with pytest.raises(ValueError, match="not an Orbeat column file"):
+            ColumnReader(path)
+    data = bytearray((tmp_path / "bad.orbc").read_bytes())
+    data[4] = 9
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError):
+        ColumnReader(path)
+
+
+def test_varints():
+    for n in [0, 1, 127, 128, 300, 2**40, 2**64]:
+        out = bytearray()
+        _put(out, n)
+        assert _get(out, 0) == (n, len(out))
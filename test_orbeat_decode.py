@@ -0,0 +1,87 @@
+import random, pytest
+from orbeat_time import from_orbeat8, from_orbeat8_many, from_ucy, from_ucy_many
+from orbeat_time import to_orbeat8, to_ucy, MS_PER_DAY, OFFSET_MS
+
+YEAR_MS = int(365.2421875 * MS_PER_DAY)
+
+
+def sample_ms(count, seed):
+    random.seed(seed)
+    return [random.randrange(1, 4000000000000) for _ in range(count)]
+
+
+@pytest.mark.parametrize("unix_ms", sample_ms(200, 7) + [1700000000000])
+def test_ucy_round_trip(unix_ms):
+    """Test that a UCY code decodes to the exact ms range sharing that code."""
+    code = to_ucy(unix_ms)
+    start, end = from_ucy(code)
+    assert start <= unix_ms < end
+    assert to_ucy(start) == to_ucy(end - 1) == code
+    assert to_ucy(start - 1) != code and to_ucy(end) != code
+
+
+def test_ucy_before_the_datum_raises_rather_than_misdecodes():
+    """Test that UCY codes from before the datum never decode to a wrong range."""
+    random.seed(11)
+    for _ in range(2000):
+        unix_ms = random.randrange(-2 * 10**14, 10**14)
+        code = to_ucy(unix_ms)
+        if unix_ms + OFFSET_MS < 0:
+            with pytest.raises(ValueError):
+                from_ucy(code)
+        else:
+            start, end = from_ucy(code)
+            assert start <= unix_ms < end
+    with pytest.raises(ValueError):
+        from_ucy_many(["4022_36_6.4320", "070_03_5.3161"])
+
+
+@pytest.mark.parametrize("offset_years", [-4, -3, -1, 0, 1, 3])
+def test_orbeat8_resolves_year_near_reference(offset_years):
+    """Test that the truncated year digit resolves within four years of near."""
+    for unix_ms in sample_ms(50, offset_years):
+        near_ms = unix_ms - offset_years * YEAR_MS
+        assert from_orbeat8(to_orbeat8(unix_ms), near_ms) == from_ucy(to_ucy(unix_ms))
+
+
+def test_orbeat8_defaults_to_now():
+    start, end = from_orbeat8(to_orbeat8())
+    assert to_orbeat8(start) == to_orbeat8()
+
+
+def test_batch_decoding_matches_scalar():
+    values = sample_ms(500, 11)
+    ucy = [to_ucy(ms) for ms in values]
+    assert from_ucy_many(ucy) == [from_ucy(code) for code in ucy]
+    near_ms = 1700000000000
+    nearby = [near_ms + ms % (6 * YEAR_MS) - 3 * YEAR_MS for ms in values]
+    codes = [to_orbeat8(ms) for ms in nearby]
+    assert from_orbeat8_many(codes, near_ms) == [
+        from_orbeat8(code, near_ms) for code in codes
+    ]
+    assert from_ucy_many([]) == from_orbeat8_many([], near_ms) == []
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "4025_33_4",
+        "4025_33_4.135",
+        "4025_3_4.1356",
+        "4025_33_8.1356",
+        "40x5_33_4.1356",
+        "4025-33-4.1356",
+        "4025_+3_4.1356",
+        "4025_56_0.0000",
+        "4025_00_0.0000",
+    ],
+)
+def test_invalid_ucy(code):
+    with pytest.raises(ValueError):
+        from_ucy(code)
+
+
+@pytest.mark.parametrize("code", ["6531433", "653143355", "6531433x", "65314385"])
+def test_invalid_orbeat8(code):
+    with pytest.raises(ValueError):
+        from_orbeat8(code, 1700000000000)
@@ -0,0 +1,63 @@
+import pytest
+from orbeat_drift import analyze, datum_year, drift_many, equinox_jd_many
+from orbeat_drift import equinox_offsets, summarize, tropical_days_many
+
+
+def test_equinox_matches_known_dates():
+    # 2000-03-20 07:35 UTC, then a tropical year either side of the switch
+    # between the two fitted ranges
+    assert equinox_jd_many([2000])[0] == pytest.approx(2451623.816, abs=0.01)
+    before, after = equinox_jd_many([999, 1000])
+    assert after - before == pytest.approx(365.2422, abs=0.01)
+
+
+def test_datum_year_is_44_bce():
+    assert datum_year() == -43
+
+
+def test_tropical_years_shorten():
+    days = tropical_days_many([0, 1, 2043, 2044])
+    assert days[0] == 0
+    # 44 BCE, then Orbeat year 2043, which starts in 2000 CE
+    assert days[1] == pytest.approx(365.242313, abs=1e-6)
+    assert days[3] - days[2] == pytest.approx(365.242190, abs=1e-6)
+
+
+def test_drift_stays_within_half_a_week():
+    drifts = drift_many()
+    assert len(drifts) == 4096
+    # The leap pattern swings starts by 4 days, and the fixed year length
+    # falls a little behind the tropical year first
+    assert all(-4.5 <= drift <= 4 for drift in drifts)
+    assert drift_many(100, 101) == [drifts[100]]
+
+
+def test_year_starts_stay_near_the_equinox():
+    offsets = equinox_offsets()
+    assert all(-6 < offset < 6 for offset in offsets)
+    # Orbeat year 2067 starts 2024-03-15 09:00 UTC, the equinox 2024-03-20 03:06
+    year = 2024 - datum_year()
+    assert equinox_offsets(year, year + 1)[0] == pytest.approx(-4.75, abs=0.01)
+
+
+def test_summarize():
+    summary = summarize([3.0, 1.0, 5.0, 7.0], first=10)
+    assert summary["min"] == 1.0 and summary["min_year"] == 11
+    assert summary["max"] == 7.0 and summary["max_year"] == 13
+    assert summary["mean"] == 4.0
+    assert summary["stdev"] == pytest.approx(5**0.5)
+    assert summary["slope"] == pytest.approx(1600.0)
+    assert summarize([2.0])["slope"] == 0.0
+    with pytest.raises(ValueError):
+        summarize([])
+
+
+def test_analyze_covers_every_year():
+    report = analyze(0, 8192)
+    assert (report["first"], report["last"]) == (0, 8191)
+    # The tropical year shortens while the calendar's stays the same, so
+    # year starts gain on it: about 0.9 days over 8192 years
+    assert 0.05 < report["drift"]["slope"] < 0.2
+    assert abs(report["drift"]["mean"]) < 0.5
+    # The equinox polynomials are extrapolated past 3000 CE here
+    assert -8 < report["equinox"]["min"] < report["equinox"]["max"] < 8
@@ -0,0 +1,74 @@
+import random, pytest
+from orbeat_duration import add, add_key, add_keys, add_many, difference
+from orbeat_duration import difference_keys, difference_many
+from orbeat_index import to_key
+from orbeat_time import MS_PER_DAY, OFFSET_MS, OrbeatCalendar, to_parts_from_ms
+from orbeat_time import to_parts_many
+
+TICK_MS = MS_PER_DAY / 4096
+rng = random.Random(8)
+SAMPLES = [rng.randrange(10**12 - OFFSET_MS, 10**14) for _ in range(300)]
+SAMPLES += [1616489999000, 1616490000000, 1700000000000]
+
+
+@pytest.mark.parametrize("n", [-1000, -3, 0, 1, 46, 400])
+def test_fixed_units_match_unix_ms(n):
+    parts = to_parts_many(SAMPLES)
+    assert add_many(parts, n) == to_parts_many(ms + n * MS_PER_DAY for ms in SAMPLES)
+    weeks = to_parts_many(ms + 8 * n * MS_PER_DAY for ms in SAMPLES)
+    assert add_many(parts, n, "week") == weeks
+    for moved, ms in zip(add_many(parts, n, "tick"), SAMPLES):
+        expected = to_parts_from_ms(ms + n * TICK_MS)
+        assert moved[:3] == expected[:3] and moved[3] == pytest.approx(expected[3])
+    later = to_parts_many(ms + n * MS_PER_DAY for ms in SAMPLES)
+    assert difference_many(later, parts) == [n] * len(SAMPLES)
+    assert difference_many(later, parts, "tick") == [n * 4096] * len(SAMPLES)
+    assert difference_many(weeks, parts, "week") == [n] * len(SAMPLES)
+
+
+def test_partial_units_round_down():
+    start = to_parts_from_ms(1700000000000)
+    later = to_parts_from_ms(1700000000000 + 1.5 * MS_PER_DAY)
+    assert difference(later, start) == 1
+    assert difference(start, later) == -2
+    assert difference(later, start, "week") == 0
+    assert difference(later, start, "tick") == 6144
+
+
+def year_of_length(days, after=4000):
+    calendar = OrbeatCalendar()
+    year = after
+    while calendar.year_start(year + 1) - calendar.year_start(year) != days:
+        year += 1
+    return year
+
+
+def test_years_keep_week_and_day():
+    long_year, short_year = year_of_length(368), year_of_length(360)
+    moved = add((long_year, 0, 5, 0.25), short_year - long_year, "year")
+    assert moved == (short_year, 1, 5, 0.25)
+    assert add((long_year, 45, 2, 0.5), 8, "year")[1:] == (45, 2, 0.5)
+    moved = add((short_year, 1, 5, 0.25), 3, "year")
+    assert difference(moved, (short_year, 1, 5, 0.25), "year") == 3
+    earlier = (short_year, 1, 5, 0.25)
+    assert difference((short_year + 3, 1, 5, 0.2), earlier, "year") == 2
+    assert difference_many([moved], [moved], "year") == [0]
+
+
+def test_crossing_into_a_short_year_starts_at_week_one():
+    year = year_of_length(360) - 1
+    assert add((year, 45, 7, 0.5), 1) == (year + 1, 1, 0, 0.5)
+    assert add((year + 1, 1, 0, 0.5), -1) == (year, 45, 7, 0.5)
+    assert add((year + 1, 45, 7, 0.5), 1) == (year + 2, 0, 0, 0.5)
+
+
+def test_keys():
+    key = to_key(1700000000000)
+    assert add_key(key, 3, "week") == to_key(1700000000000 + 24 * MS_PER_DAY)
+    assert add_keys([key], -2) == [to_key(1700000000000 - 2 * MS_PER_DAY)]
+    assert difference_keys(add_key(key, 100, "tick"), key, "tick") == 100
+
+
+def test_unknown_unit():
+    with pytest.raises(ValueError):
+        add((4022, 1, 1, 0.0), 1, "month")
@@ -0,0 +1,174 @@
+import json, threading
+import pytest
+import orbeat_engine, orbeat_time
+from orbeat_engine import calibrate, choose, convert_many, parse_thresholds
+from orbeat_engine import thresholds, to_orbeat8_many, to_ucy_many
+from orbeat_time import DEFAULT_CALENDAR
+
+VALUES = [0, 1, 1700000000000, 1700000000000.5, -(10**14), "2023-11-14T22:13:20Z"]
+
+
+@pytest.fixture(autouse=True)
+def fresh(monkeypatch, tmp_path):
+    for name in (orbeat_engine.ENGINE_ENV, orbeat_engine.THRESHOLDS_ENV):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv(orbeat_engine.CALIBRATION_ENV, str(tmp_path / "engine.json"))
+    orbeat_engine.reset()
+    yield
+    orbeat_engine.stop_pool()
+    orbeat_engine.reset()
+
+
+def test_parse_thresholds():
+    assert parse_thresholds("batch=4, pool=none") == {"batch": 4, "pool": None}
+    assert parse_thresholds("pool=100") == {"batch": 2, "pool": 100}
+    with pytest.raises(ValueError):
+        parse_thresholds("numpy=10")
+
+
+def test_environment_overrides_calibration(monkeypatch, tmp_path):
+    monkeypatch.setenv(orbeat_engine.THRESHOLDS_ENV, "batch=5,pool=50")
+    assert thresholds() == {"batch": 5, "pool": 50}
+    assert not (tmp_path / "engine.json").exists()
+
+
+def test_calibration_is_explicit_saved_and_reused(monkeypatch, tmp_path):
+    path = tmp_path / "engine.json"
+    monkeypatch.setattr(orbeat_engine, "calibrate", None)
+    assert thresholds() == orbeat_engine.DEFAULT_THRESHOLDS
+    assert not path.exists()
+    monkeypatch.undo()
+    monkeypatch.setenv(orbeat_engine.CALIBRATION_ENV, str(path))
+    found = calibrate()
+    assert thresholds() == found
+    saved = json.loads(path.read_text())
+    assert saved["thresholds"] == found
+    assert [file.name for file in tmp_path.iterdir()] == ["engine.json"]
+    saved["thresholds"]["batch"] = 7
+    path.write_text(json.dumps(saved))
+    orbeat_engine.reset()
+    assert thresholds()["batch"] == 7
+    # A file from another machine is ignored until calibrate() runs again
+    saved["machine"] = "elsewhere"
+    path.write_text(json.dumps(saved))
+    orbeat_engine.reset()
+    assert thresholds() == orbeat_engine.DEFAULT_THRESHOLDS
+
+
+def test_calibrate_tries_the_pool_with_several_cpus(monkeypatch, tmp_path):
+    monkeypatch.setattr(orbeat_engine.os, "cpu_count", lambda: 2)
+    monkeypatch.setattr(orbeat_engine, "POOL_SIZES", [512])
+    found = calibrate(str(tmp_path / "two.json"))
+    assert found["pool"] in (None, 512)
+    assert found["batch"] >= 1
+
+
+def test_choose_by_size_and_type(monkeypatch):
+    monkeypatch.setenv(orbeat_engine.THRESHOLDS_ENV, "batch=4,pool=100")
+    assert choose([1700000000000]) == "scalar"
+    assert choose(["2023-11-14T22:13:20Z"]) == "batch"
+    assert choose([1700000000000] * 10) == "batch"
+    # The pool is only used once it has been started
+    assert choose([1700000000000] * 100) == "batch"
+    monkeypatch.setattr(orbeat_engine, "_pool", "pool")
+    assert choose([1700000000000] * 100) == "pool"
+    monkeypatch.setenv(orbeat_engine.ENGINE_ENV, "batch")
+    assert choose([1700000000000]) == "batch"
+    monkeypatch.setattr(orbeat_engine, "_pool", None)
+    monkeypatch.setenv(orbeat_engine.ENGINE_ENV, "pool")
+    assert choose([1700000000000]) == "batch"
+    monkeypatch.setenv(orbeat_engine.ENGINE_ENV, "numpy")
+    with pytest.raises(ValueError):
+        choose([1])
+
+
+@pytest.mark.parametrize("engine", orbeat_engine.ENGINES)
+def test_engines_match_batch(monkeypatch, engine):
+    monkeypatch.setenv(orbeat_engine.ENGINE_ENV, engine)
+    if engine == "pool":
+        orbeat_engine.start_pool()
+        assert orbeat_engine.start_pool() is orbeat_engine._pool
+    expected = {
+        "orbeat8": DEFAULT_CALENDAR.to_orbeat8_many(VALUES),
+        "ucy": DEFAULT_CALENDAR.to_ucy_many(VALUES),
+    }
+    assert convert_many(VALUES, ("orbeat8", "ucy")) == expected
+    # The module's batch APIs go through the same dispatch
+    assert orbeat_time.convert_many(VALUES, ("orbeat8", "ucy")) == expected
+    assert orbeat_time.to_ucy_many(iter(VALUES)) == expected["ucy"]
+    numbers = [value for value in VALUES if not isinstance(value, str)]
+    assert to_orbeat8_many(numbers) == expected["orbeat8"][:-1]
+    assert to_ucy_many([1700000000], unit="s") == ["4022_36_6.4320"]
+
+
+def test_convert_many_unknown_format(monkeypatch):
+    monkeypatch.setenv(orbeat_engine.THRESHOLDS_ENV, "batch=2")
+    with pytest.raises(ValueError):
+        convert_many([1], ["iso"])
+
+
+def test_batch_apis_dispatch(monkeypatch):
+    picked = []
+    choose = orbeat_engine.choose
+    monkeypatch.setattr(
+        orbeat_engine,
+        "choose",
+        lambda values: picked.append(len(values)) or choose(values),
+    )
+    monkeypatch.setenv(orbeat_engine.THRESHOLDS_ENV, "batch=2")
+    orbeat_time.to_orbeat8_many([1700000000000])
+    orbeat_time.to_ucy_many([1700000000], unit="s")
+    orbeat_time.convert_many([1, 2, 3], ["ucy"])
+    assert picked == [1, 1, 3]
+
+
+def test_pool_splits_the_batch_across_workers(monkeypatch):
+    calls = []
+    monkeypatch.setattr(orbeat_engine.os, "cpu_count", lambda: 4)
+    monkeypatch.setattr(
+        orbeat_engine,
+        "_convert_many",
+        lambda values, formats, executor, size: calls.append(size) or {"ucy": []},
+    )
+    orbeat_engine._pooled(list(range(10)), ["ucy"], "pool")
+    orbeat_engine._pooled([], ["ucy"], "pool")
+    assert calls == [3, 1]
+
+
+def test_concurrent_first_batches_load_once(monkeypatch):
+    runs = []
+    started = threading.Event()
+
+    def slow_load():
+        runs.append(1)
+        started.wait(1)
+        return {"batch": 2, "pool": None}
+
+    monkeypatch.setattr(orbeat_engine, "_load_thresholds", slow_load)
+    threads = [threading.Thread(target=thresholds) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    started.set()
+    for thread in threads:
+        thread.join()
+    assert runs == [1]
+
+
+def test_calibration_survives_an_unwritable_path(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    assert calibrate(str(blocker / "engine.json"))["batch"] >= 1
+
+
+def test_calibration_is_not_counted_by_stats(tmp_path):
+    import orbeat_stats
+
+    orbeat_stats.enable()
+    try:
+        orbeat_stats.reset()
+        calibrate(str(tmp_path / "engine.json"))
+        data = orbeat_stats.snapshot()
+    finally:
+        orbeat_stats.disable()
+    assert not any(data["counters"].values())
+    assert not any(h["count"] for h in data["histograms"].values())
@@ -0,0 +1,125 @@
+import os, threading, pytest
+import orbeat_id
+from orbeat_id import IdGenerator, id_bytes, id_parts, id_text
+from orbeat_index import to_key
+from orbeat_time import UNIT_MS
+
+
+class Clock:
+    def __init__(self, unix_ms):
+        self.unix_ms = unix_ms
+
+    def __call__(self):
+        return self.unix_ms / 1000
+
+
+def test_ids_carry_the_stamp_and_increase():
+    clock = Clock(1700000000000)
+    generator = IdGenerator(node=5, clock=clock)
+    first = generator.new_id()
+    assert id_parts(first) == (to_key(1700000000000), 5, 0, 0)
+    batch = generator.take(1000)
+    assert batch == list(range(first + 1, first + 1001))
+    clock.unix_ms += UNIT_MS["tick"]
+    later = generator.new_id()
+    assert id_parts(later) == (to_key(clock.unix_ms), 5, 0, 0)
+    ids = [first, *batch, later]
+    assert [id_text(i) for i in ids] == sorted(id_text(i) for i in ids)
+    assert [id_bytes(i) for i in ids] == sorted(id_bytes(i) for i in ids)
+    assert len(id_text(later)) == 32 and len(id_bytes(later)) == 16
+    assert id_parts(id_text(later)) == id_parts(later)
+
+
+def test_clock_moving_backwards_keeps_counting():
+    clock = Clock(1700000000000)
+    generator = IdGenerator(node=1, clock=clock)
+    before = generator.take(3)
+    clock.unix_ms -= 10 * UNIT_MS["tick"]
+    after = [generator.new_id() for _ in range(3)]
+    assert before + after == sorted(set(before + after))
+    assert id_parts(after[-1])[0] == to_key(1700000000000)
+
+
+def test_counter_overflow_moves_to_next_key(monkeypatch):
+    monkeypatch.setattr(orbeat_id, "COUNTER_LIMIT", 4)
+    generator = IdGenerator(node=2, clock=Clock(1700000000000))
+    ids = generator.take(6) + [generator.new_id() for _ in range(3)]
+    assert ids == sorted(set(ids))
+    key = to_key(1700000000000)
+    assert [id_parts(i)[0] - key for i in ids] == [0, 0, 0, 0, 1, 1, 1, 1, 2]
+    assert [id_parts(i)[3] for i in ids] == [0, 1, 2, 3, 0, 1, 2, 3, 0]
+
+
+def test_threads_never_collide():
+    generator = IdGenerator()
+    results = []
+    # All alive at once, so none takes the slot of one that has ended
+    alive = threading.Barrier(8)
+
+    def work():
+        ids = [generator.new_id() for _ in range(2000)] + generator.take(2000)
+        assert ids == sorted(ids)
+        results.append(ids)
+        alive.wait()
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    everything = [i for ids in results for i in ids]
+    assert len(set(everything)) == len(everything) == 8 * 4000
+    assert len({id_parts(ids[0])[2] for ids in results}) == 8
+    assert {id_parts(i)[1] for i in everything} == {generator.node}
+
+
+def test_node_range():
+    with pytest.raises(ValueError):
+        IdGenerator(node=1 << 16)
+    assert IdGenerator().node == os.getpid() & 0xFFFF
+
+
+def test_default_node_follows_the_process_id(monkeypatch):
+    generator, fixed = IdGenerator(), IdGenerator(node=9)
+    generator.new_id()
+    monkeypatch.setattr(orbeat_id.os, "getpid", lambda: 0x12345)
+    orbeat_id._after_fork()
+    assert generator.node == 0x2345 and fixed.node == 9
+    assert id_parts(generator.new_id())[1] == 0x2345
+
+
+def test_ended_threads_hand_back_their_slots(monkeypatch):
+    monkeypatch.setattr(orbeat_id, "THREAD_SLOTS", 2)
+    generator = IdGenerator(clock=Clock(1700000000000))
+    made = []
+
+    def work():
+        made.append(generator.take(3))
+
+    for _ in range(5):
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+    everything = [i for ids in made for i in ids]
+    # Every thread took the one freed slot and counted on from its IDs
+    assert everything == sorted(set(everything))
+    assert {id_parts(i)[2] for i in everything} == {0}
+    started, stop = threading.Barrier(3), threading.Event()
+
+    def hold():
+        generator.new_id()
+        started.wait()
+        stop.wait()
+
+    threads = [threading.Thread(target=hold) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    started.wait()
+    try:
+        with pytest.raises(RuntimeError):
+            generator.new_id()
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    generator.new_id()
@@ -0,0 +1,60 @@
+import random, pytest
+from datetime import datetime, timezone
+from orbeat_index import StampIndex, key_bytes, key_from_bytes, parts_from_key
+from orbeat_index import to_key, to_key_many
+from orbeat_time import OFFSET_MS, to_orbeat8, to_parts_from_ms
+
+
+def test_keys_sort_in_time_order():
+    rng = random.Random(3)
+    values = sorted(rng.randrange(-OFFSET_MS, 10**14) for _ in range(5000))
+    keys = to_key_many(values)
+    assert keys == sorted(keys)
+    assert [key_bytes(key) for key in keys] == sorted(map(key_bytes, keys))
+    assert all(key_from_bytes(key_bytes(key)) == key for key in keys)
+    assert len(key_bytes(keys[-1])) == 8
+
+
+@pytest.mark.parametrize("unix_ms", [1700000000000, 1616489999000, 1741500000000])
+def test_key_holds_the_parts(unix_ms):
+    year, week, day, frac = to_parts_from_ms(unix_ms)
+    key = to_key(unix_ms)
+    assert parts_from_key(key) == (year, week, day, int(frac * 4096))
+    # The low 21 bits spell orbeat8 before its year digit, unreversed
+    assert f"{key & (1 << 21) - 1:07o}"[::-1] == to_orbeat8(unix_ms)[:7]
+    assert to_key_many([unix_ms / 1000], unit="s") == [key]
+
+
+def test_index_lookups():
+    rng = random.Random(4)
+    values = [rng.randrange(1600000000000, 1800000000000) for _ in range(20000)]
+    records = [f"doc{i}" for i in range(len(values))]
+    index = StampIndex(values, records)
+    assert len(index) == len(values)
+    stamped = {
+        record: to_parts_from_ms(unix_ms) for record, unix_ms in zip(records, values)
+    }
+    year, week, day, _ = stamped["doc0"]
+    for query, width in [((year,), 1), ((year, week), 2), ((year, week, day), 3)]:
+        expected = {r for r, parts in stamped.items() if parts[:width] == query}
+        found = index.select(*query)
+        assert set(found) == expected and len(found) == len(expected)
+    start, end = 1700000000000, datetime(2023, 12, 1, tzinfo=timezone.utc)
+    low, high = to_key(start), to_key(1701388800000)
+    found = index.between(start, end)
+    assert found == [
+        r
+        for r, ms in sorted(zip(records, values), key=lambda row: to_key(row[1]))
+        if low <= to_key(ms) < high
+    ]
+
+
+def test_index_defaults_to_timestamps():
+    index = StampIndex([1700000000000, 0, 1600000000000])
+    assert list(index.keys) == sorted(index.keys)
+    assert index.records == [0, 1600000000000, 1700000000000]
+    assert index.between(0, 30000) == [0]
+    assert index.between(0, 1) == []
+    assert index.between(1700000000001, 1600000000000) == []
+    with pytest.raises(ValueError):
+        StampIndex([1, 2], ["one"])
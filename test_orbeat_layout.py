@@ -0,0 +1,75 @@
+import csv, io, json
+import pytest
+from orbeat_layout import export, layout_rows, year_layout
+from orbeat_time import MS_PER_DAY, OrbeatCalendar, to_parts_many, to_ucy_many
+
+# 2066 is short and 2067 long
+YEARS = (2065, 2069)
+
+
+def test_year_layout_matches_conversion():
+    for year in range(*YEARS):
+        start_ms, days, weeks, is_long = year_layout(year)
+        assert (days, weeks) == ((368, 46) if is_long else (360, 45))
+        assert to_parts_many([start_ms])[0] == (year, 0 if is_long else 1, 0, 0.0)
+        assert to_parts_many([start_ms - 1])[0][0] == year - 1
+        assert year_layout(year + 1)[0] == start_ms + days * MS_PER_DAY
+    assert not year_layout(2066)[3] and year_layout(2067)[3]
+
+
+def test_year_layout_is_cached():
+    year_layout.cache_clear()
+    year_layout(2066)
+    year_layout(2066)
+    assert year_layout.cache_info().hits == 1
+
+
+def test_year_layout_other_calendar():
+    calendar = OrbeatCalendar(days_per_year=365.2422)
+    start, end = calendar.year_bounds(3)
+    assert year_layout(3, calendar)[1] == end - start
+
+
+def test_day_rows_match_conversion():
+    rows = [row for year in layout_rows(*YEARS) for row in year]
+    starts = [row[-1] for row in rows]
+    assert len(rows) == sum(year_layout(year)[1] for year in range(*YEARS))
+    assert all(b - a == MS_PER_DAY for a, b in zip(starts, starts[1:]))
+    assert [row[0] + ".0000" for row in rows] == to_ucy_many(starts)
+    assert [row[1:4] for row in rows] == [parts[:3] for parts in to_parts_many(starts)]
+
+
+def test_week_and_year_rows():
+    weeks = list(layout_rows(2066, 2068, "week"))
+    assert [len(year) for year in weeks] == [45, 46]
+    assert weeks[0][0][:3] == ("4022_01", 2066, 1)
+    assert weeks[1][0][:3] == ("4023_00", 2067, 0)
+    years = [year[0] for year in layout_rows(2066, 2068, "year")]
+    assert years == [
+        ("4022", 2066, *year_layout(2066)),
+        ("4023", 2067, *year_layout(2067)),
+    ]
+
+
+@pytest.mark.parametrize("unit", ["year", "week", "day"])
+def test_export_csv_and_ndjson_agree(unit):
+    text, lines = io.StringIO(), io.StringIO()
+    export(text, *YEARS, unit, "csv")
+    export(lines, *YEARS, unit, "ndjson")
+    table = list(csv.DictReader(io.StringIO(text.getvalue())))
+    objects = [json.loads(line) for line in lines.getvalue().splitlines()]
+    assert len(table) == len(objects) == sum(map(len, layout_rows(*YEARS, unit)))
+    for row, obj in zip(table, objects):
+        assert row.keys() == obj.keys()
+        assert row["code"] == obj["code"] and int(row["start_ms"]) == obj["start_ms"]
+    if unit == "year":
+        longs = [year_layout(year)[3] for year in range(*YEARS)]
+        assert [row["long"] for row in table] == [str(int(long)) for long in longs]
+        assert [obj["long"] for obj in objects] == longs
+
+
+def test_export_rejects_unknown_unit_and_format():
+    with pytest.raises(ValueError):
+        export(io.StringIO(), *YEARS, "month")
+    with pytest.raises(ValueError):
+        export(io.StringIO(), *YEARS, "day", "xml")
@@ -0,0 +1,60 @@
+import io, random
+from orbeat_merge import keyed_lines, merge, merge_files
+from orbeat_time import from_ucy, to_orbeat8, to_ucy
+
+NEAR_MS = 1700000000000
+
+
+def make_log(host, seed, size=3000, stamp=to_ucy):
+    rng, unix_ms, lines = random.Random(seed), NEAR_MS, []
+    for n in range(size):
+        unix_ms += rng.randrange(60000)
+        lines.append((unix_ms, f"{stamp(unix_ms)} {host} event {n}\n"))
+        if rng.random() < 0.1:
+            lines.append((unix_ms, f"  continued {host} {n}\n"))
+    return lines
+
+
+def test_merge_orders_every_line():
+    logs = [make_log("a", 1), make_log("b", 2, stamp=to_orbeat8), make_log("c", 3)]
+    merged = list(merge([[line for _, line in log] for log in logs], NEAR_MS, 100))
+    assert sorted(merged) == sorted(line for log in logs for _, line in log)
+    starts = [from_ucy(to_ucy(unix_ms))[0] for log in logs for unix_ms, _ in log]
+    keys = [key for key, _ in keyed_lines(merged, NEAR_MS)]
+    assert keys == sorted(keys) == sorted(starts)
+    for log in logs:
+        texts = [text for _, text in log]
+        own = set(texts)
+        assert [line for line in merged if line in own] == texts
+
+
+def test_unstamped_lines_follow_their_stamp():
+    lines = ["header\n", f"{to_ucy(NEAR_MS)} start\n", "  more\n", "1234 no stamp\n"]
+    lines.append("4022_77_0.0000 no such week\n")
+    keys = [key for key, _ in keyed_lines(lines, NEAR_MS)]
+    start = from_ucy(to_ucy(NEAR_MS))[0]
+    assert keys == [float("-inf"), start, start, start, start]
+    assert list(keyed_lines([])) == []
+
+
+def test_orbeat8_years_roll_forward():
+    # Twelve years apart, past what one reference time can resolve
+    times = [NEAR_MS + year * 31556925000 for year in range(12)]
+    lines = [f"{to_orbeat8(unix_ms)} tick\n" for unix_ms in times]
+    keys = [key for key, _ in keyed_lines(lines, NEAR_MS, chunk_lines=1)]
+    assert keys == [from_ucy(to_ucy(unix_ms))[0] for unix_ms in times]
+
+
+def test_merge_files(tmp_path):
+    first, second = tmp_path / "a.log", tmp_path / "b.log"
+    first.write_text(f"{to_ucy(NEAR_MS + 60000)} a1\n{to_ucy(NEAR_MS + 180000)} a2")
+    second.write_text(f"{to_ucy(NEAR_MS)} b1\n{to_ucy(NEAR_MS + 120000)} b2\n")
+    out = io.StringIO()
+    merge_files([str(first), str(second)], out, NEAR_MS)
+    assert [line.split()[1] for line in out.getvalue().splitlines()] == [
+        "b1",
+        "a1",
+        "b2",
+        "a2",
+    ]
+    assert out.getvalue().endswith("a2\n")
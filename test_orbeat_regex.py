@@ -1,2 +1,42 @@
-# TODO: regex test orbeat8 fizz
+import pytest
+from orbeat_scan import PATTERN, scan_bytes
+from orbeat_time import from_orbeat8, from_ucy, to_orbeat8, to_ucy
 
+NEAR_MS = 1700000000000
+UCY, ORBEAT8 = to_ucy(NEAR_MS), to_orbeat8(NEAR_MS)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [UCY, ORBEAT8, f"at {UCY}.", f"({ORBEAT8})", f"'{UCY}',{ORBEAT8}\n", f"-{ORBEAT8}"],
+)
+def test_pattern_finds_codes(text):
+    found = [match.group().decode() for match in PATTERN.finditer(text.encode())]
+    assert found == [code for code in (UCY, ORBEAT8) if code in text]
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        f"x{ORBEAT8}",
+        f"{ORBEAT8}9",
+        f"{ORBEAT8}.5",
+        f"1.{ORBEAT8}",
+        f"v_{UCY}",
+        f"{UCY}0",
+        "1234567",
+        "123456789",
+        "12345678",
+        "4022_36_6.432",
+    ],
+)
+def test_pattern_skips_lookalikes(text):
+    assert not list(PATTERN.finditer(text.encode()))
+
+
+def test_scan_decodes_and_drops_impossible_codes():
+    data = f"{UCY} then {ORBEAT8} and 01234567 or 4022_77_0.0000".encode()
+    assert list(scan_bytes(data, NEAR_MS)) == [
+        (0, UCY, from_ucy(UCY)),
+        (20, ORBEAT8, from_orbeat8(ORBEAT8, NEAR_MS)),
+    ]
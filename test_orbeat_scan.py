@@ -0,0 +1,62 @@
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import pytest
+from orbeat_scan import scan_file, scan_tree
+from orbeat_time import from_ucy, to_orbeat8, to_ucy
+
+NEAR_MS = 1700000000000
+
+
+@pytest.fixture
+def tree(tmp_path):
+    (tmp_path / "b").mkdir()
+    (tmp_path / "a.txt").write_text(f"created {to_ucy(NEAR_MS)}\n")
+    (tmp_path / "b" / "c.bin").write_bytes(
+        b"\x00\xff" * 1000 + to_orbeat8(NEAR_MS + 86400000).encode() + b"\x00"
+    )
+    (tmp_path / "b" / "empty").write_bytes(b"")
+    return tmp_path
+
+
+def expected(root):
+    return [
+        (str(root / "a.txt"), 8, to_ucy(NEAR_MS), from_ucy(to_ucy(NEAR_MS))),
+        (
+            str(root / "b" / "c.bin"),
+            2000,
+            to_orbeat8(NEAR_MS + 86400000),
+            from_ucy(to_ucy(NEAR_MS + 86400000)),
+        ),
+    ]
+
+
+@pytest.mark.parametrize("pool", [None, ThreadPoolExecutor, ProcessPoolExecutor])
+def test_scan_tree(tree, pool):
+    if pool is None:
+        assert list(scan_tree([str(tree)], NEAR_MS)) == expected(tree)
+        return
+    with pool(2) as executor:
+        assert list(scan_tree([str(tree)], NEAR_MS, executor)) == expected(tree)
+
+
+def test_scan_file(tree):
+    assert scan_file(tree / "b" / "empty") == []
+    assert len(scan_file(tree / "a.txt")) == 1
+    assert list(scan_tree([str(tree / "a.txt")], NEAR_MS)) == expected(tree)[:1]
+
+
+def test_cli_scan(tree):
+    out = subprocess.run(
+        ["python", "-m", "orbeat_cli", "scan", str(tree), "--near", str(NEAR_MS)],
+        capture_output=True,
+        text=True,
+    ).stdout
+    rows = [line.split("\t") for line in out.splitlines()]
+    assert [row[1] for row in rows] == [code for _, _, code, _ in expected(tree)]
+    assert rows[0][0] == f"{tree / 'a.txt'}:8"
+    out = subprocess.run(
+        ["python", "-m", "orbeat_cli", "scan", str(tree), "--jobs", "2"],
+        capture_output=True,
+        text=True,
+    ).stdout
+    assert out.splitlines()[0].split("\t")[1] == to_ucy(NEAR_MS)
@@ -0,0 +1,134 @@
+import asyncio, json, pytest
+import orbeat_serve
+from orbeat_time import to_orbeat8, to_ucy, to_ucy_many
+
+
+def exchange(*requests, raw=None):
+    """Start a loopback server, send requests on one connection, return responses."""
+
+    async def run():
+        server = await orbeat_serve.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            if raw is not None:
+                writer.write(raw)
+                data = await reader.read()
+                writer.close()
+                await writer.wait_closed()
+                return data
+            responses = []
+            for method, target, body in requests:
+                status, data = await orbeat_serve.request(
+                    reader, writer, method, target, body
+                )
+                responses.append((status, data))
+            writer.close()
+            await writer.wait_closed()
+            return responses
+
+    return asyncio.run(run())
+
+
+def test_now_reuses_body_within_tick():
+    start = 1700000000000
+    until = json.loads(orbeat_serve.now_body(start))["until"]
+    assert orbeat_serve.now_body(start + 1) is orbeat_serve.now_body(start)
+    assert orbeat_serve.now_body(until) is not orbeat_serve.now_body(start)
+    assert json.loads(orbeat_serve.now_body(start)) == {
+        "orbeat": to_orbeat8(start),
+        "ucy": to_ucy(start),
+        "until": until,
+    }
+
+
+def test_endpoints_on_one_keep_alive_connection():
+    values = [1700000000000, 1741500000000, 1600000000000]
+    responses = exchange(
+        ("GET", "/now", b""),
+        ("GET", "/convert?ms=1700000000000", b""),
+        ("POST", "/batch", json.dumps(values).encode()),
+        ("POST", "/batch", "\n".join(map(str, values)).encode() + b"\n"),
+    )
+    assert [status for status, _ in responses] == [200, 200, 200, 200]
+    now, convert, batch, ndjson = [json.loads(body) for _, body in responses]
+    assert len(now["orbeat"]) == 8
+    assert convert == {
+        "ms": 1700000000000,
+        "orbeat": to_orbeat8(1700000000000),
+        "ucy": to_ucy(1700000000000),
+    }
+    assert batch == ndjson
+    assert batch["orbeat"] == [to_orbeat8(ms) for ms in values]
+    assert batch["ucy"] == [to_ucy(ms) for ms in values]
+
+
+@pytest.mark.parametrize(
+    "method,target,body,status",
+    [
+        ("GET", "/missing", b"", 404),
+        ("POST", "/now", b"", 405),
+        ("GET", "/batch", b"", 405),
+        ("GET", "/convert", b"", 400),
+        ("GET", "/convert?ms=soon", b"", 400),
+        ("POST", "/batch", b"[1, 2", 400),
+        ("POST", "/batch", b'["1"]', 400),
+        ("POST", "/batch", b"[true]", 400),
+        ("POST", "/batch", b"[NaN]", 400),
+        ("POST", "/batch", b"[1, -Infinity]", 400),
+        ("POST", "/batch", b"1\nx\n", 400),
+    ],
+)
+def test_errors(method, target, body, status):
+    [(got, data)] = exchange((method, target, body))
+    assert got == status
+    assert "error" in json.loads(data)
+
+
+def test_convert_reads_zero_as_the_epoch():
+    [(status, data), (_, batch)] = exchange(
+        ("GET", "/convert?ms=0", b""), ("POST", "/batch", b"[0]")
+    )
+    assert status == 200
+    assert json.loads(data)["ucy"] == json.loads(batch)["ucy"][0] == to_ucy_many([0])[0]
+
+
+def test_connection_close_and_oversized_body():
+    closed = exchange(raw=b"GET /now HTTP/1.1\r\nConnection: close\r\n\r\n")
+    assert b"Connection: close" in closed and closed.startswith(b"HTTP/1.1 200")
+    legacy = exchange(raw=b"GET /now HTTP/1.0\r\n\r\n")
+    assert b"Connection: close" in legacy
+    huge = f"POST /batch HTTP/1.1\r\nContent-Length: {orbeat_serve.MAX_BODY + 1}"
+    rejected = exchange(raw=huge.encode() + b"\r\n\r\n")
+    assert rejected.startswith(b"HTTP/1.1 413")
+    assert exchange(raw=b"GET /now HTTP/1.1\r\nContent-Length: x\r\n\r\n") == b""
+    assert exchange(raw=b"GET /now HTTP/1.1\r\nContent-Length: -1\r\n\r\n") == b""
+
+
+@pytest.mark.parametrize("error,status", [(ValueError, 400), (RuntimeError, 500)])
+def test_conversion_errors_are_answered(monkeypatch, error, status):
+    def fail(values, formats):
+        raise error("wider than 24 characters")
+
+    monkeypatch.setattr(orbeat_serve, "convert_many", fail)
+    [(got, data)] = exchange(("POST", "/batch", b"[1]"))
+    assert got == status
+    assert "error" in json.loads(data)
+
+
+def test_loopback_bench():
+    results = orbeat_serve.bench(requests=50, connections=4)
+    assert set(results) == {"/now", "/convert", "/batch"}
+    assert all(result["requests"] == 50 for result in results.values())
+    assert all(result["rps"] > 0 for result in results.values())
+
+
+def test_load_reports_failures():
+    async def run():
+        server = await orbeat_serve.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            await orbeat_serve.load("127.0.0.1", port, "/missing", 3, 1)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run())
@@ -0,0 +1,108 @@
+import subprocess, sys, time, uuid, pytest
+from multiprocessing import shared_memory
+from orbeat_shared import LAYOUT, SEQ, StampPublisher, StampReader
+from orbeat_time import to_orbeat8, to_ucy
+
+
+@pytest.fixture
+def name():
+    return f"orbeat_test_{uuid.uuid4().hex[:12]}"
+
+
+def test_reader_without_publisher_converts_locally(name):
+    reader = StampReader(name)
+    assert reader.read() is None
+    assert reader.orbeat8() == to_orbeat8()
+    assert reader.ucy() == to_ucy()
+    assert reader.info() == {"hits": 0, "misses": 2}
+    assert reader.memory is None
+
+
+def test_reader_takes_fresh_stamp(name):
+    publisher = StampPublisher(name)
+    reader = StampReader(name)
+    try:
+        unix_ms = 1700000000000
+        until = publisher.publish(unix_ms)
+        assert reader.read(unix_ms) == (to_orbeat8(unix_ms), to_ucy(unix_ms), until)
+        assert reader.read(until - 1) is not None
+        # Stale once the tick has passed, and never valid before it
+        assert reader.read(until) is None
+        assert reader.read(unix_ms - 86400000) is None
+        publisher.publish()
+        assert reader.orbeat8() == to_orbeat8()
+        assert reader.ucy() == to_ucy()
+        assert reader.info() == {"hits": 2, "misses": 0}
+    finally:
+        reader.close()
+        publisher.close()
+
+
+def test_reader_gives_up_on_write_in_progress(name):
+    publisher = StampPublisher(name)
+    reader = StampReader(name)
+    try:
+        publisher.publish()
+        SEQ.pack_into(publisher.memory.buf, 0, 3)
+        assert reader.read() is None
+        assert reader.orbeat8() == to_orbeat8()
+        assert reader.fallbacks == 1
+    finally:
+        reader.close()
+        publisher.close()
+
+
+def test_reader_reattaches_after_publisher_restart(name):
+    unix_ms = 1700000000000
+    publisher = StampPublisher(name)
+    reader = StampReader(name)
+    try:
+        publisher.publish(unix_ms)
+        assert reader.read(unix_ms) is not None
+        publisher.close()
+        publisher = StampPublisher(name)
+        later = unix_ms + 86400000
+        publisher.publish(later)
+        # Within the retry interval the old mapping is kept
+        assert reader.read(later) is None
+        reader._attach_at = 0.0
+        assert reader.read(later)[0] == to_orbeat8(later)
+    finally:
+        reader.close()
+        publisher.close()
+
+
+def test_publisher_thread_and_reader_process(name):
+    publisher = StampPublisher(name)
+    publisher.start()
+    try:
+        time.sleep(0.05)
+        code = (
+            "import orbeat_shared, orbeat_time, time\n"
+            f"reader = orbeat_shared.StampReader({name!r})\n"
+            "stamps = [reader.read(time.time() * 1000) for _ in range(50)]\n"
+            "print(sum(stamp is not None for stamp in stamps))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True
+        )
+        assert int(result.stdout) > 40
+        assert "leaked" not in result.stderr and "Warning" not in result.stderr
+        # The reader's exit must not remove the publisher's segment
+        assert StampReader(name).read() is not None
+    finally:
+        publisher.close()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name)
+
+
+def test_publisher_reuses_left_over_segment(name):
+    left_over = shared_memory.SharedMemory(name, True, LAYOUT.size)
+    SEQ.pack_into(left_over.buf, 0, 7)
+    publisher = StampPublisher(name)
+    try:
+        publisher.publish(1700000000000)
+        assert SEQ.unpack_from(left_over.buf)[0] == 8
+    finally:
+        publisher.close()
+        left_over.close()
@@ -0,0 +1,60 @@
+import json, random, sqlite3, pytest
+from orbeat_sqlite import period, register
+from orbeat_time import to_orbeat8_many, to_ucy_many
+
+VALUES = [0, 1700000000000, 1700000000000.5, 1616489999000, -63600000000000]
+
+
+@pytest.fixture
+def connection():
+    connection = sqlite3.connect(":memory:")
+    register(connection)
+    connection.execute("create table events (ms)")
+    rng = random.Random(6)
+    rows = VALUES + [rng.randrange(1600000000000, 1800000000000) for _ in range(2000)]
+    connection.executemany("insert into events values (?)", [(ms,) for ms in rows])
+    yield connection
+    connection.close()
+
+
+def test_scalar_functions_match_batch_conversion(connection):
+    rows = connection.execute(
+        "select ms, orbeat8(ms), ucy(ms), orbeat_week(ms), orbeat_day(ms),"
+        " orbeat_period(ms, 'year'), orbeat_period(ms, 'tick') from events"
+    ).fetchall()
+    values = [row[0] for row in rows]
+    assert [row[1] for row in rows] == to_orbeat8_many(values)
+    ucys = to_ucy_many(values)
+    assert [row[2] for row in rows] == ucys
+    assert [row[6] for row in rows] == ucys
+    assert [row[3] for row in rows] == [code.rsplit("_", 1)[0] for code in ucys]
+    assert [row[4] for row in rows] == [code.split(".")[0] for code in ucys]
+    assert [row[5] for row in rows] == [code.split("_")[0] for code in ucys]
+    nulls = connection.execute("select orbeat8(null), ucy(null), orbeat_day(null)")
+    assert nulls.fetchone() == (None, None, None)
+
+
+def test_group_by_and_aggregate_agree(connection):
+    grouped = dict(
+        connection.execute("select orbeat_week(ms), count(*) from events group by 1")
+    )
+    (counts,) = connection.execute("select orbeat_counts(ms, 'week') from events")
+    assert json.loads(counts[0]) == grouped
+    (days,) = connection.execute("select orbeat_counts(ms) from events")
+    assert sum(json.loads(days[0]).values()) == len(VALUES) + 2000
+    (empty,) = connection.execute("select orbeat_counts(ms) from events where 0")
+    assert empty == (None,)
+
+
+def test_deterministic_functions_can_be_indexed(connection):
+    connection.execute("create index events_day on events (orbeat_day(ms))")
+    day = period(1700000000000)
+    found = connection.execute(
+        "select count(*) from events where orbeat_day(ms) = ?", (day,)
+    ).fetchone()
+    assert found[0] >= 2
+
+
+def test_unknown_period():
+    with pytest.raises(ValueError):
+        period(1700000000000, "month")
@@ -0,0 +1,116 @@
+import threading, pytest
+import orbeat_stats, orbeat_time
+
+ORIGINALS = {name: getattr(orbeat_time, name) for name in orbeat_stats.PUBLIC}
+
+
+@pytest.fixture
+def stats():
+    orbeat_stats.reset()
+    orbeat_stats.enable()
+    yield orbeat_stats
+    orbeat_stats.disable()
+    orbeat_stats.reset()
+
+
+def test_disabled_leaves_functions_untouched():
+    orbeat_stats.enable()
+    orbeat_stats.enable()
+    assert orbeat_time.to_orbeat8 is not ORIGINALS["to_orbeat8"]
+    orbeat_stats.disable()
+    for name, function in ORIGINALS.items():
+        assert getattr(orbeat_time, name) is function
+
+
+def test_year_correction_counters(stats):
+    values = [1700000000000, 1741500000000, -127841073120000, 1616489999000]
+    expected = {"year_exact": 0, "year_down": 0, "year_up": 0}
+    for unix_ms in values:
+        days = (unix_ms + orbeat_time.OFFSET_MS) / orbeat_time.MS_PER_DAY
+        estimate = orbeat_time._year_estimate(days)
+        year = ORIGINALS["to_parts_from_ms"](unix_ms)[0]
+        expected["year_down" if year < estimate else "year_exact"] += 1
+        assert orbeat_time.to_parts_from_ms(unix_ms)[0] == year
+    counters = stats.snapshot()["counters"]
+    assert {name: counters[name] for name in expected} == expected
+    assert counters["before_datum"] == 1
+    assert expected["year_down"] and expected["year_exact"]
+
+
+def test_batch_span_reuse_counts(stats):
+    values = list(range(1700000000000, 1700000000000 + 1000 * 60000, 60000))
+    assert orbeat_time.to_parts_many(iter(values)) == ORIGINALS["to_parts_many"](values)
+    assert stats.snapshot()["caches"]["year_span"] == {"hits": 999, "misses": 1}
+    orbeat_time.to_ucy_many([-127841073120000, 1600000000000, 1700000000000])
+    assert stats.snapshot()["caches"]["year_span"] == {"hits": 999, "misses": 3}
+
+
+def test_batch_is_timed_once(stats):
+    values = ["2023-11-14T22:13:20Z", 1700000000000, 1700000000]
+    orbeat_time.to_parts_many(values[:2])
+    orbeat_time.to_parts_many(values[2:], unit="s")
+    histograms = stats.snapshot()["histograms"]
+    assert histograms["to_parts_many"]["count"] == 2
+    assert histograms["to_unix_ms"]["count"] == 0
+    assert histograms["to_unix_ms_many"]["count"] == 0
+
+
+def test_scalar_engine_batches_are_counted(stats, monkeypatch):
+    monkeypatch.setenv("ORBEAT_ENGINE", "scalar")
+    orbeat_time.to_ucy_many([1700000000000, 1741500000000])
+    counters = stats.snapshot()["counters"]
+    assert sum(counters[name] for name in ["year_exact", "year_down", "year_up"]) == 2
+
+
+def test_latency_histograms(stats):
+    for _ in range(5):
+        orbeat_time.to_orbeat8(1700000000000)
+    histograms = stats.snapshot()["histograms"]
+    assert histograms["to_orbeat8"]["count"] == 5
+    assert histograms["to_parts_from_ms"]["count"] == 5
+    buckets = list(histograms["to_orbeat8"]["buckets"].values())
+    assert buckets == sorted(buckets) and buckets[-1] == 5
+    assert histograms["to_orbeat8"]["sum_ns"] > 0
+    stats.reset()
+    assert stats.snapshot()["histograms"]["to_orbeat8"]["count"] == 0
+
+
+def test_prometheus_text(stats):
+    orbeat_time.to_ucy(1700000000000)
+    stats.register_cache("custom", lambda: {"hits": 7, "misses": 2, "size": 1})
+    text = stats.prometheus()
+    assert text.endswith("\n")
+    assert "# TYPE orbeat_year_down_total counter" in text
+    assert 'orbeat_cache_hits_total{cache="custom"} 7' in text
+    assert 'orbeat_cache_misses_total{cache="custom"} 2' in text
+    assert 'orbeat_call_duration_seconds_bucket{function="to_ucy",le="+Inf"} 1' in text
+    assert 'orbeat_call_duration_seconds_count{function="to_ucy"} 1' in text
+    assert 'le="2.5e-07"' in text
+    for line in text.splitlines():
+        assert line.startswith("#") or float(line.rsplit(" ", 1)[1]) >= 0
+
+
+def test_day_cache_is_reported(stats):
+    import orbeat_cache
+
+    orbeat_cache.cache_clear()
+    orbeat_cache.to_parts_cached(1700000000000)
+    orbeat_cache.to_parts_cached(1700000000001)
+    assert stats.snapshot()["caches"]["day"]["hits"] == 1
+    assert 'orbeat_cache_misses_total{cache="day"} 1' in stats.prometheus()
+
+
+def test_counts_are_exact_across_threads(stats):
+    def work():
+        for unix_ms in range(1700000000000, 1700000000000 + 500):
+            orbeat_time.to_orbeat8(unix_ms)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    data = stats.snapshot()
+    assert data["histograms"]["to_orbeat8"]["count"] == 4000
+    assert data["histograms"]["to_parts_from_ms"]["count"] == 4000
+    assert sum(data["counters"][name] for name in ["year_exact", "year_down"]) == 4000
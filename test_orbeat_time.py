@@ -1,6 +1,11 @@
-import pytest, zoneinfo
-from datetime import datetime
-from orbeat_time import to_eastern, to_orbeat8, to_ucy
+import pytest, time, zoneinfo
+import orbeat_time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from orbeat_time import to_eastern, to_orbeat8, to_ucy, to_parts_from_ms
+from orbeat_time import to_parts_many, to_orbeat8_many, to_ucy_many, next_tick_ms
+from orbeat_time import convert_many, to_local, to_local_many, to_unix_ms
+from orbeat_time import to_unix_ms_many
 
 EDGE_TEST_CASES = [
     ("2029-03-13T08:59:59+00:00", "4027_55_7.7777", "77777557"),
@@ -25,3 +30,200 @@ def test_orbeat_time_formats(dt_str, expected_ucy, expected_orbeat8):
     assert to_ucy(unix_ms) == expected_ucy
     assert to_orbeat8(unix_ms) == expected_orbeat8
     assert to_eastern(unix_ms) == expected_eastern
+
+
+BATCH_SAMPLES = [
+    -1000000000000000,
+    -127841073120000,
+    -62000000000000,
+    -9000000000000,
+    1,
+    1616489999000,
+    1700000000000,
+    1741500000000,
+    4102444800000,
+    32503680000000,
+]
+
+
+def test_to_parts_many_matches_scalar():
+    """Test that the batch path agrees with to_parts_from_ms, in input order."""
+    values = BATCH_SAMPLES + list(range(1600000000000, 1800000000000, 7777777777))
+    values += values[::-1]
+    assert to_parts_many(values) == [to_parts_from_ms(ms) for ms in values]
+
+
+def test_format_many_matches_scalar():
+    """Test that the batch formatters agree with their scalar counterparts."""
+    assert to_orbeat8_many(BATCH_SAMPLES) == [to_orbeat8(ms) for ms in BATCH_SAMPLES]
+    assert to_ucy_many(BATCH_SAMPLES) == [to_ucy(ms) for ms in BATCH_SAMPLES]
+    assert to_orbeat8_many(iter(BATCH_SAMPLES)) == to_orbeat8_many(BATCH_SAMPLES)
+    assert to_parts_many([]) == []
+
+
+@pytest.mark.parametrize(
+    "tz", ["America/New_York", "Europe/London", "Australia/Lord_Howe", "Asia/Kathmandu"]
+)
+def test_to_local_many_matches_scalar(tz, monkeypatch):
+    """Test that the transition table agrees with datetime in each zone."""
+    values = list(range(-2208988800000, 4102444800000, 3999999937))
+    values += [59999.9996, 59999.9994, -1, 1.5e12 + 0.25]
+    expected = [to_local(ms, tz) for ms in values]
+    # Sparse enough to go a row at a time, unless the table is allowed
+    monkeypatch.setattr(orbeat_time, "_zone_tables", {})
+    assert to_local_many(values, tz) == expected
+    assert orbeat_time._zone_tables == {}
+    monkeypatch.setattr(orbeat_time, "LOCAL_DAYS_PER_ROW", 100)
+    assert to_local_many(values, tz) == expected
+    # A narrower batch reuses the table already built for the zone
+    assert to_local_many(values[5:9], tz) == expected[5:9]
+    assert len(orbeat_time._zone_tables[tz]) == 1
+    assert to_local_many([], tz) == []
+
+
+def test_to_local_many_keeps_tables_per_span(monkeypatch):
+    """Test that batches over alternating spans reuse their own tables."""
+    built = []
+    zone_table = orbeat_time._zone_table
+    monkeypatch.setattr(orbeat_time, "_zone_tables", {})
+    monkeypatch.setattr(
+        orbeat_time,
+        "_zone_table",
+        lambda *args: built.append(args) or zone_table(*args),
+    )
+    spans = [[1700000000000, 1700100000000], [1600000000000, 1600100000000]]
+    for values in spans * 3:
+        assert to_local_many(values) == [to_local(ms) for ms in values]
+    assert len(built) == 2
+    # Two rows millennia apart are formatted one at a time, with no table
+    wide = [-62000000000000, 253000000000000]
+    assert to_local_many(wide) == [to_local(ms) for ms in wide]
+    assert len(built) == 2
+
+
+def test_to_local():
+    """Test zone names, the Eastern default and unrepresentable times."""
+    assert to_local(1700000000000, "UTC") == "2023-11-14 10:13 PM UTC"
+    assert to_local(1700000000000) == to_eastern(1700000000000)
+    assert to_local_many([0], "Asia/Tokyo") == ["1970-01-01 09:00 AM JST"]
+    with pytest.raises((ValueError, OverflowError)):
+        to_local_many([1700000000000, 1e18], "UTC")
+
+
+@pytest.mark.parametrize("pool", [None, ThreadPoolExecutor, ProcessPoolExecutor])
+def test_convert_many_matches_batch(pool):
+    """Test that chunked and pooled conversion keeps every code in order."""
+    values = BATCH_SAMPLES + list(range(1600000000000, 1800000000000, 777777777))
+    expected = {"ucy": to_ucy_many(values), "orbeat8": to_orbeat8_many(values)}
+    if pool is None:
+        assert convert_many(values, ["ucy", "orbeat8"]) == expected
+        return
+    with pool(2) as executor:
+        result = convert_many(iter(values), ["ucy", "orbeat8"], executor, 37)
+        assert result == expected
+        assert convert_many([], ["ucy"], executor) == {"ucy": []}
+
+
+def test_convert_many_errors():
+    """Test that unknown formats and over-wide codes are rejected."""
+    with pytest.raises(ValueError, match="unknown format"):
+        convert_many([1700000000000], ["iso"])
+    with ProcessPoolExecutor(1) as executor:
+        with pytest.raises(ValueError, match="unknown format"):
+            convert_many([1700000000000], ["iso"], executor)
+        with pytest.raises(ValueError, match="wider"):
+            convert_many([1e25], ["ucy"], executor)
+
+
+def test_convert_into_writes_at_offsets():
+    """Test the process worker in this process, where coverage can see it."""
+    from multiprocessing import shared_memory
+    import orbeat_time
+
+    memory = shared_memory.SharedMemory(create=True, size=3 * (8 + 24))
+    try:
+        orbeat_time._convert_into(
+            memory.name, 1, [1700000000000], ["orbeat8", "ucy"], 3
+        )
+        data = bytes(memory.buf[: memory.size])
+        assert data[8:16].decode() == to_orbeat8(1700000000000)
+        assert data[48:72].decode().rstrip() == to_ucy(1700000000000)
+        with pytest.raises(ValueError, match="wider"):
+            orbeat_time._convert_into(memory.name, 0, [1e25], ["ucy"], 3)
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+ISO_INPUTS = [
+    ("2023-11-14T22:13:20", 1700000000000),
+    ("2023-11-14T22:13:20Z", 1700000000000),
+    ("2023-11-14T22:13:20.001z", 1700000000001),
+    ("2023-11-14 17:13:20.123-05:00", 1700000000123),
+    ("2023-11-14T22:13:20.000500+00:00", 1700000000000.5),
+    (" 2023-11-15 ", 1700006400000),
+    ("1969-12-31T23:59:59.999", -1),
+]
+
+
+@pytest.mark.parametrize("text,expected", ISO_INPUTS)
+def test_to_unix_ms_iso(text, expected):
+    assert to_unix_ms(text) == expected
+    assert to_unix_ms_many([text]) == [expected]
+
+
+def test_to_unix_ms_units_and_objects():
+    assert to_unix_ms(1700000000, "s") == 1700000000000
+    assert to_unix_ms(1700000000.5, "s") == 1700000000500
+    assert to_unix_ms(1700000000000123, "us") == 1700000000000.123
+    assert to_unix_ms(1700000000000000000, "ns") == 1700000000000
+    assert to_unix_ms(1700000000000) == 1700000000000
+    moment = datetime(2023, 11, 14, 22, 13, 20, 1000, tzinfo=timezone.utc)
+    assert to_unix_ms(moment) == 1700000000001
+    assert to_unix_ms(moment.astimezone(timezone(timedelta(hours=-5)))) == 1700000000001
+    assert to_unix_ms(moment.replace(tzinfo=None)) == 1700000000001
+    assert to_unix_ms(date(2023, 11, 15)) == 1700006400000
+    with pytest.raises(ValueError):
+        to_unix_ms("soon")
+    with pytest.raises(ValueError):
+        to_unix_ms_many(["2023-11-14", "soon"])
+    with pytest.raises(TypeError):
+        to_unix_ms(b"2023-11-14")
+    with pytest.raises(KeyError):
+        to_unix_ms(1, "min")
+
+
+def test_batch_functions_accept_mixed_input():
+    expected = [1700000000000, 1700006400000, 1700000000123, 1800000000000]
+    values = [
+        "2023-11-14T22:13:20Z",
+        date(2023, 11, 15),
+        datetime(2023, 11, 14, 22, 13, 20, 123000),
+        1800000000000,
+    ]
+    assert to_unix_ms_many(values) == expected
+    assert to_parts_many(values) == to_parts_many(expected)
+    assert to_ucy_many(values) == to_ucy_many(expected)
+    assert to_local_many(values, "UTC") == to_local_many(expected, "UTC")
+    assert convert_many(values, ["ucy"]) == convert_many(expected, ["ucy"])
+    seconds = [ms // 1000 for ms in expected]
+    assert to_orbeat8_many(seconds, unit="s") == to_orbeat8_many(expected)
+    assert to_local_many(seconds, "UTC", "s") == to_local_many(expected, "UTC")
+    assert convert_many(seconds, unit="s") == convert_many(expected)
+    with ThreadPoolExecutor(1) as executor:
+        assert convert_many(seconds, unit="s", executor=executor) == convert_many(
+            expected
+        )
+    nanoseconds = [ms * 1000000 for ms in expected]
+    assert to_ucy_many(nanoseconds, unit="ns") == to_ucy_many(expected)
+    assert to_parts_many(["1900-01-01"]) == [to_parts_from_ms(-2208988800000)]
+
+
+@pytest.mark.parametrize("unix_ms", BATCH_SAMPLES[3:])
+def test_next_tick_ms(unix_ms):
+    """Test that the code changes exactly at the next tick boundary."""
+    boundary = next_tick_ms(unix_ms)
+    assert 0 < boundary - unix_ms <= 86400000 / 4096
+    assert to_ucy(boundary - 0.25) == to_ucy(unix_ms)
+    assert to_ucy(boundary) != to_ucy(unix_ms)
+    assert 0 < next_tick_ms() - time.time() * 1000 <= 86400000 / 4096